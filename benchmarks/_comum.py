@@ -0,0 +1,53 @@
+"""Utilitários compartilhados pelos scripts de benchmark."""
+import socket
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+# Os módulos da aplicação usam imports absolutos a partir de src/streamlit_td
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src' / 'streamlit_td'
+sys.path.insert(0, str(SRC_DIR))
+
+
+def medir(func, *args, repeticoes=3, memoria=True, **kwargs):
+    """
+    Executa ``func`` algumas vezes e mede tempo e pico de memória.
+
+    O rastreamento de memória (``tracemalloc``) deixa código com muitos
+    objetos Python bem mais lento; com ``memoria=False`` só o tempo é
+    medido.
+
+    Returns:
+        dict: Melhor tempo (s), pico de memória (MiB, se medido) e o
+        último resultado
+    """
+    tempos = []
+    pico = 0
+    resultado = None
+    for _ in range(repeticoes):
+        resultado = None
+        if memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = func(*args, **kwargs)
+        tempos.append(time.perf_counter() - inicio)
+        if memoria:
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    medida = {'tempo_s': min(tempos), 'resultado': resultado}
+    if memoria:
+        medida['pico_mib'] = pico / 2 ** 20
+    return medida
+
+
+def porta_livre():
+    """
+    Reserva uma porta TCP livre em localhost. Usada para configurar as
+    URLs (lidas pelo ``config`` na importação) antes de subir os
+    servidores locais.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
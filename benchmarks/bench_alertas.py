@@ -0,0 +1,130 @@
+"""
+Benchmark da avaliação de alertas: laço antigo com ``iterrows`` contra o
+motor vetorizado (``alerts.engine``), o índice de limites
+(``alerts.index``) e a avaliação em vários processos
+(``alerts.parallel``), em quantidades crescentes de alertas.
+
+Uso:
+    python benchmarks/bench_alertas.py [--alertas 1000 10000 100000]
+        [--processos 2 4 8 16] [--json]
+"""
+import argparse
+import json
+from io import BytesIO
+
+from _comum import medir
+from sintetico import gerar_alertas, gerar_tesouro_csv
+
+import numpy as np
+import pandas as pd
+from alerts.engine import evaluate_alerts, latest_quotes
+from alerts.index import AlertIndex
+from alerts.parallel import evaluate_alerts_parallel, shutdown_executor
+from data.tesouro import read_tesouro_csv
+
+
+# Acima disso o laço antigo leva minutos e é omitido
+MAX_ALERTAS_LACO = 2000
+
+
+def check_alerts_antigo(alerts, df):
+    """Reproduz o ``check_alerts`` anterior (sem as mensagens)."""
+    alerts_triggered = []
+    for _, alert in alerts.iterrows():
+        alert_data = df[
+            (df['Tipo Titulo'] == alert['tipo_titulo']) &
+            (df['Ano Vencimento'] == alert['ano_vencimento'])
+        ]
+        if not alert_data.empty:
+            latest = alert_data.sort_values(
+                'Data Base', ascending=False
+            ).iloc[0]
+            preco = latest['PU Compra Manha']
+            taxa = latest['Taxa Compra Manha']
+            if (
+                (pd.notna(alert['preco_min']) and preco >= alert['preco_min'])
+                or (pd.notna(alert['preco_max'])
+                    and preco <= alert['preco_max'])
+                or (pd.notna(alert['taxa_min']) and taxa >= alert['taxa_min'])
+                or (pd.notna(alert['taxa_max']) and taxa <= alert['taxa_max'])
+            ):
+                alerts_triggered.append(alert)
+    return alerts_triggered
+
+
+def check_alerts_novo(alerts, df):
+    return evaluate_alerts(alerts, latest_quotes(df))
+
+
+def check_alerts_indice(alerts, df, index):
+    """Seleciona os acionados pelo índice e monta só as suas mensagens."""
+    quotes = latest_quotes(df)
+    posicoes = alerts.index.get_indexer(index.match_quotes(quotes))
+    posicoes = np.sort(posicoes[posicoes >= 0])
+    return evaluate_alerts(alerts.iloc[posicoes], quotes)
+
+
+def check_alerts_paralelo(alerts, df, workers):
+    return evaluate_alerts_parallel(
+        alerts, latest_quotes(df), workers=workers, min_alerts=0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alertas', type=int, nargs='+',
+                        default=[100, 1000, 10000, 100000])
+    parser.add_argument('--processos', type=int, nargs='*', default=[],
+                        help='Processos da avaliação paralela')
+    parser.add_argument('--json', action='store_true',
+                        help='Emite os resultados em JSON')
+    args = parser.parse_args()
+
+    df = read_tesouro_csv(BytesIO(gerar_tesouro_csv()))
+    resultados = []
+    for n in args.alertas:
+        alerts = gerar_alertas(n, df)
+        # O índice é mantido pelo AlertManager; sua construção fica fora
+        # da medida, como no uso real
+        index = AlertIndex(alerts)
+        variantes = [
+            ('novo', check_alerts_novo, ()),
+            ('indice', check_alerts_indice, (index,)),
+        ]
+        for workers in args.processos:
+            # A partida do pool fica fora da medida
+            check_alerts_paralelo(alerts.iloc[:1], df, workers)
+            variantes.append(
+                (f'paralelo_{workers}', check_alerts_paralelo, (workers,))
+            )
+        if n <= MAX_ALERTAS_LACO:
+            variantes.insert(0, ('antigo', check_alerts_antigo, ()))
+        for nome, func, extras in variantes:
+            medida = medir(
+                func, alerts, df, *extras,
+                repeticoes=1 if nome == 'antigo' else 3,
+                memoria=False
+            )
+            acionados = medida.pop('resultado')
+            medida.update({
+                'benchmark': f'check_alerts_{nome}',
+                'alertas': n,
+                'acionados': len(acionados),
+                'alertas_por_s': n / medida['tempo_s'],
+            })
+            resultados.append(medida)
+    shutdown_executor()
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    for r in resultados:
+        print(
+            f"{r['benchmark']:<24} alertas={r['alertas']:<8} "
+            f"acionados={r['acionados']:<8} tempo={r['tempo_s']:.3f}s "
+            f"({r['alertas_por_s']:,.0f} alertas/s)"
+        )
+
+
+if __name__ == '__main__':
+    main()
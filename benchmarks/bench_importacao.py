@@ -0,0 +1,137 @@
+"""
+Tempo de importação dos módulos da aplicação (``python -X importtime``),
+cada um num interpretador novo, como num container recém-iniciado.
+
+Para cada módulo informa o tempo total, os pacotes mais pesados e quais
+dependências pesadas (Streamlit, plotly, FastAPI, redis, smtplib, pyarrow)
+foram carregadas.
+
+Uso:
+    python benchmarks/bench_importacao.py [--modulos api data alerts]
+        [--top 5] [--repeticoes 3] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from _comum import SRC_DIR
+
+
+MODULOS = [
+    'api', 'scheduler', 'data', 'alerts', 'visualization', 'utils.redis'
+]
+# Pacotes da própria aplicação (não entram no custo por pacote)
+APP = {'alerts', 'data', 'utils', 'visualization', 'api', 'scheduler',
+       'config', 'app'}
+PESADOS = ['streamlit', 'plotly.express', 'fastapi', 'uvicorn', 'redis',
+           'smtplib', 'pyarrow']
+
+# Importa o módulo e lista quais dependências pesadas foram carregadas
+SCRIPT = (
+    "import {modulo}; import json, sys; "
+    "print(json.dumps([m for m in {pesados!r} if m in sys.modules]))"
+)
+
+
+def importar(modulo):
+    """
+    Importa ``modulo`` num processo novo.
+
+    Returns:
+        tuple: (linhas do ``-X importtime`` como (nome, nível, tempo
+        cumulativo em segundos), na ordem em que terminaram; dependências
+        pesadas carregadas)
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         SCRIPT.format(modulo=modulo, pesados=PESADOS)],
+        capture_output=True, text=True, cwd=SRC_DIR, env=os.environ,
+        check=True
+    )
+    linhas = []
+    for linha in processo.stderr.splitlines():
+        # "import time: <próprio> | <cumulativo> | <nome indentado>"
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, nome = linha.split('|')
+        # Nível de aninhamento: dois espaços por nível
+        nivel = (len(nome) - len(nome.lstrip(' ')) - 1) // 2
+        linhas.append((nome.strip(), nivel, int(cumulativo) / 1e6))
+    return linhas, json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def custo_por_pacote(linhas, modulo):
+    """
+    Tempo de importação de ``modulo`` e de cada pacote de terceiros (ou
+    da biblioteca padrão) que ele carrega, medido onde o pacote entrou
+    pela primeira vez. Pacotes importados por outros se sobrepõem.
+    """
+    total = 0.0
+    custos = {}
+    ancestrais = {}
+    dentro = False
+    # As linhas saem depois dos imports internos: em ordem reversa, cada
+    # módulo aparece antes dos que ele importou
+    for nome, nivel, tempo in reversed(linhas):
+        if nivel == 0:
+            if dentro:
+                break
+            dentro = nome == modulo
+            total = tempo
+        if not dentro:
+            continue
+        ancestrais[nivel] = nome
+        pacote = nome.split('.')[0]
+        pai = ancestrais.get(nivel - 1, '').split('.')[0]
+        if nivel > 0 and pacote != pai and pacote not in APP:
+            custos[pacote] = custos.get(pacote, 0.0) + tempo
+    return total, custos
+
+
+def relatorio(modulo, repeticoes, top):
+    """Melhor tempo de importação de ``modulo`` e os maiores pacotes."""
+    melhor = None
+    for _ in range(repeticoes):
+        linhas, pesados = importar(modulo)
+        total, custos = custo_por_pacote(linhas, modulo)
+        if melhor is None or total < melhor[0]:
+            melhor = (total, custos, pesados)
+    total, custos, pesados = melhor
+    maiores = sorted(custos.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'modulo': modulo,
+        'tempo_s': total,
+        'pesados': pesados,
+        'maiores': [
+            {'pacote': nome, 'tempo_s': tempo} for nome, tempo in maiores[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modulos', nargs='+', default=MODULOS)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--json', action='store_true',
+                        help='Emite os resultados em JSON')
+    args = parser.parse_args()
+
+    resultados = [
+        relatorio(modulo, args.repeticoes, args.top)
+        for modulo in args.modulos
+    ]
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    for r in resultados:
+        pesados = ', '.join(r['pesados']) or '-'
+        print(f"{r['modulo']:<14} tempo={r['tempo_s']:.3f}s pesados={pesados}")
+        for m in r['maiores']:
+            print(f"    {m['pacote']:<20} {m['tempo_s']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark da ingestão do CSV do Tesouro Direto: leitura antiga (texto
+completo + ``pd.read_csv`` com tipos inferidos + ``process_tesouro_data``)
+contra a leitura em blocos com tipos compactos.
+
+Uso:
+    python benchmarks/bench_ingestao.py [--escala 1 10] [--json]
+"""
+import argparse
+import json
+from io import BytesIO, StringIO
+
+from _comum import medir
+from sintetico import gerar_tesouro_csv
+
+import pandas as pd
+from data.tesouro import read_tesouro_csv
+
+
+def ingestao_antiga(conteudo):
+    """Reproduz o caminho anterior: ``response.text`` + parse das datas."""
+    texto = conteudo.decode('latin-1')
+    df = pd.read_csv(StringIO(texto), sep=';', decimal=',')
+    df['Data Vencimento'] = pd.to_datetime(
+        df['Data Vencimento'], format='%d/%m/%Y'
+    )
+    df['Data Base'] = pd.to_datetime(df['Data Base'], format='%d/%m/%Y')
+    df['Ano Vencimento'] = df['Data Vencimento'].dt.year
+    return df
+
+
+def ingestao_nova(conteudo):
+    """Leitura em blocos direto do corpo binário."""
+    return read_tesouro_csv(BytesIO(conteudo))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--escala', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--json', action='store_true',
+                        help='Emite os resultados em JSON')
+    args = parser.parse_args()
+
+    resultados = []
+    for escala in args.escala:
+        conteudo = gerar_tesouro_csv(escala=escala)
+        for nome, func in (('antiga', ingestao_antiga),
+                           ('nova', ingestao_nova)):
+            medida = medir(func, conteudo)
+            df = medida.pop('resultado')
+            medida.update({
+                'benchmark': f'ingestao_{nome}',
+                'escala': escala,
+                'linhas': len(df),
+                'csv_mib': len(conteudo) / 2 ** 20,
+                'frame_mib': df.memory_usage(deep=True).sum() / 2 ** 20,
+            })
+            resultados.append(medida)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    for r in resultados:
+        print(
+            f"{r['benchmark']:<18} escala={r['escala']:<4} "
+            f"linhas={r['linhas']:<9} tempo={r['tempo_s']:.3f}s "
+            f"pico={r['pico_mib']:.1f}MiB frame={r['frame_mib']:.1f}MiB"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Suíte de benchmarks da aplicação, sem acesso a serviços externos.
+
+O CSV do Tesouro e a série do BCB são servidos por um servidor HTTP local
+com dados sintéticos, o Redis é substituído por ``fakeredis`` e os emails
+vão para um servidor SMTP local que os descarta. Cada escala multiplica o
+volume do CSV (1× é próximo ao arquivo real).
+
+Uso:
+    python benchmarks/executar.py [--escala 1 10 100] [--alertas 10000]
+        [--repeticoes 3] [--saida resultados.json] [--json]
+
+Com ``--saida``, grava os resultados e os metadados da execução (commit,
+versões, data) em JSON, para acompanhar regressões entre versões.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from datetime import date, datetime
+from io import BytesIO
+from pathlib import Path
+
+from _comum import medir, porta_livre
+
+# As URLs e o diretório de dados são lidos pelo ``config`` na importação:
+# precisam estar definidos antes de importar os módulos da aplicação
+PORTA_HTTP = porta_livre()
+DIRETORIO = Path(tempfile.mkdtemp(prefix='bench-td-'))
+os.environ['TESOURO_API_URL'] = f'http://127.0.0.1:{PORTA_HTTP}/tesouro.csv'
+os.environ['BCB_API_URL'] = f'http://127.0.0.1:{PORTA_HTTP}/bcb'
+os.environ['DATA_DIR'] = str(DIRETORIO)
+
+import numpy as np
+import pandas as pd
+
+from alerts.dispatcher import EmailDispatcher, build_alert_message
+from alerts.engine import evaluate_alerts, latest_quotes
+from alerts.index import AlertIndex
+from alerts.storage import AlertStore
+from data.dataset import TesouroDataset
+from data.shared_cache import DATASET_KEY, SharedDatasetCache
+from data.dolar import load_dolar_data
+from data.store import DolarStore, TesouroStore
+from data.tesouro import (
+    load_tesouro_data, process_tesouro_data, read_tesouro_csv
+)
+from visualization.graphics import build_taxa_figure, _cached_line_figure
+from sintetico import gerar_alertas, gerar_tesouro_df
+from servicos import RedisFalso, ServidorDados, SMTPDescarte
+
+
+# Mensagens enviadas no benchmark de SMTP
+EMAILS = 500
+
+
+def _diretorio_novo(nome):
+    return Path(tempfile.mkdtemp(prefix=f'{nome}-', dir=DIRETORIO))
+
+
+def bench_dados(escala, servidor, repeticoes):
+    """Ingestão, download, processamento, índice, filtros e gráficos."""
+    bruto = gerar_tesouro_df(escala=escala)
+    conteudo = bruto.to_csv(sep=';', decimal=',', index=False).encode(
+        'latin-1'
+    )
+    servidor.csv_bytes = conteudo
+    resultados = []
+
+    def registrar(nome, medida, **extras):
+        medida.pop('resultado', None)
+        resultados.append({
+            'benchmark': nome, 'escala': escala, **medida, **extras
+        })
+
+    medida = medir(read_tesouro_csv, BytesIO(conteudo), repeticoes=1)
+    df = medida['resultado']
+    registrar(
+        'ingestao_csv', medida,
+        linhas=len(df), csv_mib=len(conteudo) / 2 ** 20
+    )
+
+    def download_frio():
+        return load_tesouro_data(TesouroStore(_diretorio_novo('tesouro')))
+
+    registrar(
+        'download_frio',
+        medir(download_frio, repeticoes=repeticoes, memoria=False)
+    )
+
+    store = TesouroStore(_diretorio_novo('tesouro'))
+    load_tesouro_data(store)
+    registrar(
+        'download_304',
+        medir(load_tesouro_data, store, repeticoes=repeticoes, memoria=False)
+    )
+
+    registrar(
+        'process_tesouro_data',
+        medir(process_tesouro_data, bruto, repeticoes=repeticoes,
+              memoria=False)
+    )
+
+    df_dolar = load_dolar_data(
+        df['Data Base'].min(), df['Data Base'].max(),
+        DolarStore(_diretorio_novo('dolar'))
+    )
+    medida = medir(
+        TesouroDataset, df, 1, df_dolar, repeticoes=repeticoes, memoria=False
+    )
+    dataset = medida['resultado']
+    registrar('dataset_build', medida)
+
+    # Cache compartilhado entre réplicas: gravação pela réplica que
+    # atualiza e leitura (aquecimento) pelas demais
+    cache = SharedDatasetCache(RedisFalso(decode_responses=False))
+    registrar('cache_redis_save', medir(
+        cache.save, df, df_dolar, repeticoes=repeticoes, memoria=False
+    ), blob_mib=len(
+        cache.redis_manager.redis_client.hget(DATASET_KEY, 'tesouro')
+    ) / 2 ** 20)
+    registrar(
+        'cache_redis_load',
+        medir(cache.load, repeticoes=repeticoes, memoria=False)
+    )
+
+    # Seleção padrão da barra lateral: um tipo, vencimentos a partir do
+    # ano atual e todo o período
+    index = dataset.index
+    tipo = index.tipos[0]
+    vencimentos = [
+        vencimento
+        for ano, datas in index.vencimentos_por_ano(tipo).items()
+        if ano >= date.today().year
+        for vencimento in datas
+    ]
+    medida = medir(
+        index.filter, tipo, vencimentos, index.data_min, index.data_max,
+        repeticoes=max(repeticoes, 10), memoria=False
+    )
+    filtrado = medida['resultado']
+    registrar('filtro_barra_lateral', medida, linhas=len(filtrado))
+
+    def figura():
+        _cached_line_figure.clear()
+        return build_taxa_figure(filtrado, 1500)
+
+    registrar(
+        'figura_taxas', medir(figura, repeticoes=repeticoes, memoria=False),
+        linhas=len(filtrado)
+    )
+    return resultados, df
+
+
+def bench_dolar(repeticoes):
+    """Série do dólar: busca completa (frio) e leitura do armazenamento."""
+    inicio, fim = date(2002, 1, 1), date.today()
+
+    def frio():
+        return load_dolar_data(
+            inicio, fim, DolarStore(_diretorio_novo('dolar'))
+        )
+
+    resultados = []
+    medida = medir(frio, repeticoes=repeticoes, memoria=False)
+    linhas = len(medida.pop('resultado'))
+    resultados.append({'benchmark': 'dolar_frio', **medida, 'linhas': linhas})
+
+    store = DolarStore(_diretorio_novo('dolar'))
+    load_dolar_data(inicio, fim, store)
+    medida = medir(
+        load_dolar_data, date(2020, 1, 1), fim, store,
+        repeticoes=max(repeticoes, 10), memoria=False
+    )
+    linhas = len(medida.pop('resultado'))
+    resultados.append({
+        'benchmark': 'dolar_quente', **medida, 'linhas': linhas
+    })
+    return resultados
+
+
+def bench_alertas(df, n, repeticoes):
+    """Avaliação, gravação e leitura de ``n`` alertas."""
+    alerts = gerar_alertas(n, df)
+    alerts.index = pd.Index(
+        [AlertStore.new_id() for _ in range(n)], name='id'
+    )
+    resultados = []
+
+    medida = medir(
+        lambda: evaluate_alerts(alerts, latest_quotes(df)),
+        repeticoes=repeticoes, memoria=False
+    )
+    acionados = len(medida.pop('resultado'))
+    resultados.append({
+        'benchmark': 'check_alerts', 'alertas': n, **medida,
+        'acionados': acionados,
+    })
+
+    index = AlertIndex(alerts)
+    quotes = latest_quotes(df)
+    medida = medir(
+        index.match_quotes, quotes, repeticoes=repeticoes, memoria=False
+    )
+    medida.pop('resultado')
+    resultados.append({
+        'benchmark': 'alert_index_match', 'alertas': n, **medida
+    })
+
+    registros = {
+        alert_id: alert
+        for alert_id, alert in zip(
+            alerts.index, alerts.to_dict('records')
+        )
+    }
+    redis_manager = RedisFalso()
+    store = AlertStore(redis_manager)
+
+    def salvar():
+        redis_manager.redis_client.flushall()
+        store.save_many(registros)
+
+    medida = medir(salvar, repeticoes=repeticoes, memoria=False)
+    medida.pop('resultado')
+    resultados.append({'benchmark': 'alertas_save', 'alertas': n, **medida})
+
+    medida = medir(store.load_all, repeticoes=repeticoes, memoria=False)
+    carregados = len(medida.pop('resultado'))
+    resultados.append({
+        'benchmark': 'alertas_load', 'alertas': carregados, **medida
+    })
+    return resultados
+
+
+def bench_smtp(alerts, repeticoes):
+    """Envio de ``EMAILS`` mensagens pelo pool de conexões SMTP."""
+    mensagens = [
+        build_alert_message({**alert, 'message': 'Preço atual acima'})
+        for alert in alerts[:EMAILS]
+    ]
+    with SMTPDescarte() as smtp:
+        dispatcher = EmailDispatcher(
+            host=smtp.host, port=smtp.port, user=None, password=None,
+            use_tls=False
+        )
+        medida = medir(
+            dispatcher.send, mensagens, repeticoes=repeticoes, memoria=False
+        )
+        dispatcher.close()
+        enviados = sum(r['enviado'] for r in medida.pop('resultado'))
+        return [{
+            'benchmark': 'smtp_envio', **medida,
+            'mensagens': len(mensagens), 'enviados': enviados,
+            'conexoes': smtp.conexoes,
+        }]
+
+
+def metadados():
+    """Contexto da execução, para comparar resultados ao longo do tempo."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def executar(args):
+    """Executa todos os benchmarks e retorna os resultados."""
+    resultados = []
+    with ServidorDados(porta=PORTA_HTTP) as servidor:
+        df = None
+        for escala in args.escala:
+            parciais, df_escala = bench_dados(
+                escala, servidor, args.repeticoes
+            )
+            resultados.extend(parciais)
+            df = df if df is not None else df_escala
+        resultados.extend(bench_dolar(args.repeticoes))
+    # Alertas sobre o menor volume (o custo depende dos pares, não das
+    # linhas)
+    resultados.extend(bench_alertas(df, args.alertas, args.repeticoes))
+    resultados.extend(bench_smtp(
+        gerar_alertas(EMAILS, df).to_dict('records'), args.repeticoes
+    ))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--escala', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--alertas', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', help='Arquivo JSON de resultados')
+    parser.add_argument('--json', action='store_true',
+                        help='Emite os resultados em JSON')
+    args = parser.parse_args()
+
+    try:
+        resultados = executar(args)
+    finally:
+        shutil.rmtree(DIRETORIO, ignore_errors=True)
+
+    saida = {'meta': metadados(), 'resultados': resultados}
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(saida, f, indent=2, default=str)
+    if args.json:
+        print(json.dumps(saida, indent=2, default=str))
+        return
+    for r in resultados:
+        extras = ' '.join(
+            f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in r.items()
+            if k not in ('benchmark', 'tempo_s', 'pico_mib')
+        )
+        print(f"{r['benchmark']:<22} tempo={r['tempo_s']:.4f}s {extras}")
+
+
+if __name__ == '__main__':
+    main()
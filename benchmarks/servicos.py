@@ -0,0 +1,194 @@
+"""
+Substitutos locais dos serviços externos usados pelos benchmarks: um
+servidor HTTP com o CSV do Tesouro e a série do BCB, um Redis em memória
+(``fakeredis``) e um servidor SMTP que descarta as mensagens.
+
+Deve ser importado depois de ``_comum``, que ajusta o ``sys.path``.
+"""
+import hashlib
+import socketserver
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import fakeredis
+
+from sintetico import gerar_dolar_json
+from utils.redis import RedisManager
+
+
+class ServidorDados:
+    """
+    Servidor HTTP local no lugar do Tesouro Transparente e do BCB.
+
+    ``/tesouro.csv`` responde o CSV informado, com ``ETag`` (e 304 para
+    ``If-None-Match`` igual); ``/bcb`` gera a série do dólar do período
+    pedido em ``dataInicial``/``dataFinal``. As ``falhas`` requisições
+    seguintes são respondidas com 503, para simular instabilidade.
+    """
+
+    def __init__(self, csv_bytes=b'', porta=0):
+        self.csv_bytes = csv_bytes
+        self.requisicoes = 0
+        self.falhas = 0
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                servidor.requisicoes += 1
+                url = urlparse(self.path)
+                if servidor.falhas:
+                    servidor.falhas -= 1
+                    self._responder(503, b'Indisponivel')
+                elif url.path == '/tesouro.csv':
+                    self._tesouro()
+                elif url.path == '/bcb':
+                    self._bcb(parse_qs(url.query))
+                else:
+                    self._responder(404, b'')
+
+            def _tesouro(self):
+                etag = servidor.etag
+                if self.headers.get('If-None-Match') == etag:
+                    self._responder(304, b'', {'ETag': etag})
+                    return
+                self._responder(200, servidor.csv_bytes, {
+                    'ETag': etag,
+                    'Content-Type': 'text/csv; charset=latin-1',
+                })
+
+            def _bcb(self, query):
+                inicio = datetime.strptime(query['dataInicial'][0], '%d/%m/%Y')
+                fim = datetime.strptime(query['dataFinal'][0], '%d/%m/%Y')
+                self._responder(200, gerar_dolar_json(inicio, fim), {
+                    'Content-Type': 'application/json',
+                })
+
+            def _responder(self, status, corpo, headers=None):
+                self.send_response(status)
+                for nome, valor in (headers or {}).items():
+                    self.send_header(nome, valor)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                if corpo:
+                    self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', porta), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def etag(self):
+        return '"' + hashlib.md5(self.csv_bytes).hexdigest() + '"'
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RedisFalso(RedisManager):
+    """``RedisManager`` sobre um Redis em memória (``fakeredis``)."""
+
+    def __init__(self, decode_responses=True):
+        self.redis_client = fakeredis.FakeRedis(
+            decode_responses=decode_responses
+        )
+
+
+class SMTPDescarte:
+    """
+    Servidor SMTP mínimo que aceita e descarta as mensagens (sem TLS nem
+    autenticação), contando as entregas.
+
+    Para simular falhas, ``recusas`` associa um destinatário às respostas
+    dadas aos próximos ``RCPT TO`` dele (ex.: ``['451 Tente depois']``), e
+    ``desconexoes`` é a quantidade de ``DATA`` seguintes respondidos com o
+    fechamento da conexão.
+    """
+
+    def __init__(self):
+        self.mensagens = 0
+        self.conexoes = 0
+        self.recusas = {}
+        self.desconexoes = 0
+        servidor = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                servidor.conexoes += 1
+                self._linha('220 localhost SMTP descarte')
+                while True:
+                    comando = self.rfile.readline()
+                    if not comando:
+                        return
+                    verbo = comando[:4].upper()
+                    if verbo in (b'EHLO', b'HELO'):
+                        self._linha('250-localhost')
+                        self._linha('250 SIZE 10485760')
+                    elif verbo == b'RCPT':
+                        self._rcpt(comando)
+                    elif verbo == b'DATA':
+                        if servidor.desconexoes:
+                            servidor.desconexoes -= 1
+                            return
+                        self._linha('354 Fim com <CRLF>.<CRLF>')
+                        while self.rfile.readline() not in (b'.\r\n', b''):
+                            pass
+                        servidor.mensagens += 1
+                        self._linha('250 OK')
+                    elif verbo == b'QUIT':
+                        self._linha('221 Tchau')
+                        return
+                    else:
+                        # MAIL, RSET, NOOP
+                        self._linha('250 OK')
+
+            def _rcpt(self, comando):
+                texto = comando.decode('ascii', 'replace')
+                destinatario = texto[texto.find('<') + 1:texto.rfind('>')]
+                respostas = servidor.recusas.get(destinatario)
+                self._linha(respostas.pop(0) if respostas else '250 OK')
+
+            def _linha(self, texto):
+                self.wfile.write(texto.encode('ascii') + b'\r\n')
+
+        self._server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), Handler
+        )
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
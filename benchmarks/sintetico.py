@@ -0,0 +1,114 @@
+"""
+Geradores de dados sintéticos no formato das fontes reais, usados pelos
+benchmarks sem acesso às APIs do governo.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+
+TIPOS_TITULO = {
+    'Tesouro Selic': (2027, 2031, 15000.0, 0.10),
+    'Tesouro Prefixado': (2026, 2035, 800.0, 11.5),
+    'Tesouro Prefixado com Juros Semestrais': (2027, 2035, 1000.0, 11.8),
+    'Tesouro IPCA+': (2026, 2050, 3000.0, 6.2),
+    'Tesouro IPCA+ com Juros Semestrais': (2026, 2060, 4200.0, 6.0),
+    'Tesouro IGPM+ com Juros Semestrais': (2031, 2031, 5000.0, 5.8),
+}
+
+
+def gerar_tesouro_df(escala=1, data_inicio='2002-01-01', data_fim=None,
+                     seed=42):
+    """
+    Gera um DataFrame bruto (datas em texto) no formato do
+    ``PrecoTaxaTesouroDireto.csv``.
+
+    Na escala 1 o volume é próximo ao do arquivo real; escalas maiores
+    multiplicam a quantidade de vencimentos por tipo de título.
+    """
+    rng = np.random.default_rng(seed)
+    datas = pd.bdate_range(data_inicio, data_fim or pd.Timestamp.today())
+    partes = []
+    for tipo, (ano_ini, ano_fim, pu, taxa) in TIPOS_TITULO.items():
+        anos = np.arange(ano_ini, ano_fim + 1)
+        vencimentos = [pd.Timestamp(int(ano), 1, 1) for ano in anos]
+        for i in range(escala):
+            for vencimento in vencimentos:
+                vencimento = vencimento + pd.Timedelta(days=15 * i)
+                # Cada título é negociado nos ~12 anos antes do vencimento
+                datas_titulo = datas[
+                    (datas < vencimento) &
+                    (datas >= vencimento - pd.DateOffset(years=12))
+                ]
+                n = len(datas_titulo)
+                if n == 0:
+                    continue
+                taxas = taxa + np.cumsum(rng.normal(0, 0.02, n))
+                precos = pu * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+                partes.append(pd.DataFrame({
+                    'Tipo Titulo': tipo,
+                    'Data Vencimento': vencimento.strftime('%d/%m/%Y'),
+                    'Data Base': datas_titulo.strftime('%d/%m/%Y'),
+                    'Taxa Compra Manha': taxas.round(2),
+                    'Taxa Venda Manha': (taxas + 0.12).round(2),
+                    'PU Compra Manha': precos.round(2),
+                    'PU Venda Manha': (precos * 0.998).round(2),
+                    'PU Base Manha': (precos * 0.997).round(2),
+                }))
+    return pd.concat(partes, ignore_index=True)
+
+
+def gerar_tesouro_csv(escala=1, **kwargs):
+    """Gera o conteúdo (bytes) de um CSV sintético do Tesouro Direto."""
+    df = gerar_tesouro_df(escala=escala, **kwargs)
+    return df.to_csv(sep=';', decimal=',', index=False).encode('latin-1')
+
+
+def gerar_alertas(n, tesouro_df, seed=42):
+    """
+    Gera ``n`` alertas para pares (tipo, ano de vencimento) existentes em
+    ``tesouro_df`` (já processado), com critérios preenchidos ao acaso.
+    """
+    rng = np.random.default_rng(seed)
+    pares = (
+        tesouro_df[['Tipo Titulo', 'Ano Vencimento']]
+        .drop_duplicates()
+        .to_numpy()
+    )
+    escolhidos = pares[rng.integers(0, len(pares), n)]
+
+    def criterio(minimo, maximo):
+        valores = rng.uniform(minimo, maximo, n).round(2)
+        return np.where(rng.random(n) < 0.5, valores, np.nan)
+
+    return pd.DataFrame({
+        'nome': [f'Usuário {i}' for i in range(n)],
+        'email': [f'usuario{i}@exemplo.com' for i in range(n)],
+        'tipo_titulo': escolhidos[:, 0].astype(str),
+        'ano_vencimento': escolhidos[:, 1].astype(int),
+        'preco_min': criterio(0, 20000),
+        'preco_max': criterio(0, 20000),
+        'taxa_min': criterio(0, 15),
+        'taxa_max': criterio(0, 15),
+        'data_criacao': pd.Timestamp('2025-01-01'),
+    })
+
+
+def gerar_dolar_json(data_inicio, data_fim, seed=42):
+    """
+    Gera o conteúdo (bytes) de uma resposta da série 10813 do SGS/BCB,
+    com uma cotação por dia útil do período.
+    """
+    datas = pd.bdate_range(data_inicio, data_fim)
+    if not len(datas):
+        return b'[]'
+    # Semente derivada da data inicial: a mesma janela gera a mesma série
+    rng = np.random.default_rng(seed + datas[0].toordinal())
+    valores = 2.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.008, len(datas))))
+    return json.dumps([
+        {'data': data, 'valor': valor}
+        for data, valor in zip(
+            datas.strftime('%d/%m/%Y'), np.char.mod('%.4f', valores)
+        )
+    ]).encode('utf-8')
@@ -0,0 +1,15 @@
+from .manager import AlertManager
+from .engine import latest_quotes, evaluate_alerts
+from .index import AlertIndex
+from .parallel import evaluate_alerts_parallel
+from .dispatcher import EmailDispatcher, build_alert_message
+
+__all__ = [
+    'AlertManager',
+    'latest_quotes',
+    'evaluate_alerts',
+    'evaluate_alerts_parallel',
+    'AlertIndex',
+    'EmailDispatcher',
+    'build_alert_message'
+]
@@ -0,0 +1,226 @@
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from config import (
+    SMTP_SERVER, SMTP_PORT, EMAIL_USER, EMAIL_PASSWORD, EMAIL_FROM,
+    SMTP_USE_TLS, SMTP_TIMEOUT, SMTP_POOL_SIZE, SMTP_BATCH_SIZE,
+    SMTP_MAX_RETRIES, SMTP_RETRY_BACKOFF
+)
+from utils.metrics import observe, increment
+
+
+def _connection_errors():
+    """
+    Erros de conexão, após os quais a sessão SMTP é descartada. O
+    ``smtplib`` (e o ``ssl``) só é importado no primeiro envio.
+    """
+    import smtplib
+
+    return (
+        smtplib.SMTPServerDisconnected,
+        smtplib.SMTPConnectError,
+        ConnectionError,
+        TimeoutError,
+    )
+
+
+def build_alert_message(alert, sender=EMAIL_FROM):
+    """
+    Monta o email de um alerta acionado.
+
+    Args:
+        alert (dict | pd.Series): Dados do alerta acionado
+        sender (str): Remetente do email
+
+    Returns:
+        MIMEMultipart: Mensagem pronta para envio
+    """
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = alert['email']
+    titulo = f"{alert['tipo_titulo']} ({alert['ano_vencimento']})"
+    msg['Subject'] = f"Alerta Tesouro Direto - {titulo} foi acionado!"
+
+    # Corpo do email
+    body = f"""
+        Olá {alert['nome']},
+
+        Seu alerta para o título {titulo} foi acionado!
+
+        Motivo:\n\n {alert['message']}
+
+        Atenciosamente,
+        Sistema de Alertas Tesouro Direto
+        """
+
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+def _is_connection_error(error):
+    """Indica se o erro deixou a sessão SMTP inutilizável."""
+    import smtplib
+
+    return isinstance(error, _connection_errors()) or (
+        isinstance(error, OSError) and
+        not isinstance(error, smtplib.SMTPException)
+    )
+
+
+def _is_transient(error):
+    """Indica se vale a pena tentar novamente após o erro."""
+    import smtplib
+
+    if _is_connection_error(error):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(
+            400 <= code < 500 for code, _ in error.recipients.values()
+        )
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return False
+
+
+class EmailDispatcher:
+    """
+    Envia emails reaproveitando sessões SMTP autenticadas.
+
+    As mensagens são divididas em lotes; cada lote é enviado por uma
+    única conexão retirada de um pool, com até ``pool_size`` lotes em
+    paralelo. Falhas transitórias (desconexões, códigos 4xx) são repetidas
+    com backoff exponencial e jitter; o resultado é informado por
+    destinatário.
+    """
+
+    def __init__(
+        self, host=SMTP_SERVER, port=SMTP_PORT, user=EMAIL_USER,
+        password=EMAIL_PASSWORD, use_tls=SMTP_USE_TLS, timeout=SMTP_TIMEOUT,
+        pool_size=SMTP_POOL_SIZE, batch_size=SMTP_BATCH_SIZE,
+        max_retries=SMTP_MAX_RETRIES, backoff=SMTP_RETRY_BACKOFF
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._pool = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def send(self, messages):
+        """
+        Envia várias mensagens.
+
+        Args:
+            messages (list): Mensagens (``email.message.Message``)
+
+        Returns:
+            list: Um dict por mensagem com ``email``, ``enviado``,
+            ``tentativas``, ``erro`` (None em caso de sucesso) e
+            ``transitorio`` (se a falha foi transitória e vale tentar
+            mais tarde), na mesma ordem de ``messages``
+        """
+        lotes = [
+            messages[inicio:inicio + self.batch_size]
+            for inicio in range(0, len(messages), self.batch_size)
+        ]
+        if len(lotes) <= 1:
+            return [r for lote in lotes for r in self._send_batch(lote)]
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            resultados = executor.map(self._send_batch, lotes)
+            return [r for lote in resultados for r in lote]
+
+    def close(self):
+        """Encerra as sessões SMTP mantidas no pool."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(conn)
+
+    def _connect(self):
+        import smtplib
+
+        increment('smtp_connections')
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()  # Identificação com o servidor
+        if self.use_tls:
+            conn.starttls()  # Iniciar TLS
+            conn.ehlo()  # Reidentificação após TLS
+        if self.user and self.password:
+            conn.login(self.user, self.password)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, conn):
+        with self._lock:
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+                return
+        self._quit(conn)
+
+    @staticmethod
+    def _quit(conn):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _send_batch(self, batch):
+        resultados = []
+        conn = None
+        for msg in batch:
+            tentativas = 0
+            inicio = time.perf_counter()
+            while True:
+                tentativas += 1
+                try:
+                    if conn is None:
+                        conn = self._acquire()
+                    conn.send_message(msg)
+                    observe('smtp_send', time.perf_counter() - inicio)
+                    increment('smtp_messages', resultado='enviado')
+                    resultados.append({
+                        'email': msg['To'], 'enviado': True,
+                        'tentativas': tentativas, 'erro': None,
+                        'transitorio': False
+                    })
+                    break
+                except Exception as e:
+                    if _is_connection_error(e) and conn is not None:
+                        conn.close()
+                        conn = None
+                    if _is_transient(e) and tentativas <= self.max_retries:
+                        increment('smtp_retries')
+                        time.sleep(self._delay(tentativas))
+                        continue
+                    increment('smtp_messages', resultado='falha')
+                    resultados.append({
+                        'email': msg['To'], 'enviado': False,
+                        'tentativas': tentativas, 'erro': str(e),
+                        'transitorio': _is_transient(e)
+                    })
+                    break
+        if conn is not None:
+            self._release(conn)
+        return resultados
+
+    def _delay(self, tentativa):
+        """Backoff exponencial com jitter ("full jitter")."""
+        return random.uniform(0, self.backoff * 2 ** (tentativa - 1))
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from data.tesouro import TESOURO_DECIMALS
+
+
+ALERT_KEYS = ['tipo_titulo', 'ano_vencimento']
+THRESHOLD_COLUMNS = ['preco_min', 'preco_max', 'taxa_min', 'taxa_max']
+QUOTE_COLUMNS = ['Data Base', 'PU Compra Manha', 'Taxa Compra Manha']
+
+# Trechos fixos da mensagem de cada critério: (antes do valor atual,
+# entre o valor atual e o limite, depois do limite)
+MESSAGE_TEMPLATES = {
+    'preco_min': ("Preço atual (R$ ", ") acima do mínimo (R$ ", ")\n"),
+    'preco_max': ("Preço atual (R$ ", ") abaixo do máximo (R$ ", ")\n"),
+    'taxa_min': ("Taxa atual (", "%) acima do mínimo (", "%)\n"),
+    'taxa_max': ("Taxa atual (", "%) abaixo do máximo (", "%)\n"),
+}
+
+
+def latest_quotes(df):
+    """
+    Obtém a cotação mais recente (maior Data Base) de cada par
+    (tipo de título, ano de vencimento).
+
+    Preços e taxas, lidos em float32, voltam a float64 arredondados às
+    casas decimais do CSV: os limites dos alertas são comparados com os
+    valores publicados, e não com a aproximação em float32.
+
+    Args:
+        df (pd.DataFrame): DataFrame com os dados do Tesouro Direto
+
+    Returns:
+        pd.DataFrame: Cotações indexadas por (tipo_titulo, ano_vencimento)
+    """
+    ordenado = df.sort_values('Data Base', kind='stable')
+    latest = ordenado.drop_duplicates(
+        ['Tipo Titulo', 'Ano Vencimento'], keep='last'
+    )
+    latest = pd.DataFrame({
+        'tipo_titulo': latest['Tipo Titulo'].astype(str).to_numpy(),
+        'ano_vencimento': latest['Ano Vencimento'].astype('int64').to_numpy(),
+        **{col: _source_values(latest[col]) for col in QUOTE_COLUMNS}
+    })
+    return latest.set_index(ALERT_KEYS)
+
+
+def _source_values(coluna):
+    decimais = TESOURO_DECIMALS.get(coluna.name)
+    if decimais is None:
+        return coluna.to_numpy()
+    return coluna.to_numpy(dtype='float64').round(decimais)
+
+
+def evaluate_alerts(alerts, quotes):
+    """
+    Avalia todos os alertas de uma vez contra as cotações mais recentes.
+
+    Os alertas são unidos às cotações por (tipo_titulo, ano_vencimento) e
+    cada critério vira uma máscara booleana; as mensagens são montadas
+    apenas para os alertas acionados.
+
+    Args:
+        alerts (pd.DataFrame): Alertas cadastrados
+        quotes (pd.DataFrame): Resultado de ``latest_quotes``
+
+    Returns:
+        pd.DataFrame: Alertas acionados, com a coluna ``message``
+    """
+    if alerts.empty or quotes.empty:
+        return _empty_result(alerts)
+
+    chaves = pd.DataFrame({
+        'tipo_titulo': alerts['tipo_titulo'].astype(str),
+        'ano_vencimento': pd.to_numeric(
+            alerts['ano_vencimento'], errors='coerce'
+        ).astype('Int64'),
+    }, index=alerts.index)
+    cotacoes = chaves.join(quotes, on=ALERT_KEYS, how='inner')
+    if cotacoes.empty:
+        return _empty_result(alerts)
+
+    candidatos = alerts.loc[cotacoes.index]
+    preco = cotacoes['PU Compra Manha'].to_numpy(dtype='float64')
+    taxa = cotacoes['Taxa Compra Manha'].to_numpy(dtype='float64')
+    limites = {
+        col: pd.to_numeric(candidatos[col], errors='coerce')
+        .to_numpy(dtype='float64')
+        for col in THRESHOLD_COLUMNS
+    }
+
+    acionado, message = evaluate_thresholds(preco, taxa, limites)
+    triggered = candidatos[acionado].copy()
+    if triggered.empty:
+        return _empty_result(alerts)
+    triggered['message'] = message
+    return triggered
+
+
+def evaluate_thresholds(preco, taxa, limites):
+    """
+    Compara as cotações de cada alerta com seus limites e monta as
+    mensagens dos acionados.
+
+    Args:
+        preco (np.ndarray): Preço de compra da cotação de cada alerta
+        taxa (np.ndarray): Taxa de compra da cotação de cada alerta
+        limites (dict): Coluna de ``THRESHOLD_COLUMNS`` -> limites (float,
+            NaN quando vazio)
+
+    Returns:
+        tuple: (máscara dos alertas acionados, mensagens dos acionados)
+    """
+    # Comparações com NaN são falsas, o que descarta critérios vazios
+    with np.errstate(invalid='ignore'):
+        mascaras = {
+            'preco_min': preco >= limites['preco_min'],
+            'preco_max': preco <= limites['preco_max'],
+            'taxa_min': taxa >= limites['taxa_min'],
+            'taxa_max': taxa <= limites['taxa_max'],
+        }
+    acionado = np.logical_or.reduce(list(mascaras.values()))
+
+    valores = {'preco': preco[acionado], 'taxa': taxa[acionado]}
+    message = np.full(int(acionado.sum()), '', dtype=object)
+    for criterio in THRESHOLD_COLUMNS:
+        # Formata apenas as linhas em que o critério foi acionado
+        linhas = np.flatnonzero(mascaras[criterio][acionado])
+        if not len(linhas):
+            continue
+        modelo = MESSAGE_TEMPLATES[criterio]
+        valor = _format(valores[criterio.split('_')[0]][linhas])
+        limite = _format(limites[criterio][acionado][linhas])
+        texto = modelo[0] + valor + modelo[1] + limite + modelo[2]
+        anteriores = message[linhas]
+        message[linhas] = np.where(
+            anteriores != '', anteriores + ' ', ''
+        ) + texto
+    return acionado, message
+
+
+def _format(values):
+    """Formata valores com duas casas decimais."""
+    return np.char.mod('%.2f', values).astype(object)
+
+
+def _empty_result(alerts):
+    """Resultado vazio com as colunas dos alertas e ``message``."""
+    return alerts.iloc[:0].assign(message=pd.Series(dtype=object))
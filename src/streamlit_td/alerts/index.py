@@ -0,0 +1,189 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from .engine import THRESHOLD_COLUMNS
+
+
+class AlertIndex:
+    """
+    Índice em memória dos limites dos alertas.
+
+    Para cada par (tipo_titulo, ano_vencimento), cada critério guarda os
+    limites em uma lista ordenada, ao lado dos IDs correspondentes. Como
+    ``preco_min``/``taxa_min`` acionam quando o valor atual é maior ou
+    igual ao limite e ``preco_max``/``taxa_max`` quando é menor ou igual,
+    os alertas acionados por uma cotação são um prefixo ou um sufixo de
+    cada lista, encontrados por busca binária: o custo depende da
+    quantidade de alertas acionados, não do total cadastrado.
+    """
+
+    def __init__(self, alerts=None):
+        self._pares = {}
+        # Alertas de cada par, inclusive os sem nenhum limite preenchido
+        self._membros = {}
+        self._limites = {}
+        if alerts is not None:
+            self.build(alerts)
+
+    def __len__(self):
+        return len(self._limites)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._limites
+
+    @staticmethod
+    def pair(tipo_titulo, ano_vencimento):
+        """Chave de um par (tipo_titulo, ano_vencimento) no índice."""
+        return str(tipo_titulo), int(ano_vencimento)
+
+    def build(self, alerts):
+        """
+        Reconstrói o índice a partir do DataFrame de alertas.
+
+        Args:
+            alerts (pd.DataFrame): Alertas indexados pelo ID
+        """
+        self._pares = {}
+        self._membros = {}
+        self._limites = {}
+        if alerts.empty:
+            return
+        anos = pd.to_numeric(alerts['ano_vencimento'], errors='coerce')
+        validos = alerts[anos.notna()]
+        limites = {
+            col: pd.to_numeric(validos[col], errors='coerce')
+            .to_numpy(dtype='float64')
+            for col in THRESHOLD_COLUMNS
+        }
+        ids = validos.index.to_numpy()
+        chaves = pd.DataFrame({
+            'tipo_titulo': validos['tipo_titulo'].astype(str).to_numpy(),
+            'ano_vencimento': anos[anos.notna()].astype('int64').to_numpy(),
+        })
+        for (tipo, ano), posicoes in chaves.groupby(
+            ['tipo_titulo', 'ano_vencimento'], sort=False
+        ).indices.items():
+            par = self.pair(tipo, ano)
+            entrada = {}
+            for col in THRESHOLD_COLUMNS:
+                valores = limites[col][posicoes]
+                preenchidos = ~np.isnan(valores)
+                ordem = np.argsort(valores[preenchidos], kind='stable')
+                entrada[col] = (
+                    valores[preenchidos][ordem].tolist(),
+                    ids[posicoes][preenchidos][ordem].tolist(),
+                )
+            self._pares[par] = entrada
+            self._membros[par] = len(posicoes)
+            for posicao in posicoes:
+                self._limites[ids[posicao]] = (par, {
+                    col: limites[col][posicao] for col in THRESHOLD_COLUMNS
+                })
+
+    def add(self, alert_id, alert):
+        """
+        Inclui (ou substitui) um alerta no índice.
+
+        Args:
+            alert_id (str): ID do alerta
+            alert (dict | pd.Series): Campos do alerta
+        """
+        if alert_id in self._limites:
+            self.remove(alert_id)
+        par = self.pair(alert['tipo_titulo'], alert['ano_vencimento'])
+        entrada = self._pares.setdefault(
+            par, {col: ([], []) for col in THRESHOLD_COLUMNS}
+        )
+        self._membros[par] = self._membros.get(par, 0) + 1
+        limites = {}
+        for col in THRESHOLD_COLUMNS:
+            valor = pd.to_numeric(alert.get(col), errors='coerce')
+            valor = float(valor) if pd.notna(valor) else np.nan
+            limites[col] = valor
+            if np.isnan(valor):
+                continue
+            valores, ids = entrada[col]
+            posicao = bisect_right(valores, valor)
+            valores.insert(posicao, valor)
+            ids.insert(posicao, alert_id)
+        self._limites[alert_id] = (par, limites)
+
+    def remove(self, alert_id):
+        """
+        Retira um alerta do índice.
+
+        Returns:
+            bool: False se o alerta não estava no índice
+        """
+        registro = self._limites.pop(alert_id, None)
+        if registro is None:
+            return False
+        par, limites = registro
+        entrada = self._pares.get(par)
+        if entrada is not None:
+            for col, valor in limites.items():
+                if np.isnan(valor):
+                    continue
+                valores, ids = entrada[col]
+                posicao = bisect_left(valores, valor)
+                fim = bisect_right(valores, valor)
+                posicao += ids[posicao:fim].index(alert_id)
+                del valores[posicao]
+                del ids[posicao]
+        # O par só sai do índice com o último alerta que o referencia
+        self._membros[par] -= 1
+        if not self._membros[par]:
+            del self._membros[par]
+            self._pares.pop(par, None)
+        return True
+
+    def match(self, tipo_titulo, ano_vencimento, preco, taxa):
+        """
+        IDs dos alertas de um par acionados por uma cotação.
+
+        Args:
+            tipo_titulo (str): Tipo do título
+            ano_vencimento (int): Ano de vencimento
+            preco (float): Preço atual (PU Compra Manhã)
+            taxa (float): Taxa atual (Taxa Compra Manhã)
+
+        Returns:
+            set: IDs dos alertas acionados
+        """
+        entrada = self._pares.get(self.pair(tipo_titulo, ano_vencimento))
+        if entrada is None:
+            return set()
+        acionados = set()
+        for atual, minimo, maximo in (
+            (preco, 'preco_min', 'preco_max'),
+            (taxa, 'taxa_min', 'taxa_max'),
+        ):
+            if atual is None or np.isnan(atual):
+                continue
+            valores, ids = entrada[minimo]
+            acionados.update(ids[:bisect_right(valores, atual)])
+            valores, ids = entrada[maximo]
+            acionados.update(ids[bisect_left(valores, atual):])
+        return acionados
+
+    def match_quotes(self, quotes):
+        """
+        IDs dos alertas acionados pelas cotações informadas.
+
+        Args:
+            quotes (pd.DataFrame): Resultado de ``latest_quotes``
+
+        Returns:
+            list: IDs dos alertas acionados
+        """
+        acionados = set()
+        for (tipo, ano), preco, taxa in zip(
+            quotes.index,
+            quotes['PU Compra Manha'].to_numpy(dtype='float64'),
+            quotes['Taxa Compra Manha'].to_numpy(dtype='float64'),
+        ):
+            if self.pair(tipo, ano) in self._pares:
+                acionados.update(self.match(tipo, ano, preco, taxa))
+        return list(acionados)
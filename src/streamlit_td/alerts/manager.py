@@ -0,0 +1,343 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from config import EMAIL_USER, EMAIL_PASSWORD, ALERT_COOLDOWN
+from utils.metrics import timed
+from utils.redis import RedisManager
+from .dispatcher import EmailDispatcher, build_alert_message
+from .engine import latest_quotes, ALERT_KEYS
+from .index import AlertIndex
+from .parallel import evaluate_alerts_parallel
+from .storage import AlertStore
+
+
+class AlertManager:
+    def __init__(self):
+        """Inicializa o gerenciador de alertas."""
+        self.redis_manager = RedisManager()
+        self.store = AlertStore(self.redis_manager)
+        self.dispatcher = EmailDispatcher()
+        # A instância é compartilhada entre sessões do Streamlit
+        self._lock = threading.RLock()
+        self._version = self._load_version()
+        self.alerts = self._load_alerts()
+        # Índice dos limites por par (tipo, ano), mantido junto com alerts
+        self.index = AlertIndex(self.alerts)
+
+    @timed('alerts_load')
+    def _load_alerts(self):
+        """Carrega os alertas do Redis."""
+        try:
+            return self.store.load_all()
+        except Exception as e:
+            print(f"Erro ao carregar alertas: {str(e)}")
+        return self.store.empty_frame()
+
+    def _load_version(self):
+        try:
+            return self.store.version()
+        except Exception as e:
+            print(f"Erro ao ler versão dos alertas: {str(e)}")
+            return None
+
+    def reload(self):
+        """Recarrega os alertas do Redis (ex.: criados por outra sessão)."""
+        version = self._load_version()
+        alerts = self._load_alerts()
+        index = AlertIndex(alerts)
+        with self._lock:
+            self.alerts = alerts
+            self.index = index
+            self._version = version
+
+    def sync(self):
+        """
+        Recarrega os alertas apenas se eles mudaram no Redis desde a última
+        leitura (ex.: importados pela API).
+
+        Returns:
+            bool: True se os alertas foram recarregados
+        """
+        version = self._load_version()
+        if version is None or version == self._version:
+            return False
+        self.reload()
+        return True
+
+    def _advance_version(self, version):
+        """
+        Acompanha a versão após uma alteração feita por esta instância; se
+        houve outras alterações no meio, a próxima ``sync`` recarrega.
+        """
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def add_alert(
+        self, nome, email, tipo_titulo, ano_vencimento,
+        preco_min=None, preco_max=None, taxa_min=None, taxa_max=None
+    ):
+        """
+        Adiciona um novo alerta.
+        
+        Args:
+            nome (str): Nome do usuário
+            email (str): Email do usuário
+            tipo_titulo (str): Tipo do título do Tesouro Direto
+            ano_vencimento (int): Ano de vencimento do título
+            preco_min (float, optional): Preço mínimo para alerta
+            preco_max (float, optional): Preço máximo para alerta
+            taxa_min (float, optional): Taxa mínima para alerta
+            taxa_max (float, optional): Taxa máxima para alerta
+
+        Returns:
+            str | None: ID do alerta criado ou None em caso de erro
+        """
+        new_alert = {
+            'nome': nome,
+            'email': email,
+            'tipo_titulo': tipo_titulo,
+            'ano_vencimento': int(ano_vencimento),
+            'preco_min': preco_min,
+            'preco_max': preco_max,
+            'taxa_min': taxa_min,
+            'taxa_max': taxa_max,
+            'data_criacao': datetime.now()
+        }
+        alert_id = self.store.new_id()
+
+        try:
+            version = self.store.save(alert_id, new_alert, pending=True)
+        except Exception as e:
+            print(f"Erro ao salvar alerta: {str(e)}")
+            return None
+
+        novo = self.store.normalize(
+            pd.DataFrame([new_alert], index=[alert_id])
+        )
+        with self._lock:
+            self.alerts = _concat_alerts(self.alerts, novo)
+            self.index.add(alert_id, new_alert)
+            self._advance_version(version)
+        return alert_id
+
+    def remove_alert(self, alert_id):
+        """Remove um alerta pelo ID.
+        
+        Args:
+            alert_id (str): ID do alerta a ser removido
+        """
+        with self._lock:
+            if alert_id not in self.alerts.index:
+                return False
+            alert = self.alerts.loc[alert_id]
+            try:
+                version = self.store.delete(
+                    alert_id, alert['tipo_titulo'], alert['ano_vencimento']
+                )
+            except Exception as e:
+                print(f"Erro ao remover alerta: {str(e)}")
+                return False
+            self.alerts = self.alerts.drop(alert_id)
+            self.index.remove(alert_id)
+            self._advance_version(version)
+            return True
+
+    def check_alerts(self, df):
+        """
+        Verifica se algum alerta foi acionado com base nos dados fornecidos.
+        
+        Args:
+            df (pd.DataFrame): DataFrame com os dados do Tesouro Direto
+        
+        Returns:
+            list: Lista de alertas acionados
+        """
+        quotes = latest_quotes(df)
+        with self._lock:
+            alerts = self.alerts
+        triggered = self._evaluate(alerts, quotes)
+        return triggered.reset_index().to_dict('records')
+    
+    @timed('alerts_check')
+    def check_new_alerts(self, df, now=None):
+        """
+        Verifica os alertas de forma incremental, disparando apenas nas
+        transições de estado.
+
+        Só são avaliados os alertas dos pares (tipo, ano) que receberam
+        cotação nova desde a última verificação, além dos marcados como
+        pendentes; entre eles, o índice seleciona os acionados. Um alerta
+        é retornado apenas quando passa de não acionado para acionado e já
+        passou o intervalo ``ALERT_COOLDOWN`` desde o último disparo.
+
+        Um alerta acionado durante o cooldown continua como não acionado
+        e é notificado na primeira verificação após o cooldown em que
+        ainda estiver acionado. Os pendentes só são desmarcados depois que
+        o estado é gravado: se a verificação falhar, eles voltam a ser
+        avaliados na próxima.
+
+        Args:
+            df (pd.DataFrame): DataFrame com os dados do Tesouro Direto
+            now (datetime, optional): Momento da verificação
+
+        Returns:
+            list: Alertas que devem ser notificados
+        """
+        now = now or datetime.now()
+        # Mantém o índice igual ao Redis (ex.: alertas importados pela API)
+        self.sync()
+        quotes = latest_quotes(df)
+        watermarks = self.store.load_watermarks()
+        campos = [self.store.pair_field(*par) for par in quotes.index]
+        ultimas = pd.to_datetime(
+            pd.Series([watermarks.get(campo) for campo in campos],
+                      index=quotes.index),
+            errors='coerce'
+        )
+        novas = ultimas.isna() | (quotes['Data Base'] > ultimas)
+
+        alerts = self.store.load_for(quotes.index[novas])
+        marcados = self.store.load_pending()
+        pendentes = [
+            alert_id for alert_id in marcados
+            if alert_id not in alerts.index
+        ]
+        if pendentes:
+            alerts = _concat_alerts(alerts, self.store.load_ids(pendentes))
+
+        novas_datas = {
+            campo: data
+            for campo, data, nova in zip(campos, quotes['Data Base'], novas)
+            if nova
+        }
+        if alerts.empty:
+            self.store.save_watermarks(novas_datas)
+            self.store.remove_pending(marcados)
+            return []
+
+        triggered = self._evaluate(alerts, quotes)
+        vazio = pd.Series(None, index=alerts.index, dtype=object)
+        acionado = alerts.index.isin(triggered.index)
+        anterior = (alerts.get('estado_acionado', vazio) == '1').to_numpy()
+        ultimo_disparo = pd.to_datetime(
+            alerts.get('ultimo_disparo', vazio), errors='coerce'
+        )
+        fora_cooldown = (
+            ultimo_disparo.isna() |
+            (now - ultimo_disparo >= timedelta(seconds=ALERT_COOLDOWN))
+        ).to_numpy()
+        emitir = acionado & ~anterior & fora_cooldown
+        # Acionado só depois de notificado: no cooldown o estado fica em 0
+        estado = acionado & (anterior | emitir)
+
+        # Estado persistido: última Data Base avaliada e, para os alertas
+        # notificados, o momento e os valores do disparo
+        cotacoes = alerts[ALERT_KEYS].join(quotes, on=ALERT_KEYS)
+        updates = {}
+        for alert_id, acionado_agora, emitido, data, preco, taxa in zip(
+            alerts.index, estado, emitir, cotacoes['Data Base'],
+            cotacoes['PU Compra Manha'], cotacoes['Taxa Compra Manha']
+        ):
+            campos_alerta = {
+                'estado_acionado': int(acionado_agora),
+                'ultima_data_base': data,
+            }
+            if emitido:
+                campos_alerta['ultimo_disparo'] = now
+                campos_alerta['ultimo_preco'] = round(float(preco), 4)
+                campos_alerta['ultima_taxa'] = round(float(taxa), 4)
+            updates[alert_id] = campos_alerta
+        self.store.update_fields(updates)
+        self.store.save_watermarks(novas_datas)
+        self.store.remove_pending(marcados)
+
+        notificar = triggered.loc[alerts.index[emitir]]
+        return notificar.reset_index().to_dict('records')
+
+    def _evaluate(self, alerts, quotes):
+        """
+        Avalia ``alerts`` como ``evaluate_alerts``, com o engine aplicado
+        apenas aos alertas que o índice aponta como acionados. Alertas
+        ausentes do índice (ex.: gravados por outro processo depois da
+        última sincronização) são todos avaliados pelo engine.
+
+        Returns:
+            pd.DataFrame: Alertas acionados, com a coluna ``message``
+        """
+        chaves = pd.DataFrame({
+            'tipo_titulo': alerts['tipo_titulo'].astype(str),
+            'ano_vencimento': pd.to_numeric(
+                alerts['ano_vencimento'], errors='coerce'
+            ),
+        }).dropna().drop_duplicates()
+        pares = {
+            AlertIndex.pair(tipo, ano)
+            for tipo, ano in chaves.itertuples(index=False)
+        }
+        avaliadas = quotes.loc[np.array([
+            AlertIndex.pair(tipo, ano) in pares
+            for tipo, ano in quotes.index
+        ], dtype=bool)]
+        with self._lock:
+            acionados = self.index.match_quotes(avaliadas)
+            indexados = np.fromiter(
+                (alert_id in self.index for alert_id in alerts.index),
+                dtype=bool, count=len(alerts)
+            )
+        candidatos = alerts.index.isin(acionados) | ~indexados
+        return evaluate_alerts_parallel(alerts[candidatos], quotes)
+
+    def mark_pending(self, alert_ids):
+        """
+        Devolve alertas cujo envio falhou por erro transitório para a
+        próxima verificação.
+
+        Args:
+            alert_ids (list): IDs dos alertas
+        """
+        self.store.update_fields(
+            {alert_id: {'estado_acionado': 0} for alert_id in alert_ids},
+            removals={alert_id: ['ultimo_disparo'] for alert_id in alert_ids}
+        )
+        self.store.add_pending(alert_ids)
+
+    def send_alert_email(self, alert):
+        """
+        Envia email de alerta para o usuário usando o Brevo.
+        
+        Args:
+            alert (dict | pd.Series): Dados do alerta acionado
+        """
+        resultado = self.send_alert_emails([alert])[0]
+        if not resultado['enviado']:
+            raise Exception(f"Erro ao enviar email: {resultado['erro']}")
+
+    def send_alert_emails(self, alerts):
+        """
+        Envia os emails de vários alertas acionados, reaproveitando as
+        conexões SMTP do dispatcher.
+
+        Args:
+            alerts (list): Alertas acionados (saída de ``check_alerts``)
+
+        Returns:
+            list: Resultado do envio para cada alerta (ver
+            ``EmailDispatcher.send``)
+        """
+        if not EMAIL_USER or not EMAIL_PASSWORD:
+            raise ValueError("Credenciais de email não configuradas")
+        return self.dispatcher.send(
+            [build_alert_message(alert) for alert in alerts]
+        )
+
+
+def _concat_alerts(*frames):
+    """Concatena DataFrames de alertas, ignorando os vazios."""
+    preenchidos = [df for df in frames if not df.empty]
+    if not preenchidos:
+        return frames[0]
+    if len(preenchidos) == 1:
+        return preenchidos[0]
+    return pd.concat(preenchidos)
@@ -0,0 +1,217 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append("..")
+
+from config import ALERT_EVAL_WORKERS, ALERT_PARALLEL_MIN_ALERTS
+from utils.metrics import timed, increment
+from .engine import (
+    ALERT_KEYS, THRESHOLD_COLUMNS, evaluate_alerts, evaluate_thresholds,
+    _empty_result
+)
+
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers):
+    """
+    Retorna o pool de processos da avaliação, criado na primeira chamada e
+    reaproveitado entre verificações (a partida dos processos, que
+    importam pandas, é paga uma vez).
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # spawn: o processo pai tem threads (API, agendador, Streamlit)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_executor():
+    """Encerra o pool de processos, se existir."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+
+
+@timed('alerts_evaluate_parallel')
+def evaluate_alerts_parallel(
+    alerts, quotes, workers=ALERT_EVAL_WORKERS,
+    min_alerts=ALERT_PARALLEL_MIN_ALERTS
+):
+    """
+    Avalia os alertas como ``evaluate_alerts``, dividindo o trabalho entre
+    ``workers`` processos.
+
+    Os alertas são agrupados em fatias por par (tipo_titulo,
+    ano_vencimento), equilibradas pela quantidade de alertas. As cotações
+    e os limites vão para memória compartilhada: cada processo recebe
+    apenas o nome dos blocos e o trecho da sua fatia, compara os limites e
+    monta as mensagens; o resultado final é reunido na ordem de
+    ``alerts``.
+
+    Abaixo de ``min_alerts`` alertas (ou com ``workers`` <= 1) a avaliação
+    é feita no próprio processo.
+
+    Args:
+        alerts (pd.DataFrame): Alertas cadastrados
+        quotes (pd.DataFrame): Resultado de ``latest_quotes``
+        workers (int): Processos do pool
+        min_alerts (int): Quantidade mínima de alertas para usar o pool
+
+    Returns:
+        pd.DataFrame: Alertas acionados, com a coluna ``message``
+    """
+    if workers <= 1 or len(alerts) < min_alerts or quotes.empty:
+        return evaluate_alerts(alerts, quotes)
+
+    # A junção com as cotações é feita uma vez aqui: cada alerta passa a
+    # apontar para a linha da sua cotação (-1 se não houver)
+    chaves = pd.MultiIndex.from_arrays([
+        alerts['tipo_titulo'].astype(str),
+        pd.to_numeric(alerts['ano_vencimento'], errors='coerce')
+        .astype('Int64'),
+    ], names=ALERT_KEYS)
+    posicao_cotacao = quotes.index.get_indexer(chaves)
+    validos = np.flatnonzero(posicao_cotacao >= 0)
+    if not len(validos):
+        return _empty_result(alerts)
+
+    fatias = _shard(posicao_cotacao[validos], len(quotes), workers)
+    ordem = validos[fatias['ordem']]
+    cotacoes = np.column_stack([
+        quotes['PU Compra Manha'].to_numpy(dtype='float64'),
+        quotes['Taxa Compra Manha'].to_numpy(dtype='float64'),
+    ])
+    limites = np.column_stack([
+        pd.to_numeric(alerts[col], errors='coerce').to_numpy(dtype='float64')
+        for col in THRESHOLD_COLUMNS
+    ])[ordem]
+
+    blocos = []
+    try:
+        descritores = [
+            _share(array, blocos)
+            for array in (cotacoes, limites, posicao_cotacao[ordem])
+        ]
+        executor = get_executor(workers)
+        futuros = [
+            executor.submit(_evaluate_shard, *descritores, inicio, fim)
+            for inicio, fim in fatias['limites']
+        ]
+        increment('alerts_parallel_shards', len(futuros))
+        resultados = [futuro.result() for futuro in futuros]
+    finally:
+        for bloco in blocos:
+            bloco.close()
+            bloco.unlink()
+
+    acionados = np.concatenate([linhas for linhas, _ in resultados])
+    if not len(acionados):
+        return _empty_result(alerts)
+    mensagens = np.concatenate([msgs for _, msgs in resultados])
+    # Volta à ordem de ``alerts``, a mesma da avaliação sequencial
+    posicoes = ordem[acionados]
+    reordenar = np.argsort(posicoes, kind='stable')
+    triggered = alerts.iloc[posicoes[reordenar]].copy()
+    triggered['message'] = mensagens[reordenar]
+    return triggered
+
+
+def _shard(pares, n_pares, n_fatias):
+    """
+    Distribui os pares entre as fatias, do par com mais alertas para o com
+    menos, sempre na fatia menos carregada; todos os alertas de um par
+    ficam na mesma fatia.
+
+    Returns:
+        dict: ``ordem`` (alertas agrupados por fatia) e ``limites``
+        (início e fim de cada fatia não vazia em ``ordem``)
+    """
+    contagem = np.bincount(pares, minlength=n_pares)
+    fatia_do_par = np.zeros(n_pares, dtype=np.int64)
+    carga = np.zeros(n_fatias, dtype=np.int64)
+    for par in np.argsort(-contagem, kind='stable'):
+        if not contagem[par]:
+            break
+        destino = int(np.argmin(carga))
+        fatia_do_par[par] = destino
+        carga[destino] += contagem[par]
+    fatia = fatia_do_par[pares]
+    ordem = np.argsort(fatia, kind='stable')
+    fronteiras = np.searchsorted(fatia[ordem], np.arange(n_fatias + 1))
+    limites = [
+        (int(inicio), int(fim))
+        for inicio, fim in zip(fronteiras[:-1], fronteiras[1:])
+        if fim > inicio
+    ]
+    return {'ordem': ordem, 'limites': limites}
+
+
+def _share(array, blocos):
+    """Copia ``array`` para um bloco de memória compartilhada."""
+    array = np.ascontiguousarray(array)
+    bloco = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocos.append(bloco)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=bloco.buf)[:] = array
+    return bloco.name, array.shape, array.dtype.str
+
+
+def _evaluate_shard(cotacoes_desc, limites_desc, posicoes_desc, inicio, fim):
+    """
+    Avalia os alertas ``inicio:fim`` (executado nos processos do pool).
+
+    Returns:
+        tuple: (posições dos acionados na ordem das fatias, mensagens)
+    """
+    blocos = [
+        shared_memory.SharedMemory(name=descritor[0])
+        for descritor in (cotacoes_desc, limites_desc, posicoes_desc)
+    ]
+    try:
+        preco, taxa, limites = _read_shard(
+            blocos, (cotacoes_desc, limites_desc, posicoes_desc), inicio, fim
+        )
+    finally:
+        for bloco in blocos:
+            bloco.close()
+    acionado, message = evaluate_thresholds(preco, taxa, limites)
+    return inicio + np.flatnonzero(acionado), message
+
+
+def _read_shard(blocos, descritores, inicio, fim):
+    """
+    Copia os dados da fatia dos blocos compartilhados. As visões dos blocos
+    deixam de existir no retorno, antes de os blocos serem fechados.
+    """
+    cotacoes, limites, posicoes = (
+        np.ndarray(shape, dtype=np.dtype(dtype), buffer=bloco.buf)
+        for bloco, (_, shape, dtype) in zip(blocos, descritores)
+    )
+    linhas = posicoes[inicio:fim]
+    return (
+        cotacoes[linhas, 0],
+        cotacoes[linhas, 1],
+        {
+            col: limites[inicio:fim, i].copy()
+            for i, col in enumerate(THRESHOLD_COLUMNS)
+        },
+    )
@@ -0,0 +1,385 @@
+import json
+import uuid
+
+import pandas as pd
+
+
+ALERT_PREFIX = "alert:"
+INDEX_PREFIX = "alerts:idx:"
+WATERMARK_KEY = "alerts:watermark"
+PENDING_KEY = "alerts:pendentes"
+VERSION_KEY = "alerts:versao"
+CHECK_LOCK_KEY = "alerts:verificacao"
+ALERT_COLUMNS = [
+    'nome', 'email', 'tipo_titulo', 'ano_vencimento',
+    'preco_min', 'preco_max', 'taxa_min', 'taxa_max',
+    'data_criacao'
+]
+FLOAT_FIELDS = ['preco_min', 'preco_max', 'taxa_min', 'taxa_max']
+
+# Quantidade de comandos enviados por pipeline
+BATCH_SIZE = 1000
+
+
+class AlertStore:
+    """
+    Persistência dos alertas no Redis.
+
+    Cada alerta é um hash ``alert:<id>`` com ID estável, e cada par
+    (tipo_titulo, ano_vencimento) tem um set
+    ``alerts:idx:<tipo_titulo>:<ano_vencimento>`` com os IDs dos seus
+    alertas, para que a avaliação busque apenas os alertas relevantes.
+
+    O estado da avaliação também fica no Redis: o hash
+    ``alerts:watermark`` guarda a última Data Base avaliada de cada par, e
+    o set ``alerts:pendentes`` os alertas que precisam ser avaliados mesmo
+    sem cotação nova (recém-criados ou com envio falho).
+
+    Toda gravação ou remoção incrementa o contador ``alerts:versao``, para
+    que outros processos (ou a API) saibam quando recarregar os alertas.
+    """
+
+    def __init__(self, redis_manager):
+        self.redis_manager = redis_manager
+
+    @staticmethod
+    def new_id():
+        """Gera um ID estável para um novo alerta."""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def pair_field(tipo_titulo, ano_vencimento):
+        """Identificador textual de um par (tipo_titulo, ano_vencimento)."""
+        return f"{tipo_titulo}:{int(ano_vencimento)}"
+
+    @classmethod
+    def index_key(cls, tipo_titulo, ano_vencimento):
+        """Chave do set de IDs de um par (tipo_titulo, ano_vencimento)."""
+        return f"{INDEX_PREFIX}{cls.pair_field(tipo_titulo, ano_vencimento)}"
+
+    def load_all(self):
+        """
+        Carrega todos os alertas com SCAN e HGETALL em pipeline.
+
+        Returns:
+            pd.DataFrame: Alertas indexados pelo ID
+        """
+        ids = [
+            key[len(ALERT_PREFIX):]
+            for key in self.redis_manager.scan_keys(f"{ALERT_PREFIX}*")
+        ]
+        return self.load_ids(ids)
+
+    def load_for(self, pairs):
+        """
+        Carrega apenas os alertas dos pares (tipo_titulo, ano_vencimento)
+        informados, a partir dos sets de índice.
+
+        Args:
+            pairs (iterable): Pares (tipo_titulo, ano_vencimento)
+
+        Returns:
+            pd.DataFrame: Alertas indexados pelo ID
+        """
+        pairs = list(pairs)
+        pipe = self.redis_manager.pipeline(transaction=False)
+        for tipo_titulo, ano_vencimento in pairs:
+            pipe.smembers(self.index_key(tipo_titulo, ano_vencimento))
+        ids = [alert_id for membros in pipe.execute() for alert_id in membros]
+        return self.load_ids(ids)
+
+    def load_ids(self, ids):
+        """Carrega os alertas com os IDs informados."""
+        # Importado aqui: o cliente (e o redis-py) só é criado no uso
+        from redis.exceptions import ResponseError
+
+        registros = {}
+        legados = []
+        for inicio in range(0, len(ids), BATCH_SIZE):
+            lote = ids[inicio:inicio + BATCH_SIZE]
+            pipe = self.redis_manager.pipeline(transaction=False)
+            for alert_id in lote:
+                pipe.hgetall(f"{ALERT_PREFIX}{alert_id}")
+            respostas = pipe.execute(raise_on_error=False)
+            for alert_id, resposta in zip(lote, respostas):
+                if isinstance(resposta, ResponseError):
+                    # Alerta gravado como string JSON pela versão anterior
+                    legados.append(alert_id)
+                elif resposta:
+                    registros[alert_id] = resposta
+        registros.update(self._migrate_legacy(legados))
+        return self._to_frame(registros)
+
+    def save(self, alert_id, alert, pending=False):
+        """
+        Grava um único alerta e o inclui no índice do seu par.
+
+        Args:
+            alert_id (str): ID do alerta
+            alert (dict): Campos do alerta
+            pending (bool): Marca o alerta para a próxima avaliação
+
+        Returns:
+            int: Versão dos alertas após a gravação
+        """
+        pipe = self.redis_manager.pipeline()
+        self._queue_save(pipe, alert_id, alert)
+        if pending:
+            pipe.sadd(PENDING_KEY, alert_id)
+        pipe.incr(VERSION_KEY)
+        return pipe.execute()[-1]
+
+    def save_many(self, alerts, pending=True):
+        """
+        Grava vários alertas em pipelines de ``BATCH_SIZE`` alertas.
+
+        Args:
+            alerts (dict): ID do alerta -> campos do alerta
+            pending (bool): Marca os alertas para a próxima avaliação
+        """
+        itens = list(alerts.items())
+        for inicio in range(0, len(itens), BATCH_SIZE):
+            lote = itens[inicio:inicio + BATCH_SIZE]
+            pipe = self.redis_manager.pipeline(transaction=False)
+            for alert_id, alert in lote:
+                self._queue_save(pipe, alert_id, alert)
+            if pending:
+                pipe.sadd(PENDING_KEY, *[alert_id for alert_id, _ in lote])
+            pipe.incr(VERSION_KEY)
+            pipe.execute()
+
+    def delete(self, alert_id, tipo_titulo, ano_vencimento):
+        """
+        Remove um alerta e sua entrada no índice.
+
+        Returns:
+            int: Versão dos alertas após a remoção
+        """
+        pipe = self.redis_manager.pipeline()
+        pipe.delete(f"{ALERT_PREFIX}{alert_id}")
+        pipe.srem(self.index_key(tipo_titulo, ano_vencimento), alert_id)
+        pipe.srem(PENDING_KEY, alert_id)
+        pipe.incr(VERSION_KEY)
+        return pipe.execute()[-1]
+
+    def delete_many(self, ids):
+        """
+        Remove vários alertas em pipelines de ``BATCH_SIZE`` alertas.
+
+        Args:
+            ids (list): IDs dos alertas
+
+        Returns:
+            list: IDs efetivamente removidos (os inexistentes são ignorados)
+        """
+        from redis.exceptions import ResponseError
+
+        removidos = []
+        for inicio in range(0, len(ids), BATCH_SIZE):
+            lote = ids[inicio:inicio + BATCH_SIZE]
+            pipe = self.redis_manager.pipeline(transaction=False)
+            for alert_id in lote:
+                pipe.hmget(
+                    f"{ALERT_PREFIX}{alert_id}",
+                    'tipo_titulo', 'ano_vencimento'
+                )
+            chaves = pipe.execute(raise_on_error=False)
+            pipe = self.redis_manager.pipeline(transaction=False)
+            encontrados = []
+            for alert_id, chave in zip(lote, chaves):
+                if isinstance(chave, ResponseError):
+                    # Alerta legado (string JSON): sem entrada no índice
+                    pipe.delete(f"{ALERT_PREFIX}{alert_id}")
+                    encontrados.append(alert_id)
+                    continue
+                tipo_titulo, ano_vencimento = chave
+                if tipo_titulo is None or ano_vencimento is None:
+                    continue
+                pipe.delete(f"{ALERT_PREFIX}{alert_id}")
+                pipe.srem(
+                    self.index_key(tipo_titulo, ano_vencimento), alert_id
+                )
+                encontrados.append(alert_id)
+            if encontrados:
+                pipe.srem(PENDING_KEY, *encontrados)
+                pipe.incr(VERSION_KEY)
+                pipe.execute()
+            removidos.extend(encontrados)
+        return removidos
+
+    def scan_page(self, cursor=0, count=BATCH_SIZE):
+        """
+        Lê uma página de alertas com SCAN.
+
+        Args:
+            cursor (int): Cursor retornado pela página anterior (0 inicia)
+            count (int): Quantidade aproximada de alertas por página
+
+        Returns:
+            tuple: (DataFrame de alertas, próximo cursor; 0 ao final)
+        """
+        cursor, keys = self.redis_manager.redis_client.scan(
+            cursor=cursor, match=f"{ALERT_PREFIX}*", count=count
+        )
+        ids = [key[len(ALERT_PREFIX):] for key in keys]
+        return self.load_ids(ids), cursor
+
+    def version(self):
+        """Contador de alterações dos alertas."""
+        return int(self.redis_manager.redis_client.get(VERSION_KEY) or 0)
+
+    def acquire_check_lock(self, token, ttl):
+        """
+        Reserva a verificação de alertas para um processo, por até ``ttl``
+        segundos.
+
+        Returns:
+            bool: False se outro processo está verificando
+        """
+        return bool(self.redis_manager.redis_client.set(
+            CHECK_LOCK_KEY, token, nx=True, ex=ttl
+        ))
+
+    def release_check_lock(self, token):
+        """Libera a reserva, se ela ainda pertence a ``token``."""
+        from redis.exceptions import WatchError
+
+        with self.redis_manager.pipeline() as pipe:
+            try:
+                pipe.watch(CHECK_LOCK_KEY)
+                # A reserva pode ter expirado e sido tomada por outro
+                if pipe.get(CHECK_LOCK_KEY) != token:
+                    pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(CHECK_LOCK_KEY)
+                pipe.execute()
+            except WatchError:
+                pass
+
+    def update_fields(self, updates, removals=None):
+        """
+        Atualiza campos de estado de vários alertas em pipeline.
+
+        Args:
+            updates (dict): ID do alerta -> campos a gravar
+            removals (dict, optional): ID do alerta -> campos a apagar
+        """
+        comandos = [
+            (alert_id, 'hset', mapping)
+            for alert_id, mapping in updates.items() if mapping
+        ] + [
+            (alert_id, 'hdel', campos)
+            for alert_id, campos in (removals or {}).items() if campos
+        ]
+        for inicio in range(0, len(comandos), BATCH_SIZE):
+            pipe = self.redis_manager.pipeline(transaction=False)
+            lote = comandos[inicio:inicio + BATCH_SIZE]
+            for alert_id, comando, valor in lote:
+                key = f"{ALERT_PREFIX}{alert_id}"
+                if comando == 'hset':
+                    pipe.hset(key, mapping=self._serialize(valor))
+                else:
+                    pipe.hdel(key, *valor)
+            pipe.execute()
+
+    def load_watermarks(self):
+        """Última Data Base avaliada de cada par (campo -> data ISO)."""
+        return self.redis_manager.redis_client.hgetall(WATERMARK_KEY)
+
+    def save_watermarks(self, watermarks):
+        """Grava a última Data Base avaliada dos pares informados."""
+        if watermarks:
+            self.redis_manager.redis_client.hset(
+                WATERMARK_KEY, mapping=self._serialize(watermarks)
+            )
+
+    def add_pending(self, ids):
+        """Marca alertas para a próxima avaliação."""
+        if ids:
+            self.redis_manager.redis_client.sadd(PENDING_KEY, *ids)
+
+    def load_pending(self):
+        """IDs marcados para avaliação (sem desmarcá-los)."""
+        return list(self.redis_manager.redis_client.smembers(PENDING_KEY))
+
+    def remove_pending(self, ids):
+        """Desmarca alertas já avaliados."""
+        if ids:
+            self.redis_manager.redis_client.srem(PENDING_KEY, *ids)
+
+    def _queue_save(self, pipe, alert_id, alert):
+        mapping = self._serialize(alert)
+        key = f"{ALERT_PREFIX}{alert_id}"
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.sadd(
+            self.index_key(alert['tipo_titulo'], alert['ano_vencimento']),
+            alert_id
+        )
+
+    def _migrate_legacy(self, ids):
+        """Converte alertas salvos como string JSON para hashes."""
+        if not ids:
+            return {}
+        pipe = self.redis_manager.pipeline(transaction=False)
+        for alert_id in ids:
+            pipe.get(f"{ALERT_PREFIX}{alert_id}")
+        registros = {}
+        pipe_escrita = self.redis_manager.pipeline()
+        for alert_id, alert_data in zip(ids, pipe.execute()):
+            if not alert_data:
+                continue
+            alert = json.loads(alert_data)
+            self._queue_save(pipe_escrita, alert_id, alert)
+            registros[alert_id] = self._serialize(alert)
+        pipe_escrita.execute()
+        return registros
+
+    @staticmethod
+    def _serialize(alert):
+        """Converte um alerta em campos de hash (valores vazios omitidos)."""
+        mapping = {}
+        for field, value in alert.items():
+            if value is None or (
+                not isinstance(value, str) and pd.isna(value)
+            ):
+                continue
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            mapping[field] = str(value)
+        return mapping
+
+    @staticmethod
+    def empty_frame():
+        """DataFrame de alertas vazio."""
+        return pd.DataFrame(
+            columns=ALERT_COLUMNS,
+            index=pd.Index([], name='id', dtype=object)
+        )
+
+    @classmethod
+    def _to_frame(cls, registros):
+        """Monta o DataFrame de alertas a partir dos hashes lidos."""
+        if not registros:
+            return cls.empty_frame()
+        return cls.normalize(pd.DataFrame.from_dict(registros, orient='index'))
+
+    @staticmethod
+    def normalize(df):
+        """Ajusta colunas e tipos de um DataFrame de alertas."""
+        df.index.name = 'id'
+        for col in ALERT_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        extras = [col for col in df.columns if col not in ALERT_COLUMNS]
+        df = df[ALERT_COLUMNS + extras]
+        for col in FLOAT_FIELDS:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df['ano_vencimento'] = pd.to_numeric(
+            df['ano_vencimento'], errors='coerce'
+        ).astype('Int64')
+        df['data_criacao'] = pd.to_datetime(
+            df['data_criacao'], errors='coerce'
+        )
+        return df
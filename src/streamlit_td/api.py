@@ -0,0 +1,544 @@
+import codecs
+import collections
+import csv
+import io
+import json
+import secrets
+import threading
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    JSONResponse, PlainTextResponse, Response, StreamingResponse
+)
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from pydantic import (
+    BaseModel, ValidationError, field_validator, model_validator
+)
+
+from alerts.storage import AlertStore, ALERT_COLUMNS, BATCH_SIZE
+from config import (
+    API_HOST, API_PORT, TESOURO_API_CACHE_SIZE, USUARIO, SENHA
+)
+from data import get_dataset
+from data.tesouro import TESOURO_DECIMALS
+from scheduler import get_scheduler
+from utils.metrics import render_prometheus
+from utils.redis import RedisManager
+
+
+# Colunas exportadas (as mesmas em todas as páginas e formatos)
+EXPORT_COLUMNS = ['id'] + ALERT_COLUMNS
+MAX_PAGE_SIZE = 10000
+TESOURO_MEDIA_TYPES = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+# Casas decimais no JSON: as da fonte (a variação da taxa é a diferença
+# entre duas taxas); as demais colunas float32 usam a menor representação
+# decimal do valor
+JSON_DECIMALS = {**TESOURO_DECIMALS, 'Variacao Taxa': 2}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # O agendador roda junto com a API (no app embutido ele já foi
+    # iniciado e a chamada é ignorada)
+    get_scheduler().start()
+    yield
+    get_scheduler().stop()
+
+
+# API externa
+api = FastAPI(lifespan=lifespan)
+
+_store = None
+_cache_dataset = None
+_cache_lock = threading.Lock()
+_basic_auth = HTTPBasic(auto_error=False)
+
+
+def autenticar(
+    credenciais: Optional[HTTPBasicCredentials] = Depends(_basic_auth)
+):
+    """
+    Exige HTTP Basic com o mesmo usuário e senha do app (``USUARIO`` e
+    ``SENHA``). Sem credenciais configuradas, as rotas protegidas recusam
+    todas as requisições.
+    """
+    if (
+        credenciais is None or not USUARIO or not SENHA
+        or not secrets.compare_digest(
+            credenciais.username.encode(), USUARIO.encode()
+        )
+        or not secrets.compare_digest(
+            credenciais.password.encode(), SENHA.encode()
+        )
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Credenciais inválidas",
+            headers={'WWW-Authenticate': 'Basic'}
+        )
+
+
+# Rotas de alertas: importação, remoção e exportação exigem autenticação
+alertas_router = APIRouter(dependencies=[Depends(autenticar)])
+
+
+def get_alert_store():
+    """Armazenamento de alertas usado pela API."""
+    global _store
+    if _store is None:
+        _store = AlertStore(RedisManager())
+    return _store
+
+
+class AlertaEntrada(BaseModel):
+    """Alerta recebido na importação em lote."""
+
+    nome: str
+    email: str
+    tipo_titulo: str
+    ano_vencimento: int
+    preco_min: Optional[float] = None
+    preco_max: Optional[float] = None
+    taxa_min: Optional[float] = None
+    taxa_max: Optional[float] = None
+
+    @field_validator(
+        'preco_min', 'preco_max', 'taxa_min', 'taxa_max', mode='before'
+    )
+    @classmethod
+    def _vazio_como_none(cls, value):
+        # Células vazias do CSV
+        return None if value == '' else value
+
+    @model_validator(mode='after')
+    def _limites_validos(self):
+        # Os mesmos limites aceitos pelo formulário do app: ao menos um
+        # critério e, em cada faixa, mínimo até o máximo
+        if all(
+            getattr(self, col) is None
+            for col in ('preco_min', 'preco_max', 'taxa_min', 'taxa_max')
+        ):
+            raise ValueError("informe ao menos um limite de preço ou taxa")
+        for minimo, maximo in (
+            ('preco_min', 'preco_max'), ('taxa_min', 'taxa_max')
+        ):
+            valor_min, valor_max = getattr(self, minimo), getattr(self, maximo)
+            if (
+                valor_min is not None and valor_max is not None
+                and valor_min > valor_max
+            ):
+                raise ValueError(f"{minimo} maior que {maximo}")
+        return self
+
+
+@api.get("/executar-tarefa")
+def executar():
+    scheduler = get_scheduler()
+    if scheduler.trigger():
+        status = "Tarefa iniciada com sucesso!"
+    else:
+        status = "Tarefa já em execução; nova verificação agendada."
+    ultima = scheduler.last_run
+    return JSONResponse(content={
+        "status": status,
+        "ultima_execucao": {
+            "inicio": ultima['inicio'].isoformat(),
+            "fim": ultima['fim'].isoformat(),
+            "acionados": ultima['acionados'],
+            "erro": ultima['erro']
+        } if ultima else None
+    })
+
+
+@api.get("/metrics")
+def metrics():
+    """Métricas de tempo e contadores no formato do Prometheus."""
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type='text/plain; version=0.0.4'
+    )
+
+
+@alertas_router.post("/alertas")
+async def criar_alertas(request: Request):
+    """
+    Cria alertas em lote.
+
+    Aceita um array JSON (``application/json``), um alerta JSON por linha
+    (``application/x-ndjson``) ou CSV com cabeçalho (``text/csv``). NDJSON
+    e CSV são lidos em streaming; os alertas válidos são gravados no Redis
+    em pipelines de ``BATCH_SIZE`` à medida que chegam. Linhas inválidas
+    são informadas em ``erros`` sem interromper a importação.
+    """
+    store = get_alert_store()
+    tipo = _content_type(request)
+    resultado = {'criados': 0, 'ids': [], 'erros': []}
+    lote = {}
+
+    async def gravar():
+        if lote:
+            await run_in_threadpool(store.save_many, dict(lote))
+            resultado['criados'] += len(lote)
+            resultado['ids'].extend(lote)
+            lote.clear()
+
+    async def incluir(linha, dados):
+        try:
+            alerta = AlertaEntrada.model_validate(dados)
+        except ValidationError as e:
+            resultado['erros'].append({
+                'linha': linha, 'erro': _validation_message(e)
+            })
+            return
+        lote[store.new_id()] = {
+            **alerta.model_dump(), 'data_criacao': datetime.now()
+        }
+        if len(lote) >= BATCH_SIZE:
+            await gravar()
+
+    if tipo == 'text/csv':
+        # Um único leitor para todo o corpo: campos entre aspas podem
+        # conter quebras de linha. As linhas só são entregues a ele quando
+        # as aspas estão fechadas, para que nunca leia um registro pela
+        # metade.
+        pendentes = _LinhasPendentes()
+        leitor = csv.reader(pendentes)
+        aberto = False
+        cabecalho = None
+        linha = 0
+
+        async def ler_registros():
+            nonlocal cabecalho, linha
+            for valores in leitor:
+                if not any(valor.strip() for valor in valores):
+                    continue
+                if cabecalho is None:
+                    cabecalho = [valor.strip() for valor in valores]
+                    continue
+                linha += 1
+                await incluir(linha, dict(zip(cabecalho, valores)))
+
+        async for texto in _stream_lines(request):
+            pendentes.append(texto + '\n')
+            aberto ^= texto.count('"') % 2 == 1
+            if not aberto:
+                await ler_registros()
+        # Aspas não fechadas no fim do corpo: o leitor entrega o que houver
+        await ler_registros()
+    elif tipo == 'application/x-ndjson':
+        linha = 0
+        async for texto in _stream_lines(request):
+            if not texto.strip():
+                continue
+            linha += 1
+            try:
+                dados = json.loads(texto)
+            except json.JSONDecodeError as e:
+                resultado['erros'].append({'linha': linha, 'erro': str(e)})
+                continue
+            await incluir(linha, dados)
+    else:
+        corpo = await _json_body(request)
+        alertas = corpo.get('alertas') if isinstance(corpo, dict) else corpo
+        if not isinstance(alertas, list):
+            raise HTTPException(
+                status_code=422,
+                detail="Envie uma lista de alertas ou {'alertas': [...]}"
+            )
+        for linha, dados in enumerate(alertas, start=1):
+            await incluir(linha, dados)
+    await gravar()
+    return JSONResponse(content=resultado)
+
+
+@alertas_router.delete("/alertas")
+async def remover_alertas(request: Request):
+    """
+    Remove alertas em lote.
+
+    Aceita JSON (lista de IDs ou ``{"ids": [...]}``) ou CSV/texto com um ID
+    por linha (cabeçalho ``id`` opcional).
+    """
+    tipo = _content_type(request)
+    if tipo in ('text/csv', 'text/plain'):
+        ids = []
+        async for texto in _stream_lines(request):
+            valor = texto.split(',')[0].strip()
+            if valor and valor != 'id':
+                ids.append(valor)
+    else:
+        corpo = await _json_body(request)
+        ids = corpo.get('ids') if isinstance(corpo, dict) else corpo
+        if not isinstance(ids, list):
+            raise HTTPException(
+                status_code=422,
+                detail="Envie uma lista de IDs ou {'ids': [...]}"
+            )
+        ids = [str(alert_id) for alert_id in ids]
+    removidos = await run_in_threadpool(get_alert_store().delete_many, ids)
+    return JSONResponse(content={
+        'removidos': len(removidos),
+        'nao_encontrados': len(ids) - len(removidos)
+    })
+
+
+@alertas_router.get("/alertas")
+def listar_alertas(
+    cursor: int = 0,
+    limite: int = Query(BATCH_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    formato: str = Query('json', pattern='^(json|csv|ndjson)$')
+):
+    """
+    Lista os alertas.
+
+    Em JSON, retorna uma página de cerca de ``limite`` alertas e o
+    ``proximo_cursor`` (None na última página), a partir do SCAN do Redis.
+    Em CSV e NDJSON, exporta em streaming todos os alertas a partir de
+    ``cursor``, página a página.
+    """
+    store = get_alert_store()
+    if formato == 'json':
+        alerts, proximo = store.scan_page(cursor, limite)
+        registros = _export_frame(alerts).to_json(
+            orient='records', date_format='iso', force_ascii=False
+        )
+        proximo = json.dumps(proximo or None)
+        return Response(
+            content=f'{{"alertas": {registros}, "proximo_cursor": {proximo}}}',
+            media_type='application/json'
+        )
+    media_type = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    return StreamingResponse(
+        _export_pages(store, cursor, limite, formato),
+        media_type=media_type
+    )
+
+
+api.include_router(alertas_router)
+
+
+@api.get("/tesouro/titulos")
+def listar_titulos():
+    """Tipos de título e anos de vencimento disponíveis."""
+    dataset = _current_dataset()
+    return JSONResponse(content={
+        'versao': dataset.key,
+        'data_min': dataset.index.data_min.date().isoformat(),
+        'data_max': dataset.index.data_max.date().isoformat(),
+        'titulos': {
+            tipo: sorted(dataset.index.vencimentos_por_ano(tipo))
+            for tipo in dataset.index.tipos
+        },
+    })
+
+
+@api.get("/tesouro")
+def consultar_tesouro(
+    request: Request,
+    tipo: str,
+    anos: Optional[List[int]] = Query(None),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    formato: str = Query('json', pattern='^(json|csv|arrow)$')
+):
+    """
+    Série filtrada do Tesouro Direto, a mesma exibida no dashboard (com as
+    métricas derivadas), em JSON, CSV ou Arrow IPC.
+
+    Os dados vêm da versão compartilhada em memória. O ``ETag`` é o hash
+    do conteúdo e muda apenas quando os dados mudam: clientes que reenviam
+    o valor em ``If-None-Match`` recebem 304 sem corpo. As respostas das
+    consultas mais frequentes ficam em um cache LRU por versão dos dados.
+    """
+    dataset = _current_dataset()
+    if tipo not in dataset.index.tipos:
+        raise HTTPException(
+            status_code=404, detail="Tipo de título inexistente"
+        )
+    etag = f'"{dataset.key}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+
+    conteudo = _render_tesouro(
+        _cached_dataset(dataset), tipo,
+        tuple(sorted(set(anos or []))), data_inicio, data_fim, formato
+    )
+    return Response(
+        content=conteudo,
+        media_type=TESOURO_MEDIA_TYPES[formato],
+        headers=headers
+    )
+
+
+def _current_dataset():
+    try:
+        return get_dataset()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Dados do Tesouro Direto indisponíveis: {str(e)}"
+        )
+
+
+def _cached_dataset(dataset):
+    """Esvazia o cache de respostas quando uma nova versão é publicada."""
+    global _cache_dataset
+    with _cache_lock:
+        if _cache_dataset is not dataset:
+            _render_tesouro.cache_clear()
+            _cache_dataset = dataset
+    return dataset
+
+
+@lru_cache(maxsize=TESOURO_API_CACHE_SIZE)
+def _render_tesouro(dataset, tipo, anos, data_inicio, data_fim, formato):
+    """Filtra e serializa uma consulta (memorizado por versão e filtros)."""
+    vencimentos_por_ano = dataset.index.vencimentos_por_ano(tipo)
+    vencimentos = [
+        vencimento
+        for ano in anos
+        for vencimento in vencimentos_por_ano.get(ano, [])
+    ]
+    if anos and not vencimentos:
+        df = dataset.df.iloc[:0]
+    else:
+        df = dataset.index.filter(tipo, vencimentos, data_inicio, data_fim)
+
+    if formato == 'csv':
+        return df.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8')
+    if formato == 'arrow':
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return _float64_frame(df).to_json(
+        orient='records', date_format='iso', force_ascii=False
+    ).encode('utf-8')
+
+
+def _float64_frame(df):
+    """
+    Converte as colunas float32 para float64 sem o ruído da conversão
+    (ex.: 11.51 em vez de 11.5100002289), arredondando conforme
+    ``JSON_DECIMALS``.
+    """
+    colunas = {}
+    for col in df.columns:
+        if df[col].dtype != 'float32':
+            continue
+        valores = df[col].to_numpy()
+        if col in JSON_DECIMALS:
+            colunas[col] = valores.astype('float64').round(JSON_DECIMALS[col])
+        else:
+            # O texto do float32 é o menor que o representa
+            colunas[col] = valores.astype(str).astype('float64')
+    return df.assign(**colunas)
+
+
+def _export_pages(store, cursor, limite, formato):
+    """Gera o conteúdo exportado, uma página de alertas por vez."""
+    if formato == 'csv':
+        yield ','.join(EXPORT_COLUMNS) + '\n'
+    while True:
+        alerts, cursor = store.scan_page(cursor, limite)
+        if not alerts.empty:
+            df = _export_frame(alerts)
+            if formato == 'csv':
+                saida = io.StringIO()
+                df.to_csv(saida, index=False, header=False)
+                yield saida.getvalue()
+            else:
+                # O pandas já termina cada página com quebra de linha
+                yield df.to_json(
+                    orient='records', lines=True, date_format='iso',
+                    force_ascii=False
+                ).rstrip('\n') + '\n'
+        if not cursor:
+            return
+
+
+def _export_frame(alerts):
+    """Alertas com o ID como coluna e as colunas exportadas."""
+    return alerts.reset_index()[EXPORT_COLUMNS]
+
+
+def _content_type(request):
+    return request.headers.get('content-type', '').split(';')[0].strip()
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"JSON inválido: {e}")
+
+
+async def _stream_lines(request):
+    """Lê o corpo da requisição linha a linha, conforme ele chega."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    resto = ''
+    async for bloco in request.stream():
+        linhas = (resto + decoder.decode(bloco)).split('\n')
+        resto = linhas.pop()
+        for linha in linhas:
+            yield linha.rstrip('\r')
+    resto += decoder.decode(b'', final=True)
+    if resto:
+        yield resto.rstrip('\r')
+
+
+class _LinhasPendentes:
+    """
+    Fila de linhas lida por um ``csv.reader``: a iteração para quando a
+    fila esvazia e recomeça quando novas linhas são incluídas.
+    """
+
+    def __init__(self):
+        self._linhas = collections.deque()
+
+    def append(self, linha):
+        self._linhas.append(linha)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._linhas:
+            raise StopIteration
+        return self._linhas.popleft()
+
+
+def _validation_message(error):
+    # Erros do alerta como um todo (ex.: limites) não têm campo
+    return '; '.join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}"
+        if e['loc'] else e['msg']
+        for e in error.errors()
+    )
+
+
+# --- Rodar o servidor FastAPI com Uvicorn programaticamente ---
+def start_api():
+    from uvicorn import Config, Server
+
+    config = Config(app=api, host=API_HOST, port=API_PORT, log_level="info")
+    server = Server(config)
+    server.run()
+
+
+if __name__ == "__main__":
+    # API e agendador, sem o Streamlit (ver também worker.py)
+    start_api()
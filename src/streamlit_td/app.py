@@ -1,42 +1,61 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from alerts import AlertManager
-from data import fetch_tesouro_data, process_tesouro_data, fetch_dolar_data
+from data import (
+    get_tesouro_index,
+    fetch_dolar_data,
+    prefetch_data,
+    configure_dataset_registry,
+    process_tesouro_data,
+    read_tesouro_store,
+    http_get
+)
 from visualization import (
     plot_taxa_evolucao,
     plot_preco_evolucao,
-    plot_dolar_evolucao
+    plot_dolar_evolucao,
+    plot_variacao_taxa,
+    plot_volatilidade_preco,
+    plot_preco_usd
 )
 
 import threading
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from uvicorn import Config, Server
 
-from config import USUARIO, SENHA
+from config import (
+    USUARIO, SENHA, CHART_MAX_POINTS, DEBUG_METRICS, EXTERNAL_WORKER,
+    WORKER_URL
+)
+from scheduler import get_scheduler
+from utils.metrics import snapshot, timed
+
+
+def _run_api():
+    # FastAPI e uvicorn são importados na thread da API, sem atrasar a
+    # primeira execução do script
+    from api import start_api
 
-# Tarefa a ser executada externamente
-def tarefa_pesada():
-    print("Tarefa iniciada...")
-    print("Tarefa concluída!")
+    start_api()
 
-# API externa
-api = FastAPI()
 
-@api.get("/executar-tarefa")
-def executar():
-    threading.Thread(target=tarefa_pesada).start()
-    return JSONResponse(content={"status": "Tarefa iniciada com sucesso!"})
+@st.cache_resource(show_spinner=False)
+def iniciar_servicos():
+    """
+    Inicia a API e o agendador de alertas em segundo plano, uma única vez
+    por processo (e não a cada execução do script), e dispara em paralelo
+    as buscas do Tesouro e do dólar.
 
-# --- Rodar o servidor FastAPI com Uvicorn programaticamente ---
-def start_api():
-    config = Config(app=api, host="0.0.0.0", port=8001, log_level="info")
-    server = Server(config)
-    server.run()
+    Com ``EXTERNAL_WORKER`` a API e o agendador rodam em ``worker.py``,
+    que também atualiza os dados; o app apenas lê o armazenamento local.
+    """
+    if EXTERNAL_WORKER:
+        configure_dataset_registry(
+            loader=lambda: process_tesouro_data(read_tesouro_store())
+        )
+    else:
+        threading.Thread(target=_run_api, name="api", daemon=True).start()
+        get_scheduler().start()
+    prefetch_data()
 
-# --- Start da API em segundo plano ---
-threading.Thread(target=start_api, daemon=True).start()
 
 st.set_page_config(
     page_title="Tesouro Direto - Visualização de Dados",
@@ -44,41 +63,228 @@ st.set_page_config(
     layout="wide"
 )
 
+iniciar_servicos()
+
+
+def get_alert_manager():
+    """
+    Gerenciador de alertas do agendador, compartilhado entre sessões e
+    execuções (uma conexão e uma carga dos alertas por processo).
+    """
+    return get_scheduler().alert_manager
+
+
+@st.fragment
+def secao_alertas(tipos_titulo, anos_vencimento):
+    """
+    Seção de alertas. Por ser um fragmento, interações com o formulário e
+    os botões reexecutam apenas esta seção, sem recarregar dados nem
+    gráficos.
+    """
+    alert_manager = get_alert_manager()
+    # Alertas criados ou removidos por outra sessão ou pela API
+    alert_manager.sync()
+
+    # Seção de Alertas
+    st.header("📢 Configuração de Alertas")
+
+    # Formulário para novo alerta
+    with st.form("novo_alerta"):
+        st.subheader("Novo Alerta")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            nome = st.text_input("Seu Nome")
+            email = st.text_input("Seu Email")
+            tipo_titulo_alerta = st.selectbox(
+                "Tipo de Título",
+                tipos_titulo
+            )
+            ano_vencimento_alerta = st.selectbox(
+                "Ano de Vencimento",
+                anos_vencimento
+            )
+
+        with col2:
+            st.subheader("Critérios de Alerta")
+            (preco_min, preco_max) = st.slider(
+                "Preço de interesse (R$)",
+                min_value=0.0,
+                max_value=99999.0,
+                value=(0.0, 99999.0),
+                step=1.0
+            )
+
+            (taxa_min, taxa_max) = st.slider(
+                "Taxa de interesse (%)",
+                min_value=0.0,
+                max_value=99.0,
+                value=(0.0, 99.0),
+                step=1.0
+            )
+
+        if st.form_submit_button("Criar Alerta"):
+            if nome and email:
+                alert_id = alert_manager.add_alert(
+                    nome=nome,
+                    email=email,
+                    tipo_titulo=tipo_titulo_alerta,
+                    ano_vencimento=ano_vencimento_alerta,
+                    preco_min=preco_min,
+                    preco_max=preco_max,
+                    taxa_min=taxa_min,
+                    taxa_max=taxa_max
+                )
+                if alert_id:
+                    st.success("Alerta criado com sucesso!")
+                else:
+                    st.error("Erro ao salvar o alerta.")
+            else:
+                st.error("Por favor, preencha nome e email.")
+
+    # Tabela de alertas ativos
+    st.subheader("Alertas Ativos")
+    if not alert_manager.alerts.empty:
+        # Mostrar tabela com botões de remoção (índice = ID do alerta)
+        alertas_df = alert_manager.alerts.sort_values('data_criacao')
+        for idx, alerta in alertas_df.iterrows():
+            col1, col2 = st.columns([0.9, 0.1])
+            with col1:
+                st.write(
+                    f"**{alerta['nome']}** - {alerta['tipo_titulo']} "
+                    f"({alerta['ano_vencimento']})"
+                )
+                st.write(f"Email: {alerta['email']}")
+                detalhes = []
+                if pd.notna(alerta['preco_min']):
+                    detalhes.append(
+                        f"Preço Mín: R\$ {alerta['preco_min']:.2f}"
+                    )
+                if pd.notna(alerta['preco_max']):
+                    detalhes.append(
+                        f"Preço Máx: R\$ {alerta['preco_max']:.2f}"
+                    )
+                if pd.notna(alerta['taxa_min']):
+                    detalhes.append(
+                        f"Taxa Mín: {alerta['taxa_min']:.2f}%"
+                    )
+                if pd.notna(alerta['taxa_max']):
+                    detalhes.append(
+                        f"Taxa Máx: {alerta['taxa_max']:.2f}%"
+                    )
+                st.write(" | ".join(detalhes))
+                st.write(f"Criado em: {alerta['data_criacao']}")
+            with col2:
+                if st.button("🗑️", key=f"remove_{idx}"):
+                    alert_manager.remove_alert(idx)
+                    st.rerun(scope="fragment")
+            st.divider()
+    else:
+        st.info("Nenhum alerta configurado.")
+
+    # Botão para verificar alertas
+    if st.button("Verificar Alertas"):
+        if EXTERNAL_WORKER:
+            solicitar_verificacao()
+            return
+        # A verificação roda na thread do agendador, sem bloquear a página
+        scheduler = get_scheduler()
+        if scheduler.trigger():
+            st.info("Verificação de alertas iniciada.")
+        else:
+            st.info("Verificação já em andamento; uma nova foi agendada.")
+        mostrar_ultima_verificacao(scheduler.last_run)
+
+
+def mostrar_ultima_verificacao(resumo):
+    """Exibe o resultado da última verificação de alertas concluída."""
+    if resumo is None:
+        return
+    st.write(
+        f"Última verificação: {resumo['fim']:%d/%m/%Y %H:%M:%S} "
+        f"({resumo['acionados']} alerta(s) acionado(s))"
+    )
+    if resumo['erro']:
+        st.error(f"Erro ao verificar alertas: {resumo['erro']}")
+    for resultado in resumo['resultados']:
+        if resultado['enviado']:
+            st.success(f"Email enviado para {resultado['email']}")
+        else:
+            st.error(
+                f"Erro ao enviar email para "
+                f"{resultado['email']}: {resultado['erro']}"
+            )
+
+
+def solicitar_verificacao():
+    """Pede ao worker uma verificação de alertas, feita em segundo plano."""
+    try:
+        response = http_get(
+            f"{WORKER_URL}/executar-tarefa", endpoint='worker'
+        )
+        response.raise_for_status()
+    except Exception as e:
+        st.error(f"Erro ao solicitar a verificação de alertas: {str(e)}")
+        return
+    resposta = response.json()
+    st.info(resposta['status'])
+    ultima = resposta['ultima_execucao']
+    if ultima:
+        st.write(
+            f"Última verificação: {ultima['fim']} "
+            f"({ultima['acionados']} alerta(s) acionado(s))"
+        )
+
+
+def painel_metricas():
+    """Painel de depuração com as métricas do processo."""
+    with st.sidebar.expander("⏱️ Métricas"):
+        metricas = snapshot()
+        if metricas['tempos']:
+            st.dataframe(pd.DataFrame([
+                {
+                    'métrica': nome,
+                    'rótulos': ', '.join(f"{k}={v}" for k, v in rotulos),
+                    'n': m['count'],
+                    'média (ms)': m['mean'] * 1000,
+                    'máx (ms)': m['max'] * 1000,
+                }
+                for (nome, rotulos), m in sorted(metricas['tempos'].items())
+            ]), hide_index=True)
+        if metricas['contadores']:
+            st.dataframe(pd.DataFrame([
+                {
+                    'contador': nome,
+                    'rótulos': ', '.join(f"{k}={v}" for k, v in rotulos),
+                    'valor': valor,
+                }
+                for (nome, rotulos), valor in sorted(
+                    metricas['contadores'].items()
+                )
+            ]), hide_index=True)
+
+
+@timed('app_run')
 def main():
     st.title("📈 Visualização de Dados do Tesouro Direto")
     
-    # Inicializar gerenciador de alertas
-    alert_manager = AlertManager()
-    
-    # Buscar dados (agora com cache)
-    df = fetch_tesouro_data()
-    df = process_tesouro_data(df)
+    # Buscar dados e índice (construídos uma vez por atualização)
+    index = get_tesouro_index()
     
-    if df is not None:
+    if index is not None:
         # Sidebar para filtros
         st.sidebar.header("Filtros")
         
         # Filtro por tipo de título
-        tipos_titulo = df['Tipo Titulo'].unique()
+        tipos_titulo = index.tipos
         tipo_selecionado = st.sidebar.selectbox(
             "Selecione o tipo de título",
             tipos_titulo
         )
         
-        # Filtro por data de vencimento (seleção múltipla)
-        vencimentos_disponiveis = (
-            df[df['Tipo Titulo'] == tipo_selecionado]
-            ['Data Vencimento']
-            .unique()
-        )
-        
-        # Criar dicionário para mapear anos para datas de vencimento
-        vencimentos_por_ano = {}
-        for data in vencimentos_disponiveis:
-            ano = data.year
-            if ano not in vencimentos_por_ano:
-                vencimentos_por_ano[ano] = []
-            vencimentos_por_ano[ano].append(data)
+        # Dicionário que mapeia anos para datas de vencimento
+        vencimentos_por_ano = index.vencimentos_por_ano(tipo_selecionado)
         
         # Ordenar anos em ordem decrescente
         anos_disponiveis = sorted(vencimentos_por_ano.keys(), reverse=True)
@@ -99,8 +305,8 @@ def main():
             vencimentos_selecionados.extend(vencimentos_por_ano[ano])
         
         # Filtro por data base
-        data_min = df['Data Base'].min()
-        data_max = df['Data Base'].max()
+        data_min = index.data_min
+        data_max = index.data_max
         data_inicio = st.sidebar.date_input(
             "Data inicial",
             value=data_min,
@@ -113,6 +319,25 @@ def main():
             min_value=data_min,
             max_value=data_max
         )
+        # Redução de pontos dos gráficos
+        reduzir_pontos = st.sidebar.toggle(
+            "Reduzir pontos dos gráficos",
+            value=True,
+            help="Limita os pontos enviados ao navegador em períodos longos"
+        )
+        max_points = None
+        if reduzir_pontos:
+            max_points = st.sidebar.number_input(
+                "Pontos por série",
+                min_value=100,
+                max_value=20000,
+                value=CHART_MAX_POINTS,
+                step=100
+            )
+
+        if DEBUG_METRICS:
+            painel_metricas()
+
         # Campo de usuario
         usuario = st.sidebar.text_input("Usuário", type="password")
 
@@ -120,37 +345,34 @@ def main():
         senha = st.sidebar.text_input("Senha", type="password")
         
         if usuario == USUARIO and senha == SENHA:
-            # Aplicar filtros
-            df_filtrado = df[
-                (df['Tipo Titulo'] == tipo_selecionado) &
-                (df['Data Base'] >= pd.to_datetime(data_inicio)) &
-                (df['Data Base'] <= pd.to_datetime(data_fim))
-            ]
-            
-            # Aplicar filtro de vencimentos se houver seleção
-            if vencimentos_selecionados:
-                df_filtrado = df_filtrado[
-                    df_filtrado['Data Vencimento']
-                    .isin(vencimentos_selecionados)
-                ]
-            
-            # Ordenar dados por data base
-            df_filtrado = df_filtrado.sort_values('Data Base')
+            # Aplicar filtros (fatias do índice, já ordenadas por data base)
+            df_filtrado = index.filter(
+                tipo_selecionado,
+                vencimentos_selecionados,
+                data_inicio,
+                data_fim
+            )
             
             # Buscar dados do dólar
             df_dolar = fetch_dolar_data(data_inicio, data_fim)
             
             # Gráfico de linha para taxas
             st.subheader(f"Evolução das Taxas - {tipo_selecionado}")
-            plot_taxa_evolucao(df_filtrado, tipo_selecionado)
+            plot_taxa_evolucao(df_filtrado, tipo_selecionado, max_points)
             
             # Gráfico de linha para preços
             st.subheader(f"Evolução dos Preços - {tipo_selecionado}")
-            plot_preco_evolucao(df_filtrado, tipo_selecionado)
+            plot_preco_evolucao(df_filtrado, tipo_selecionado, max_points)
+            
+            # Métricas derivadas (calculadas uma vez por atualização)
+            with st.expander("📊 Métricas derivadas"):
+                plot_variacao_taxa(df_filtrado, max_points)
+                plot_volatilidade_preco(df_filtrado, max_points)
+                plot_preco_usd(df_filtrado, max_points)
             
             # Gráfico de linha para dólar
             st.subheader("Evolução do Dólar")
-            plot_dolar_evolucao(df_dolar)
+            plot_dolar_evolucao(df_dolar, max_points)
             
             # Tabela com dados recentes
             st.subheader("Dados Recentes")
@@ -159,117 +381,11 @@ def main():
                 use_container_width=True
             )
             
-            # Seção de Alertas
-            st.header("📢 Configuração de Alertas")
-            
-            # Formulário para novo alerta
-            with st.form("novo_alerta"):
-                st.subheader("Novo Alerta")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    nome = st.text_input("Seu Nome")
-                    email = st.text_input("Seu Email")
-                    tipo_titulo_alerta = st.selectbox(
-                        "Tipo de Título",
-                        tipos_titulo
-                    )
-                    ano_vencimento_alerta = st.selectbox(
-                        "Ano de Vencimento",
-                        sorted(vencimentos_por_ano.keys(), reverse=True)
-                    )
-                
-                with col2:
-                    st.subheader("Critérios de Alerta")
-                    (preco_min, preco_max) = st.slider(
-                        "Preço de interesse (R$)",
-                        min_value=0.0,
-                        max_value=99999.0,
-                        value=(0.0, 99999.0),
-                        step=1.0
-                    )
-
-                    (taxa_min, taxa_max) = st.slider(
-                        "Taxa de interesse (%)",
-                        min_value=0.0,
-                        max_value=99.0,
-                        value=(0.0, 99.0),
-                        step=1.0
-                    )
-                
-                if st.form_submit_button("Criar Alerta"):
-                    if nome and email:
-                        alert_manager.add_alert(
-                            nome=nome,
-                            email=email,
-                            tipo_titulo=tipo_titulo_alerta,
-                            ano_vencimento=ano_vencimento_alerta,
-                            preco_min=preco_min,
-                            preco_max=preco_max,
-                            taxa_min=taxa_min,
-                            taxa_max=taxa_max
-                        )
-                        st.success("Alerta criado com sucesso!")
-                    else:
-                        st.error("Por favor, preencha nome e email.")
-            
-            # Tabela de alertas ativos
-            st.subheader("Alertas Ativos")
-            if not alert_manager.alerts.empty:
-                # Adicionar coluna de ações
-                alertas_df = alert_manager.alerts.copy()
-                alertas_df['Ações'] = range(len(alertas_df))
-                
-                # Mostrar tabela com botões de remoção
-                for idx, alerta in alertas_df.iterrows():
-                    col1, col2 = st.columns([0.9, 0.1])
-                    with col1:
-                        st.write(
-                            f"**{alerta['nome']}** - {alerta['tipo_titulo']} "
-                            f"({alerta['ano_vencimento']})"
-                        )
-                        st.write(f"Email: {alerta['email']}")
-                        detalhes = []
-                        if pd.notna(alerta['preco_min']):
-                            detalhes.append(
-                                f"Preço Mín: R\$ {alerta['preco_min']:.2f}"
-                            )
-                        if pd.notna(alerta['preco_max']):
-                            detalhes.append(
-                                f"Preço Máx: R\$ {alerta['preco_max']:.2f}"
-                            )
-                        if pd.notna(alerta['taxa_min']):
-                            detalhes.append(
-                                f"Taxa Mín: {alerta['taxa_min']:.2f}%"
-                            )
-                        if pd.notna(alerta['taxa_max']):
-                            detalhes.append(
-                                f"Taxa Máx: {alerta['taxa_max']:.2f}%"
-                            )
-                        st.write(" | ".join(detalhes))
-                        st.write(f"Criado em: {alerta['data_criacao']}")
-                    with col2:
-                        if st.button("🗑️", key=f"remove_{idx}"):
-                            alert_manager.remove_alert(idx)
-                            st.rerun()
-                    st.divider()
-            else:
-                st.info("Nenhum alerta configurado.")
-            
-            # Botão para verificar alertas
-            if st.button("Verificar Alertas"):
-                alerts_triggered = alert_manager.check_alerts(df)
-                if alerts_triggered:
-                    st.success(f"{len(alerts_triggered)} alerta(s) acionado(s)!")
-                    for alert in alerts_triggered:
-                        try:
-                            alert_manager.send_alert_email(alert)
-                            st.success(f"Email enviado para {alert['email']}")
-                        except Exception as e:
-                            st.error(f"Erro ao enviar email: {str(e)}")
-                else:
-                    st.info("Nenhum alerta acionado.")
+            # Seção de Alertas (reexecutada isoladamente)
+            secao_alertas(
+                tipos_titulo,
+                sorted(vencimentos_por_ano.keys(), reverse=True)
+            )
         else:
             st.error("Acesso negado.")
 
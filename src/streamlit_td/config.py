@@ -23,20 +23,100 @@ BCB_API_URL = os.getenv(
     'https://api.bcb.gov.br/dados/serie/bcdata.sgs.10813/dados'
 )
 
+# Cliente HTTP compartilhado pelas buscas de dados (tempos em segundos)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.5'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+# Consultas simultâneas à API do BCB (janelas de até 10 anos)
+DOLAR_FETCH_WORKERS = int(os.getenv('DOLAR_FETCH_WORKERS', '4'))
+# Início da série do dólar buscada em segundo plano (histórico do Tesouro)
+DOLAR_PREFETCH_INICIO = os.getenv('DOLAR_PREFETCH_INICIO', '2002-01-01')
+
 # Configurações de email
 SMTP_SERVER = os.getenv('SMTP_SERVER')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
 EMAIL_USER = os.getenv('EMAIL_USER')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
+EMAIL_FROM = os.getenv('EMAIL_FROM', 'psgrigoletti@gmail.com')
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '4'))  # conexões simultâneas
+SMTP_BATCH_SIZE = int(os.getenv('SMTP_BATCH_SIZE', '50'))  # emails por lote
+SMTP_MAX_RETRIES = int(os.getenv('SMTP_MAX_RETRIES', '3'))
+SMTP_RETRY_BACKOFF = float(os.getenv('SMTP_RETRY_BACKOFF', '1.0'))  # segundos
 
 # Configurações de cache
 CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))  # 1 hora em segundos
 
+# Cache dos dados processados no Redis, compartilhado entre réplicas do app:
+# uma réplica atualiza a cada CACHE_TTL e as demais leem o resultado
+SHARED_DATASET_CACHE = (
+    os.getenv('SHARED_DATASET_CACHE', 'false').lower() == 'true'
+)
+# Espera (s) pela réplica que está atualizando, quando o cache está vazio
+SHARED_DATASET_WAIT = float(os.getenv('SHARED_DATASET_WAIT', '30'))
+# Validade (s) do lock da atualização; deve cobrir um download completo
+SHARED_DATASET_LOCK_TTL = int(os.getenv('SHARED_DATASET_LOCK_TTL', '600'))
+
+# Armazenamento local persistente (Parquet) dos dados baixados
+DATA_DIR = Path(os.getenv(
+    'DATA_DIR',
+    str(Path(__file__).parent.parent.parent / '.data')
+))
+TESOURO_STORE_DIR = DATA_DIR / 'tesouro'
+DOLAR_STORE_DIR = DATA_DIR / 'dolar'
+
+# Linhas por bloco na leitura do CSV do Tesouro Direto
+TESOURO_CSV_CHUNKSIZE = int(os.getenv('TESOURO_CSV_CHUNKSIZE', '50000'))
+
+# Gráficos: pontos por série após a redução (LTTB ou min/max)
+CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '1500'))
+CHART_DOWNSAMPLE_METHOD = os.getenv('CHART_DOWNSAMPLE_METHOD', 'minmax')
+# Acima desta quantidade de pontos os gráficos usam WebGL (Scattergl)
+CHART_WEBGL_THRESHOLD = int(os.getenv('CHART_WEBGL_THRESHOLD', '5000'))
+# Figuras mantidas em cache (por combinação de dados e seleções)
+CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', '64'))
+
+# Métricas derivadas: datas base da volatilidade móvel dos preços
+ANALYTICS_VOL_WINDOW = int(os.getenv('ANALYTICS_VOL_WINDOW', '21'))
+
+# Respostas da API de dados do Tesouro mantidas em cache (consultas)
+TESOURO_API_CACHE_SIZE = int(os.getenv('TESOURO_API_CACHE_SIZE', '128'))
+
+# Verificação periódica de alertas (intervalo em segundos)
+ALERT_CHECK_INTERVAL = int(os.getenv('ALERT_CHECK_INTERVAL', '3600'))
+# Validade (s) do lock (Redis) que impede verificações simultâneas em
+# processos diferentes; deve ser maior que a duração de uma verificação
+ALERT_CHECK_LOCK_TTL = int(os.getenv('ALERT_CHECK_LOCK_TTL', '900'))
+# Intervalo mínimo entre dois emails do mesmo alerta
+ALERT_COOLDOWN = int(os.getenv('ALERT_COOLDOWN', '86400'))  # segundos
+# Avaliação dos alertas em vários processos (1 desativa), usada a partir de
+# ALERT_PARALLEL_MIN_ALERTS alertas
+ALERT_EVAL_WORKERS = int(os.getenv('ALERT_EVAL_WORKERS', '1'))
+ALERT_PARALLEL_MIN_ALERTS = int(
+    os.getenv('ALERT_PARALLEL_MIN_ALERTS', '100000')
+)
+
+# API e agendador de alertas. Com EXTERNAL_WORKER=true o app não os inicia:
+# ambos rodam em um processo separado (worker.py) e o app apenas lê os
+# dados gravados por ele
+API_HOST = os.getenv('API_HOST', '0.0.0.0')
+API_PORT = int(os.getenv('API_PORT', '8001'))
+API_WORKERS = int(os.getenv('API_WORKERS', '1'))
+EXTERNAL_WORKER = os.getenv('EXTERNAL_WORKER', 'false').lower() == 'true'
+WORKER_URL = os.getenv('WORKER_URL', f'http://localhost:{API_PORT}')
+
 # Configurações do Redis
 REDIS_HOST = os.getenv('REDIS_HOST')
-REDIS_PORT = int(os.getenv('REDIS_PORT'))
+REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
 
+# Painel de métricas na barra lateral do app
+DEBUG_METRICS = os.getenv('DEBUG_METRICS', 'false').lower() == 'true'
+
 # Segurança
 USUARIO = os.getenv('USUARIO')
 SENHA = os.getenv('SENHA')
\ No newline at end of file
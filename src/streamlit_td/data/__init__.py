@@ -1,4 +1,42 @@
-from .tesouro import fetch_tesouro_data, process_tesouro_data
+from .tesouro import (
+    load_tesouro_data, read_tesouro_store, process_tesouro_data
+)
 from .dolar import fetch_dolar_data
+from .http import get_session, http_get, get_latency_metrics
+from .index import TesouroIndex
+from .analytics import compute_analytics, add_analytics
+from .dataset import (
+    TesouroDataset,
+    DatasetRegistry,
+    get_dataset,
+    get_dataset_registry,
+    configure_dataset_registry,
+    fetch_tesouro_data,
+    get_tesouro_index
+)
+from .shared_cache import SharedDatasetCache
+from .prefetch import prefetch_data, prefetch_tesouro, prefetch_dolar
 
-__all__ = ['fetch_tesouro_data', 'process_tesouro_data', 'fetch_dolar_data'] 
\ No newline at end of file
+__all__ = [
+    'fetch_tesouro_data',
+    'load_tesouro_data',
+    'read_tesouro_store',
+    'process_tesouro_data',
+    'fetch_dolar_data',
+    'get_session',
+    'http_get',
+    'get_latency_metrics',
+    'TesouroIndex',
+    'compute_analytics',
+    'add_analytics',
+    'TesouroDataset',
+    'DatasetRegistry',
+    'get_dataset',
+    'get_dataset_registry',
+    'configure_dataset_registry',
+    'get_tesouro_index',
+    'SharedDatasetCache',
+    'prefetch_data',
+    'prefetch_tesouro',
+    'prefetch_dolar'
+] 
\ No newline at end of file
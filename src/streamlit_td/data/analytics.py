@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append("..")
+
+from config import ANALYTICS_VOL_WINDOW
+from utils.metrics import timed
+
+
+SERIES_KEYS = ['Tipo Titulo', 'Data Vencimento']
+ANALYTICS_COLUMNS = [
+    'Variacao Taxa', 'Retorno PU', 'Volatilidade PU',
+    'Dolar', 'PU Compra USD'
+]
+
+
+@timed('analytics_compute')
+def compute_analytics(df, df_dolar=None, janela=ANALYTICS_VOL_WINDOW):
+    """
+    Calcula as métricas derivadas de cada título, de forma vetorizada.
+
+    - ``Variacao Taxa``: variação da taxa de compra (p.p.) em relação à
+      data base anterior do mesmo título
+    - ``Retorno PU``: retorno do preço de compra em relação à data base
+      anterior
+    - ``Volatilidade PU``: desvio padrão móvel de ``Retorno PU`` em
+      ``janela`` datas base
+    - ``Dolar`` e ``PU Compra USD``: cotação do dólar na data base (ou a
+      última anterior) e o preço de compra convertido
+
+    Args:
+        df (pd.DataFrame): Dados ordenados por (tipo, vencimento, data
+            base), como ``TesouroIndex.df``
+        df_dolar (pd.DataFrame, optional): Série do dólar (``data``,
+            ``valor``)
+        janela (int): Datas base da volatilidade móvel
+
+    Returns:
+        pd.DataFrame: Métricas com o mesmo índice de ``df``
+    """
+    # Primeira linha de cada título: não há data base anterior
+    tipos = df['Tipo Titulo'].astype(str).to_numpy()
+    vencimentos = df['Data Vencimento'].to_numpy()
+    inicio_serie = np.ones(len(df), dtype=bool)
+    inicio_serie[1:] = (
+        (tipos[1:] != tipos[:-1]) | (vencimentos[1:] != vencimentos[:-1])
+    )
+
+    taxa = df['Taxa Compra Manha'].to_numpy(dtype='float64')
+    preco = df['PU Compra Manha'].to_numpy(dtype='float64')
+    variacao = np.full(len(df), np.nan)
+    retorno = np.full(len(df), np.nan)
+    variacao[1:] = taxa[1:] - taxa[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retorno[1:] = preco[1:] / preco[:-1] - 1
+    variacao[inicio_serie] = np.nan
+    retorno[inicio_serie] = np.nan
+
+    analytics = pd.DataFrame({
+        'Variacao Taxa': variacao.astype('float32'),
+        'Retorno PU': retorno.astype('float32'),
+    }, index=df.index)
+    serie = np.cumsum(inicio_serie)
+    analytics['Volatilidade PU'] = (
+        analytics['Retorno PU']
+        .groupby(serie)
+        .rolling(janela, min_periods=2)
+        .std()
+        .reset_index(level=0, drop=True)
+        .astype('float32')
+    )
+
+    analytics['Dolar'] = _align_dolar(df['Data Base'], df_dolar)
+    analytics['PU Compra USD'] = (
+        df['PU Compra Manha'].astype('float64') / analytics['Dolar']
+    ).astype('float32')
+    return analytics
+
+
+def _align_dolar(datas, df_dolar):
+    """
+    Cotação do dólar de cada data base: a da própria data ou, em dias sem
+    cotação, a última anterior (as-of).
+    """
+    if df_dolar is None or df_dolar.empty:
+        return np.full(len(datas), np.nan)
+    dolar = pd.DataFrame({
+        'data': df_dolar['data'].astype('datetime64[ns]').to_numpy(),
+        'valor': df_dolar['valor'].to_numpy(dtype='float64'),
+    }).sort_values('data')
+    esquerda = pd.DataFrame({
+        'Data Base': datas.astype('datetime64[ns]').to_numpy(),
+        'posicao': np.arange(len(datas)),
+    }).sort_values('Data Base', kind='stable')
+    unido = pd.merge_asof(
+        esquerda, dolar,
+        left_on='Data Base', right_on='data',
+        direction='backward'
+    )
+    valores = np.empty(len(datas))
+    valores[unido['posicao'].to_numpy()] = unido['valor'].to_numpy()
+    return valores
+
+
+def add_analytics(df, df_dolar=None):
+    """Retorna ``df`` com as colunas de ``compute_analytics`` anexadas."""
+    return pd.concat([df, compute_analytics(df, df_dolar)], axis=1)
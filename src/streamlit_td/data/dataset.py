@@ -0,0 +1,286 @@
+import hashlib
+import threading
+import time
+
+import pandas as pd
+
+import sys
+sys.path.append("..")
+
+from config import CACHE_TTL, SHARED_DATASET_CACHE
+from utils.metrics import timed, increment
+from .analytics import add_analytics
+from .dolar import load_dolar_data
+from .index import TesouroIndex
+from .shared_cache import SharedDatasetCache
+from .tesouro import load_tesouro_data, process_tesouro_data
+
+
+class TesouroDataset:
+    """
+    Versão dos dados do Tesouro Direto já processada e indexada, com as
+    métricas derivadas (``data.analytics``) calculadas uma única vez.
+
+    Uma instância é compartilhada por referência entre todas as sessões e
+    nunca é alterada depois de publicada: ``df`` e ``index`` devem ser
+    tratados como somente leitura (filtros e ordenações geram novos
+    DataFrames). Dados novos geram uma nova instância, que substitui a
+    anterior de uma só vez.
+    """
+
+    def __init__(self, df, version, df_dolar=None):
+        self.index = TesouroIndex(df)
+        # As métricas viram colunas do DataFrame indexado, de modo que os
+        # filtros do índice já as retornam
+        self.index.df = add_analytics(self.index.df, df_dolar)
+        self.df = self.index.df
+        self.version = version
+        self.data_max = self.index.data_max
+        self.dolar_max = (
+            df_dolar['data'].max()
+            if df_dolar is not None and not df_dolar.empty else None
+        )
+        self.carregado_em = time.time()
+        # Identifica o conteúdo: qualquer linha revista, inclusive do
+        # passado, ou cotação do dólar nova gera outra chave
+        self.key = _content_key(self.df)
+
+
+class DatasetRegistry:
+    """
+    Guarda a versão atual do conjunto de dados do processo.
+
+    A primeira leitura carrega os dados de forma síncrona. Depois disso,
+    leituras de uma versão com mais de ``max_age`` segundos retornam
+    imediatamente a versão atual e disparam a atualização em segundo
+    plano; a nova versão só é publicada quando estiver pronta.
+
+    Com ``shared_cache``, os dados vêm do cache no Redis compartilhado
+    entre as réplicas; só a réplica que atualiza o cache acessa as APIs.
+    """
+
+    def __init__(
+        self, max_age=CACHE_TTL, loader=None, dolar_loader=None,
+        shared_cache=None
+    ):
+        self.max_age = max_age
+        self.loader = loader or (
+            lambda: process_tesouro_data(load_tesouro_data())
+        )
+        self.dolar_loader = dolar_loader or _load_dolar_span
+        # Cache no Redis compartilhado entre réplicas (SharedDatasetCache)
+        self.shared_cache = shared_cache
+        self._shared_version = None
+        self._current = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def current(self):
+        """Versão publicada (None se ainda não carregada)."""
+        return self._current
+
+    def get(self):
+        """
+        Retorna a versão atual, carregando ou agendando a atualização
+        quando necessário.
+
+        Returns:
+            TesouroDataset: Dados compartilhados (somente leitura)
+        """
+        atual = self._current
+        if atual is None:
+            increment('dataset_cache', resultado='miss')
+            with self._refresh_lock:
+                if self._current is None:
+                    self._load()
+            return self._current
+        if time.time() - atual.carregado_em > self.max_age:
+            increment('dataset_cache', resultado='stale')
+            self.refresh_async()
+        else:
+            increment('dataset_cache', resultado='hit')
+        return atual
+
+    def refresh(self, df=None):
+        """
+        Carrega os dados (ou usa ``df``, já processado) e publica uma nova
+        versão se o conteúdo mudou.
+
+        Returns:
+            TesouroDataset: Versão publicada após a atualização
+        """
+        with self._refresh_lock:
+            return self._load(df)
+
+    def refresh_async(self):
+        """Atualiza em segundo plano, se não houver outra atualização."""
+        # O lock é tomado aqui e liberado pela thread: chamadas simultâneas
+        # não iniciam duas atualizações
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(
+                target=self._refresh_safe, name="tesouro-refresh",
+                daemon=True
+            ).start()
+        except BaseException:
+            self._refresh_lock.release()
+            raise
+
+    def _refresh_safe(self):
+        """Executa a atualização com ``_refresh_lock`` já adquirido."""
+        try:
+            self._load()
+        except Exception as e:
+            print(f"Erro ao atualizar dados do Tesouro Direto: {str(e)}")
+        finally:
+            self._refresh_lock.release()
+
+    @timed('dataset_refresh')
+    def _load(self, df=None):
+        if df is not None:
+            df_dolar = self._load_dolar(df)
+        elif self.shared_cache is not None:
+            dados = self._load_shared()
+            if dados is None:
+                # O cache compartilhado não mudou: mantém a versão atual
+                with self._lock:
+                    self._current.carregado_em = time.time()
+                    return self._current
+            df, df_dolar = dados
+        else:
+            df, df_dolar = self._fetch()
+        with timed('dataset_build'):
+            novo = TesouroDataset(df, self._version + 1, df_dolar)
+        with self._lock:
+            atual = self._current
+            if atual is not None and atual.key == novo.key:
+                # Mesmo conteúdo: mantém a versão (e os caches que
+                # dependem dela), apenas renovando o prazo
+                atual.carregado_em = novo.carregado_em
+                return atual
+            self._version += 1
+            self._current = novo
+            return novo
+
+    def _fetch(self):
+        """Busca os dados do Tesouro e do dólar nas APIs."""
+        df = self.loader()
+        if df is None:
+            raise ValueError("Dados do Tesouro Direto indisponíveis")
+        return df, self._load_dolar(df)
+
+    def _load_dolar(self, df):
+        return self.dolar_loader(df['Data Base'].min(), df['Data Base'].max())
+
+    def _load_shared(self):
+        """
+        Dados do cache compartilhado (atualizado por esta réplica, se
+        vencido), ou None se ele ainda está na versão já publicada.
+        """
+        from redis.exceptions import RedisError
+
+        try:
+            dados = self.shared_cache.get_or_refresh(
+                self._fetch,
+                self._shared_version if self._current is not None else None
+            )
+        except RedisError as e:
+            # Sem o Redis, cada réplica busca os próprios dados
+            print(f"Erro no cache compartilhado de dados: {str(e)}")
+            return self._fetch()
+        if dados is None:
+            return None
+        self._shared_version = dados['versao']
+        return dados['df'], dados['df_dolar']
+
+
+def _content_key(df):
+    """Hash do conteúdo de um DataFrame (valores e colunas)."""
+    if df.empty:
+        return 'vazio'
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\0'.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy())
+    return digest.hexdigest()
+
+
+def _load_dolar_span(data_inicio, data_fim):
+    """Série do dólar do período dos dados (None se indisponível)."""
+    try:
+        return load_dolar_data(data_inicio, data_fim)
+    except Exception as e:
+        print(f"Erro ao buscar dados do Dólar: {str(e)}")
+        return None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _shared_cache():
+    """Cache compartilhado entre réplicas, se ``SHARED_DATASET_CACHE``."""
+    return SharedDatasetCache() if SHARED_DATASET_CACHE else None
+
+
+def get_dataset_registry():
+    """Retorna o registro de dados único do processo."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DatasetRegistry(shared_cache=_shared_cache())
+        return _registry
+
+
+def configure_dataset_registry(**kwargs):
+    """
+    Substitui o registro de dados do processo por um configurado com
+    ``kwargs`` (ver ``DatasetRegistry``). Deve ser chamado antes do primeiro
+    acesso aos dados.
+    """
+    global _registry
+    kwargs.setdefault('shared_cache', _shared_cache())
+    with _registry_lock:
+        _registry = DatasetRegistry(**kwargs)
+        return _registry
+
+
+def get_dataset():
+    """Retorna a versão atual dos dados do Tesouro Direto."""
+    return get_dataset_registry().get()
+
+
+# Acessos usados pelo app. O Streamlit só é importado para exibir erros: a
+# API usa este módulo sem ele
+
+
+def fetch_tesouro_data():
+    """
+    Busca dados do Tesouro Direto através da API do Tesouro Transparente.
+
+    Retorna o DataFrame processado compartilhado pelo processo (somente
+    leitura), atualizado a cada ``CACHE_TTL`` segundos.
+    """
+    try:
+        return get_dataset().df
+    except Exception as e:
+        import streamlit as st
+
+        st.error(f"Erro ao buscar dados do Tesouro Direto: {str(e)}")
+        return None
+
+
+def get_tesouro_index():
+    """
+    Retorna o índice dos dados do Tesouro Direto, construído uma vez por
+    versão dos dados e compartilhado entre sessões e execuções do script.
+    """
+    try:
+        return get_dataset().index
+    except Exception as e:
+        import streamlit as st
+
+        st.error(f"Erro ao buscar dados do Tesouro Direto: {str(e)}")
+        return None
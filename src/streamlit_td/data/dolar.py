@@ -1,59 +1,118 @@
-import streamlit as st
+import threading
+
 import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import sys
 sys.path.append("..")
 
-from config import BCB_API_URL, CACHE_TTL
+from config import BCB_API_URL, DOLAR_FETCH_WORKERS
+from utils.metrics import timed, increment
+from .http import http_get
+from .store import DolarStore
+
+
+# Limite de período por consulta da API do BCB (~10 anos)
+MAX_DIAS_CONSULTA = 3650
+
+_store = None
+# Serializa as buscas: quem chega durante uma busca (ex.: a pré-busca de
+# todo o histórico) espera por ela e encontra o período já coberto
+_load_lock = threading.Lock()
+
+
+def get_dolar_store():
+    """Retorna o armazenamento local da série do dólar do processo."""
+    global _store
+    if _store is None:
+        _store = DolarStore()
+    return _store
 
 
-@st.cache_data(ttl=CACHE_TTL)
 def fetch_dolar_data(data_inicio, data_fim):
     """
     Busca dados do dólar através da API do Banco Central do Brasil.
-    Os dados são cacheados por 1 hora para evitar múltiplas requisições.
-    
-    Como a API do BCB tem limite de 10 anos por consulta, esta função
-    divide o período em consultas menores quando necessário.
+
+    Os dados ficam em um armazenamento local; apenas os trechos do período
+    ainda não consultados são buscados na API, e o restante é servido
+    direto do armazenamento.
+    """
+    try:
+        return load_dolar_data(data_inicio, data_fim)
+    except Exception as e:
+        import streamlit as st
+
+        st.error(f"Erro ao buscar dados do Dólar: {str(e)}")
+        return get_dolar_store().slice(
+            _to_date(data_inicio), _to_date(data_fim)
+        )
+
+
+@timed('dolar_load')
+def load_dolar_data(data_inicio, data_fim, store=None):
+    """
+    Retorna a série do dólar no período, buscando no BCB apenas as
+    lacunas do armazenamento local.
+
+    Como a API do BCB tem limite de 10 anos por consulta, as lacunas são
+    divididas em janelas menores, buscadas em paralelo.
+
+    Buscas simultâneas são serializadas, para que uma lacuna em busca por
+    outra thread não seja buscada de novo.
+
+    Returns:
+        pd.DataFrame | None: Colunas ``data`` e ``valor``
     """
-    # Converter para datetime se necessário
-    if isinstance(data_inicio, str):
-        data_inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
-    if isinstance(data_fim, str):
-        data_fim = datetime.strptime(data_fim, '%Y-%m-%d')
-    
-    # Calcular diferença em anos
-    diff_anos = (data_fim - data_inicio).days / 365.25
-    
-    # Se o período for menor que 10 anos, faz uma única consulta
-    if diff_anos <= 10:
-        return _fetch_dolar_periodo(data_inicio, data_fim)
-    
-    # Para períodos maiores que 10 anos, divide em consultas menores
-    dados_completos = []
+    store = store or get_dolar_store()
+    data_inicio = _to_date(data_inicio)
+    data_fim = _to_date(data_fim)
+
+    if not store.missing(data_inicio, data_fim):
+        increment('dolar_fetch', resultado='hit')
+    else:
+        increment('dolar_fetch', resultado='miss')
+        with _load_lock:
+            janelas = [
+                janela
+                for lacuna in store.missing(data_inicio, data_fim)
+                for janela in _split_windows(*lacuna)
+            ]
+            if janelas:
+                with ThreadPoolExecutor(
+                    max_workers=min(DOLAR_FETCH_WORKERS, len(janelas))
+                ) as executor:
+                    resultados = list(executor.map(
+                        lambda janela: _fetch_dolar_periodo(*janela),
+                        janelas
+                    ))
+                for (inicio, fim), df in zip(janelas, resultados):
+                    store.add(df, inicio, fim)
+
+    return store.slice(data_inicio, data_fim)
+
+
+def _to_date(valor):
+    """Converte str ('%Y-%m-%d'), datetime ou date para date."""
+    if isinstance(valor, str):
+        valor = datetime.strptime(valor, '%Y-%m-%d')
+    if isinstance(valor, datetime):
+        return valor.date()
+    return valor
+
+
+def _split_windows(data_inicio, data_fim):
+    """Divide um período em janelas aceitas pela API do BCB."""
+    janelas = []
     data_atual = data_inicio
-    
-    while data_atual < data_fim:
-        # Calcular data final do período atual (máximo 10 anos)
+    while data_atual <= data_fim:
         data_fim_periodo = min(
-            data_atual + timedelta(days=3650),  # ~10 anos
+            data_atual + timedelta(days=MAX_DIAS_CONSULTA),
             data_fim
         )
-        
-        # Buscar dados do período atual
-        dados_periodo = _fetch_dolar_periodo(data_atual, data_fim_periodo)
-        if dados_periodo is not None:
-            dados_completos.append(dados_periodo)
-        
-        # Avançar para o próximo período
+        janelas.append((data_atual, data_fim_periodo))
         data_atual = data_fim_periodo + timedelta(days=1)
-    
-    # Combinar todos os dados
-    if dados_completos:
-        return pd.concat(dados_completos, ignore_index=True)
-    return None
+    return janelas
 
 
 def _fetch_dolar_periodo(data_inicio, data_fim):
@@ -63,21 +122,22 @@ def _fetch_dolar_periodo(data_inicio, data_fim):
     # Formatar datas para o formato da API do BCB
     data_inicio_str = data_inicio.strftime('%d/%m/%Y')
     data_fim_str = data_fim.strftime('%d/%m/%Y')
-    
+
     # URL da API do BCB para cotação do dólar (código 10813)
     url = f"{BCB_API_URL}?formato=json&dataInicial={data_inicio_str}&dataFinal={data_fim_str}"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        dados = response.json()
-        
-        # Converter para DataFrame
-        df = pd.DataFrame(dados)
-        df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y')
-        df['valor'] = pd.to_numeric(df['valor'])
-        
-        return df
-    except Exception as e:
-        st.error(f"Erro ao buscar dados do Dólar: {str(e)}")
-        return None 
\ No newline at end of file
+
+    response = http_get(url, endpoint='bcb_dolar')
+    # A API responde 404 quando não há cotações no período
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    dados = response.json()
+    if not dados:
+        return None
+
+    # Converter para DataFrame
+    df = pd.DataFrame(dados)
+    df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y')
+    df['valor'] = pd.to_numeric(df['valor'])
+
+    return df
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import sys
+sys.path.append("..")
+
+from config import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF, HTTP_POOL_SIZE
+)
+from utils.metrics import observe, increment
+
+
+# Respostas do servidor que justificam uma nova tentativa
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Retorna a sessão HTTP compartilhada do processo.
+
+    A sessão reaproveita conexões (evitando um novo handshake TLS a cada
+    busca), repete falhas transitórias com backoff exponencial e jitter e
+    pede respostas comprimidas.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _create_session()
+        return _session
+
+
+def _create_session():
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        backoff_jitter=HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+
+def http_get(url, endpoint, timeout=None, **kwargs):
+    """
+    Faz um GET pela sessão compartilhada, registrando a latência.
+
+    Com ``stream=True`` a latência medida é até o recebimento dos
+    cabeçalhos.
+
+    Args:
+        url (str): URL da requisição
+        endpoint (str): Nome usado para agrupar as métricas
+        timeout (tuple, optional): (conexão, leitura) em segundos
+        **kwargs: Repassados para ``requests.Session.get``
+
+    Returns:
+        requests.Response: Resposta do servidor
+    """
+    timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    inicio = time.perf_counter()
+    erro = False
+    try:
+        response = get_session().get(url, timeout=timeout, **kwargs)
+        erro = response.status_code >= 500
+        return response
+    except requests.RequestException:
+        erro = True
+        raise
+    finally:
+        _record(endpoint, time.perf_counter() - inicio, erro)
+
+
+def _record(endpoint, duracao, erro):
+    observe('http_request', duracao, endpoint=endpoint)
+    if erro:
+        increment('http_request_errors', endpoint=endpoint)
+    with _metrics_lock:
+        m = _metrics.setdefault(endpoint, {
+            'requisicoes': 0, 'erros': 0, 'tempo_total': 0.0,
+            'tempo_max': 0.0, 'ultimo': None,
+        })
+        m['requisicoes'] += 1
+        m['erros'] += int(erro)
+        m['tempo_total'] += duracao
+        m['tempo_max'] = max(m['tempo_max'], duracao)
+        m['ultimo'] = duracao
+
+
+def get_latency_metrics():
+    """
+    Retorna as métricas de latência por endpoint.
+
+    Returns:
+        dict: endpoint -> requisições, erros, tempo total, médio, máximo e
+        da última requisição (segundos)
+    """
+    with _metrics_lock:
+        return {
+            endpoint: {
+                **m,
+                'tempo_medio': m['tempo_total'] / m['requisicoes'],
+            }
+            for endpoint, m in _metrics.items()
+        }
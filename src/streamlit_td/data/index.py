@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append("..")
+
+from utils.metrics import timed
+
+
+SORT_COLUMNS = ['Tipo Titulo', 'Data Vencimento', 'Data Base']
+
+
+class TesouroIndex:
+    """
+    Índice dos dados do Tesouro Direto para filtragem por fatias.
+
+    O DataFrame é ordenado uma única vez por (tipo, vencimento, data base)
+    e são guardadas as posições de início e fim de cada tipo de título e
+    de cada vencimento. Filtrar por tipo, vencimentos e período passa a
+    ser uma busca binária nas datas de cada bloco, sem varrer o histórico.
+    """
+
+    def __init__(self, df):
+        # Ordem de aparição dos tipos, como em df['Tipo Titulo'].unique()
+        self.tipos = [str(tipo) for tipo in pd.unique(df['Tipo Titulo'])]
+
+        self.df = df.sort_values(
+            SORT_COLUMNS, kind='stable', ignore_index=True
+        )
+        self.data_min = self.df['Data Base'].min()
+        self.data_max = self.df['Data Base'].max()
+        self._datas = self.df['Data Base'].to_numpy()
+
+        # Limites dos blocos (tipo, vencimento) no DataFrame ordenado
+        tipos = self.df['Tipo Titulo'].astype(str).to_numpy()
+        vencimentos = self.df['Data Vencimento'].to_numpy()
+        mudancas = np.flatnonzero(
+            (tipos[1:] != tipos[:-1]) | (vencimentos[1:] != vencimentos[:-1])
+        ) + 1
+        inicios = np.concatenate([[0], mudancas]).astype(int)
+        fins = np.concatenate([mudancas, [len(self.df)]]).astype(int)
+
+        self._titulos = {}
+        self._vencimentos = {}
+        for inicio, fim in zip(inicios, fins):
+            tipo = tipos[inicio]
+            vencimento = pd.Timestamp(vencimentos[inicio])
+            self._vencimentos.setdefault(tipo, {})[vencimento] = (inicio, fim)
+            titulo_inicio, _ = self._titulos.get(tipo, (inicio, fim))
+            self._titulos[tipo] = (titulo_inicio, fim)
+
+        self._vencimentos_por_ano = {}
+        for tipo, blocos in self._vencimentos.items():
+            por_ano = {}
+            for vencimento in blocos:
+                por_ano.setdefault(vencimento.year, []).append(vencimento)
+            self._vencimentos_por_ano[tipo] = por_ano
+
+    def vencimentos_por_ano(self, tipo):
+        """
+        Datas de vencimento de um tipo de título agrupadas por ano.
+
+        Returns:
+            dict: ano -> lista de datas de vencimento
+        """
+        return self._vencimentos_por_ano.get(str(tipo), {})
+
+    def titulo(self, tipo):
+        """Todas as linhas de um tipo de título (fatia, sem cópia)."""
+        inicio, fim = self._titulos.get(str(tipo), (0, 0))
+        return self.df.iloc[inicio:fim]
+
+    @timed('tesouro_filter')
+    def filter(self, tipo, vencimentos=None, data_inicio=None, data_fim=None):
+        """
+        Filtra os dados por tipo, vencimentos e período de data base.
+
+        Args:
+            tipo (str): Tipo do título
+            vencimentos (list, optional): Datas de vencimento; vazio ou
+                None considera todos os vencimentos do tipo
+            data_inicio (date, optional): Data base inicial
+            data_fim (date, optional): Data base final
+
+        Returns:
+            pd.DataFrame: Linhas selecionadas, ordenadas por Data Base
+        """
+        blocos = self._vencimentos.get(str(tipo), {})
+        if vencimentos:
+            selecionados = [
+                blocos[pd.Timestamp(v)] for v in vencimentos
+                if pd.Timestamp(v) in blocos
+            ]
+        else:
+            selecionados = list(blocos.values())
+
+        inicio_np = (
+            pd.Timestamp(data_inicio).to_datetime64()
+            if data_inicio is not None else None
+        )
+        fim_np = (
+            pd.Timestamp(data_fim).to_datetime64()
+            if data_fim is not None else None
+        )
+        posicoes = []
+        for inicio, fim in selecionados:
+            datas = self._datas[inicio:fim]
+            ini = datas.searchsorted(inicio_np) if inicio_np is not None else 0
+            fi = (
+                datas.searchsorted(fim_np, side='right')
+                if fim_np is not None else len(datas)
+            )
+            if ini < fi:
+                posicoes.append(np.arange(inicio + ini, inicio + fi))
+
+        if not posicoes:
+            return self.df.iloc[:0]
+        filtrado = self.df.iloc[np.concatenate(posicoes)]
+        return filtrado.sort_values('Data Base', kind='stable')
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import sys
+sys.path.append("..")
+
+from config import DOLAR_PREFETCH_INICIO
+from .dataset import get_dataset
+from .dolar import load_dolar_data
+
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+_futures = {}
+_futures_lock = threading.Lock()
+
+
+def _submit(chave, func, *args):
+    """Agenda ``func`` em segundo plano, exceto se já estiver em curso."""
+    with _futures_lock:
+        future = _futures.get(chave)
+        if future is None or future.done():
+            future = _executor.submit(func, *args)
+            _futures[chave] = future
+        return future
+
+
+def prefetch_tesouro():
+    """
+    Carrega os dados do Tesouro Direto em segundo plano.
+
+    Returns:
+        Future: Resolve para o ``TesouroDataset`` atual
+    """
+    return _submit('tesouro', get_dataset)
+
+
+def prefetch_dolar(data_inicio=None, data_fim=None):
+    """
+    Busca em segundo plano a série do dólar, por padrão de
+    ``DOLAR_PREFETCH_INICIO`` até hoje, preenchendo o armazenamento local.
+    Consultas posteriores de qualquer trecho do período saem direto dele.
+
+    Returns:
+        Future: Resolve para a série do período
+    """
+    return _submit(
+        'dolar', load_dolar_data,
+        data_inicio or DOLAR_PREFETCH_INICIO,
+        data_fim or date.today()
+    )
+
+
+def prefetch_data():
+    """
+    Dispara ao mesmo tempo a carga do Tesouro Direto e a do dólar.
+
+    Quem pedir os dados em seguida (``get_tesouro_index``,
+    ``fetch_dolar_data``) espera apenas pela busca ainda em curso, de modo
+    que a primeira página custa o tempo da busca mais lenta, e não a soma
+    das duas.
+
+    Returns:
+        dict: Futures das buscas (``tesouro`` e ``dolar``)
+    """
+    return {
+        'tesouro': prefetch_tesouro(),
+        'dolar': prefetch_dolar(),
+    }
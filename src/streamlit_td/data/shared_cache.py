@@ -0,0 +1,188 @@
+import time
+import uuid
+
+import pyarrow as pa
+
+import sys
+sys.path.append("..")
+
+from config import CACHE_TTL, SHARED_DATASET_WAIT, SHARED_DATASET_LOCK_TTL
+from utils.metrics import timed, increment
+from utils.redis import RedisManager
+
+
+# Hash com os dados: versao, carregado_em, tesouro e dolar (Arrow IPC)
+DATASET_KEY = "tesouro:dataset"
+# Versão dos dados, consultada pelas réplicas sem baixar os blobs
+VERSION_KEY = "tesouro:dataset:versao"
+LOCK_KEY = "tesouro:dataset:lock"
+COMPRESSION = 'zstd' if pa.Codec.is_available('zstd') else 'lz4'
+# Intervalo entre as consultas enquanto outra réplica faz a primeira carga
+POLL_INTERVAL = 0.5
+
+
+class SharedDatasetCache:
+    """
+    Dados processados do Tesouro Direto e a série do dólar guardados no
+    Redis, compartilhados entre as réplicas do app.
+
+    Os DataFrames são gravados como blobs Arrow IPC comprimidos (tipos,
+    categorias e datas preservados) em um único hash, lido com um só
+    comando. A cada ``max_age`` segundos apenas a réplica que obtiver o
+    lock baixa os dados das APIs; as demais leem a versão gravada por ela.
+    """
+
+    def __init__(
+        self, redis_manager=None, max_age=CACHE_TTL,
+        wait=SHARED_DATASET_WAIT, lock_ttl=SHARED_DATASET_LOCK_TTL
+    ):
+        # Cliente binário: os blobs não são texto
+        self.redis_manager = (
+            redis_manager or RedisManager(decode_responses=False)
+        )
+        self.max_age = max_age
+        self.wait = wait
+        self.lock_ttl = lock_ttl
+
+    @property
+    def _client(self):
+        return self.redis_manager.redis_client
+
+    def version(self):
+        """Versão gravada (0 se o cache estiver vazio)."""
+        return int(self._client.get(VERSION_KEY) or 0)
+
+    @timed('shared_dataset_load')
+    def load(self):
+        """
+        Lê os dados gravados.
+
+        Returns:
+            dict | None: ``versao``, ``carregado_em`` (timestamp), ``df`` e
+            ``df_dolar`` (None se não gravado); None se o cache estiver
+            vazio
+        """
+        campos = self._client.hgetall(DATASET_KEY)
+        if not campos.get(b'tesouro'):
+            return None
+        dolar = campos.get(b'dolar')
+        return {
+            'versao': int(campos[b'versao']),
+            'carregado_em': float(campos[b'carregado_em']),
+            'df': _from_ipc(campos[b'tesouro']),
+            'df_dolar': _from_ipc(dolar) if dolar else None,
+        }
+
+    @timed('shared_dataset_save')
+    def save(self, df, df_dolar=None):
+        """
+        Grava uma nova versão dos dados.
+
+        Returns:
+            dict: Dados gravados (ver ``load``)
+        """
+        carregado_em = time.time()
+        mapping = {
+            'carregado_em': repr(carregado_em),
+            'tesouro': _to_ipc(df),
+        }
+        if df_dolar is not None:
+            mapping['dolar'] = _to_ipc(df_dolar)
+        versao = self._client.incr(VERSION_KEY)
+        mapping['versao'] = versao
+        pipe = self.redis_manager.pipeline()
+        pipe.hset(DATASET_KEY, mapping=mapping)
+        if df_dolar is None:
+            pipe.hdel(DATASET_KEY, 'dolar')
+        pipe.execute()
+        return {
+            'versao': versao, 'carregado_em': carregado_em,
+            'df': df, 'df_dolar': df_dolar,
+        }
+
+    def get_or_refresh(self, fetch, known_version=None):
+        """
+        Retorna os dados do cache, atualizando-os com ``fetch`` se estiverem
+        vencidos e nenhuma outra réplica estiver atualizando.
+
+        Args:
+            fetch (callable): Busca os dados nas APIs; retorna
+                ``(df, df_dolar)``
+            known_version (int, optional): Versão que o chamador já tem
+
+        Returns:
+            dict | None: Dados (ver ``load``), ou None se o cache ainda está
+            na ``known_version``
+        """
+        versao, carregado_em = self._client.hmget(
+            DATASET_KEY, 'versao', 'carregado_em'
+        )
+        versao = int(versao) if versao else None
+        if versao and time.time() - float(carregado_em) <= self.max_age:
+            return self._read(versao, known_version, 'hit')
+
+        token = uuid.uuid4().hex
+        if self._client.set(LOCK_KEY, token, nx=True, ex=self.lock_ttl):
+            try:
+                increment('shared_dataset', resultado='atualizacao')
+                return self.save(*fetch())
+            finally:
+                self._release(token)
+
+        # Outra réplica está atualizando: a versão vencida ainda serve
+        if versao:
+            return self._read(versao, known_version, 'vencido')
+        # Cache vazio: espera a primeira gravação
+        limite = time.monotonic() + self.wait
+        while time.monotonic() < limite:
+            time.sleep(POLL_INTERVAL)
+            if self.version():
+                dados = self.load()
+                if dados is not None:
+                    increment('shared_dataset', resultado='espera')
+                    return dados
+        increment('shared_dataset', resultado='espera_esgotada')
+        df, df_dolar = fetch()
+        return {
+            'versao': None, 'carregado_em': time.time(),
+            'df': df, 'df_dolar': df_dolar,
+        }
+
+    def _read(self, versao, known_version, resultado):
+        if versao == known_version:
+            increment('shared_dataset', resultado='inalterado')
+            return None
+        increment('shared_dataset', resultado=resultado)
+        return self.load()
+
+    def _release(self, token):
+        """Libera o lock, se ele ainda pertence a ``token``."""
+        from redis.exceptions import WatchError
+
+        with self.redis_manager.pipeline() as pipe:
+            try:
+                pipe.watch(LOCK_KEY)
+                if pipe.get(LOCK_KEY) != token.encode():
+                    pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(LOCK_KEY)
+                pipe.execute()
+            except WatchError:
+                pass
+
+
+def _to_ipc(df):
+    """Serializa um DataFrame como Arrow IPC comprimido."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_ipc(blob):
+    """Lê um DataFrame gravado por ``_to_ipc``."""
+    with pa.ipc.open_stream(pa.py_buffer(blob)) as reader:
+        return reader.read_all().to_pandas()
@@ -0,0 +1,402 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import sys
+sys.path.append("..")
+
+from config import TESOURO_STORE_DIR, DOLAR_STORE_DIR, CACHE_TTL
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+
+# Quantidade de arquivos em uma partição a partir da qual ela é compactada
+MAX_ARQUIVOS_PARTICAO = 16
+
+
+class TesouroStore:
+    """
+    Armazenamento local do histórico do Tesouro Direto em Parquet.
+
+    Os dados ficam particionados por tipo de título e ano da data base
+    (``dados/tipo=<tipo>/ano=<ano>/*.parquet``). Um arquivo ``meta.json``
+    guarda a maior ``Data Base`` armazenada e os cabeçalhos ``ETag`` e
+    ``Last-Modified`` do último download, usados em requisições
+    condicionais.
+
+    Vários processos podem usar o mesmo diretório (réplicas do app, worker
+    e API): escritas e compactações tomam um lock exclusivo no arquivo
+    ``.lock`` e a leitura do histórico um lock compartilhado, de modo que
+    nenhuma leitura encontre uma partição pela metade.
+    """
+
+    def __init__(self, base_dir=TESOURO_STORE_DIR):
+        self.base_dir = Path(base_dir)
+        self.data_dir = self.base_dir / 'dados'
+        self.meta_path = self.base_dir / 'meta.json'
+        self.lock_path = self.base_dir / '.lock'
+
+    def load_meta(self):
+        """Retorna os metadados do armazenamento (vazio se não existir)."""
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_meta(self, meta):
+        """Grava os metadados de forma atômica."""
+        with _file_lock(self.lock_path):
+            _write_json(meta, self.meta_path)
+
+    def is_empty(self):
+        """Indica se ainda não há dados armazenados."""
+        return not self.load_meta().get('max_data_base') or not any(
+            self.data_dir.rglob('*.parquet')
+        )
+
+    def load(self):
+        """
+        Carrega todo o histórico armazenado.
+
+        A leitura usa memory-map dos arquivos Parquet, evitando o parse do
+        CSV na inicialização.
+
+        Returns:
+            pd.DataFrame | None: Dados armazenados ou None se vazio
+        """
+        with _file_lock(self.lock_path, shared=True):
+            if self.is_empty():
+                return None
+            table = pq.read_table(
+                self.data_dir,
+                memory_map=True,
+                partitioning=None
+            )
+        return table.to_pandas().sort_values(
+            ['Data Base', 'Tipo Titulo', 'Data Vencimento'],
+            ignore_index=True
+        )
+
+    def append(self, df):
+        """
+        Acrescenta ao armazenamento apenas as linhas com ``Data Base``
+        posterior à maior data já armazenada.
+
+        Args:
+            df (pd.DataFrame): Dados processados (datas já convertidas)
+
+        Returns:
+            int: Quantidade de linhas acrescentadas
+        """
+        # Os metadados são relidos com o lock: outro processo pode ter
+        # acrescentado as mesmas datas enquanto este baixava o CSV
+        with _file_lock(self.lock_path):
+            return self._append(df)
+
+    def _append(self, df):
+        meta = self.load_meta()
+        max_data_base = meta.get('max_data_base')
+        novos = df
+        if max_data_base and not self.is_empty():
+            novos = df[df['Data Base'] > pd.Timestamp(max_data_base)]
+        if novos.empty:
+            return 0
+
+        # O nome do arquivo depende apenas da maior data acrescentada, de
+        # modo que repetir um append interrompido sobrescreve o arquivo
+        nova_max = novos['Data Base'].max()
+        nome_arquivo = f"part-{nova_max:%Y%m%d}.parquet"
+        grupos = novos.groupby(
+            [novos['Tipo Titulo'], novos['Data Base'].dt.year],
+            observed=True
+        )
+        for (tipo, ano), grupo in grupos:
+            particao = self._particao(tipo, ano)
+            particao.mkdir(parents=True, exist_ok=True)
+            self._write_parquet(
+                grupo.reset_index(drop=True),
+                particao / nome_arquivo
+            )
+            self._compact(particao)
+
+        meta['max_data_base'] = nova_max.strftime('%Y-%m-%d')
+        _write_json(meta, self.meta_path)
+        return len(novos)
+
+    def update_http_meta(self, etag=None, last_modified=None):
+        """Registra os cabeçalhos de cache HTTP do último download."""
+        with _file_lock(self.lock_path):
+            meta = self.load_meta()
+            meta['etag'] = etag
+            meta['last_modified'] = last_modified
+            _write_json(meta, self.meta_path)
+
+    def _particao(self, tipo, ano):
+        return (
+            self.data_dir /
+            f"tipo={quote(str(tipo), safe='')}" /
+            f"ano={int(ano)}"
+        )
+
+    def _write_parquet(self, df, path):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        _write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+    def _compact(self, particao):
+        """
+        Junta os arquivos de uma partição quando eles se acumulam. Chamado
+        com o lock exclusivo: nenhum processo está listando a partição.
+        """
+        arquivos = sorted(particao.glob('*.parquet'))
+        if len(arquivos) <= MAX_ARQUIVOS_PARTICAO:
+            return
+        df = pq.read_table(arquivos, partitioning=None).to_pandas()
+        # Mantém o nome do arquivo mais recente para preservar a
+        # idempotência de appends repetidos
+        self._write_parquet(df, arquivos[-1])
+        for arquivo in arquivos[:-1]:
+            arquivo.unlink()
+
+
+class DolarStore:
+    """
+    Armazenamento local da série do dólar (SGS 10813) em Parquet.
+
+    Além dos dados, ``meta.json`` guarda os intervalos de datas já
+    consultados no BCB, de modo que apenas as lacunas precisem ser
+    buscadas. Como o último dia útil pode ainda não ter sido publicado, a
+    cobertura a partir de ontem só vale por ``CACHE_TTL`` segundos.
+
+    Os arquivos ficam em cache na instância e são relidos quando outro
+    processo os substitui; as escritas tomam um lock exclusivo no arquivo
+    ``.lock`` e partem do conteúdo atual do disco.
+    """
+
+    def __init__(self, base_dir=DOLAR_STORE_DIR, ttl_recente=CACHE_TTL):
+        self.base_dir = Path(base_dir)
+        self.data_path = self.base_dir / 'serie.parquet'
+        self.meta_path = self.base_dir / 'meta.json'
+        self.lock_path = self.base_dir / '.lock'
+        self.ttl_recente = ttl_recente
+        self._lock = threading.Lock()
+        self._df = None
+        self._df_versao = None
+        self._meta = None
+        self._meta_versao = None
+
+    def missing(self, inicio, fim):
+        """
+        Retorna os intervalos de ``[inicio, fim]`` ainda não consultados.
+
+        Args:
+            inicio (date): Data inicial
+            fim (date): Data final
+
+        Returns:
+            list: Lista de tuplas (inicio, fim) das lacunas
+        """
+        with self._lock:
+            cobertos = self._cobertura()
+        lacunas = []
+        atual = inicio
+        for ini, fi in cobertos:
+            if fi < atual:
+                continue
+            if ini > fim:
+                break
+            if ini > atual:
+                lacunas.append((atual, min(ini - timedelta(days=1), fim)))
+            atual = max(atual, fi + timedelta(days=1))
+            if atual > fim:
+                break
+        if atual <= fim:
+            lacunas.append((atual, fim))
+        return lacunas
+
+    def add(self, df, inicio, fim):
+        """
+        Acrescenta os dados de uma consulta e marca o intervalo como
+        coberto.
+
+        Args:
+            df (pd.DataFrame): Colunas ``data`` e ``valor``
+            inicio (date): Data inicial consultada
+            fim (date): Data final consultada
+        """
+        with self._lock, _file_lock(self.lock_path):
+            atual = self._load_df()
+            if df is not None and not df.empty:
+                novos = df[['data', 'valor']]
+                if not atual.empty:
+                    novos = pd.concat([atual, novos])
+                atual = (
+                    novos.drop_duplicates('data', keep='last')
+                    .sort_values('data', ignore_index=True)
+                )
+                _write_atomic(
+                    self.data_path,
+                    lambda tmp_path: atual.to_parquet(tmp_path, index=False)
+                )
+                self._df = atual
+                self._df_versao = _file_version(self.data_path)
+
+            meta = self._load_meta()
+            intervalos = [
+                (date.fromisoformat(ini), date.fromisoformat(fi))
+                for ini, fi in meta.get('intervalos', [])
+            ]
+            meta['intervalos'] = [
+                [ini.isoformat(), fi.isoformat()]
+                for ini, fi in _merge_intervals(intervalos + [(inicio, fim)])
+            ]
+            if fim >= date.today() - timedelta(days=1):
+                meta['recente_em'] = time.time()
+            self._save_meta(meta)
+
+    def slice(self, inicio, fim):
+        """
+        Retorna os dados armazenados entre ``inicio`` e ``fim``.
+
+        Returns:
+            pd.DataFrame | None: Colunas ``data`` e ``valor`` ou None se
+            não houver dados no período
+        """
+        with self._lock:
+            df = self._load_df()
+        datas = df['data'].to_numpy()
+        ini = datas.searchsorted(pd.Timestamp(inicio).to_datetime64())
+        fi = datas.searchsorted(
+            pd.Timestamp(fim).to_datetime64(), side='right'
+        )
+        if ini >= fi:
+            return None
+        return df.iloc[ini:fi].reset_index(drop=True)
+
+    def _cobertura(self):
+        meta = self._load_meta()
+        intervalos = [
+            (date.fromisoformat(ini), date.fromisoformat(fi))
+            for ini, fi in meta.get('intervalos', [])
+        ]
+        recente_em = meta.get('recente_em') or 0
+        if time.time() - recente_em <= self.ttl_recente:
+            return intervalos
+        # Cobertura recente expirada: ontem e hoje voltam a ser lacunas
+        limite = date.today() - timedelta(days=2)
+        return [
+            (ini, min(fi, limite)) for ini, fi in intervalos if ini <= limite
+        ]
+
+    def _load_df(self):
+        versao = _file_version(self.data_path)
+        if self._df is None or versao != self._df_versao:
+            if versao is not None:
+                self._df = pd.read_parquet(self.data_path)
+            else:
+                self._df = pd.DataFrame({
+                    'data': pd.Series(dtype='datetime64[ns]'),
+                    'valor': pd.Series(dtype='float64'),
+                })
+            self._df_versao = versao
+        return self._df
+
+    def _load_meta(self):
+        versao = _file_version(self.meta_path)
+        if self._meta is None or versao != self._meta_versao:
+            try:
+                with open(self.meta_path, encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._meta = {}
+            self._meta_versao = versao
+        return self._meta
+
+    def _save_meta(self, meta):
+        _write_json(meta, self.meta_path)
+        self._meta = meta
+        self._meta_versao = _file_version(self.meta_path)
+
+
+@contextmanager
+def _file_lock(path, shared=False):
+    """
+    Lock entre processos (``flock``) no arquivo ``path``, exclusivo ou
+    compartilhado.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, escrever):
+    """
+    Grava ``path`` de forma atômica: ``escrever`` recebe um arquivo
+    temporário de nome único no mesmo diretório, que então substitui
+    ``path``. O nome começa com ponto para ser ignorado na leitura das
+    partições.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp'
+    )
+    os.close(fd)
+    try:
+        escrever(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _write_json(dados, path):
+    def escrever(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dados, f)
+
+    _write_atomic(path, escrever)
+
+
+def _file_version(path):
+    """
+    Identifica a versão de um arquivo gravado por ``_write_atomic`` (cada
+    gravação cria um novo inode); None se ele não existir.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _merge_intervals(intervalos):
+    """Une intervalos de datas sobrepostos ou adjacentes."""
+    unidos = []
+    for ini, fi in sorted(intervalos):
+        if unidos and ini <= unidos[-1][1] + timedelta(days=1):
+            unidos[-1] = (unidos[-1][0], max(unidos[-1][1], fi))
+        else:
+            unidos.append((ini, fi))
+    return unidos
@@ -1,48 +1,202 @@
-import streamlit as st
 import pandas as pd
 import requests
-from io import StringIO
+from pandas.api.types import union_categoricals, is_datetime64_any_dtype
 
 import sys
 sys.path.append("..")
 
-from config import TESOURO_API_URL, CACHE_TTL
+from config import TESOURO_API_URL, TESOURO_CSV_CHUNKSIZE
+from utils.metrics import timed, increment
+from .http import http_get
+from .store import TesouroStore
 
 
-@st.cache_data(ttl=CACHE_TTL)  # Cache por 1 hora
-def fetch_tesouro_data():
+# Tipos compactos aplicados já na leitura do CSV
+TESOURO_DTYPES = {
+    'Tipo Titulo': 'category',
+    'Taxa Compra Manha': 'float32',
+    'Taxa Venda Manha': 'float32',
+    'PU Compra Manha': 'float32',
+    'PU Venda Manha': 'float32',
+    'PU Base Manha': 'float32',
+}
+TESOURO_DATE_COLUMNS = ['Data Vencimento', 'Data Base']
+# Casas decimais de preços e taxas no CSV
+TESOURO_DECIMALS = {
+    col: 2 for col, dtype in TESOURO_DTYPES.items() if dtype == 'float32'
+}
+
+
+def load_tesouro_data(store=None):
     """
-    Busca dados do Tesouro Direto através da API do Tesouro Transparente.
-    Os dados são cacheados por 1 hora para evitar múltiplas requisições.
+    Carrega o histórico do Tesouro Direto a partir do armazenamento local,
+    baixando o CSV apenas quando ele mudou no servidor.
+
+    A requisição é condicional (``If-None-Match``/``If-Modified-Since``);
+    quando o servidor responde 304, os dados vêm direto do Parquet local.
+    Caso contrário, apenas as novas datas base são acrescentadas ao
+    armazenamento.
+
+    Args:
+        store (TesouroStore, optional): Armazenamento a ser usado
+
+    Returns:
+        pd.DataFrame: Dados do Tesouro Direto com datas convertidas
     """
+    store = store or TesouroStore()
+    meta = store.load_meta()
+
+    headers = {}
+    if not store.is_empty():
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
     try:
-        response = requests.get(TESOURO_API_URL)
+        response = http_get(
+            TESOURO_API_URL, endpoint='tesouro', headers=headers, stream=True
+        )
+        if response.status_code == 304:
+            response.close()
+            increment('tesouro_fetch', resultado='nao_modificado')
+            with timed('tesouro_store_load'):
+                return store.load()
         response.raise_for_status()
-        df = pd.read_csv(StringIO(response.text), sep=';', decimal=',')
+    except requests.RequestException:
+        # Sem acesso ao servidor, os dados locais ainda são úteis
+        increment('tesouro_fetch', resultado='fallback')
+        with timed('tesouro_store_load'):
+            df = store.load()
+        if df is None:
+            raise
         return df
-    except Exception as e:
-        st.error(f"Erro ao buscar dados do Tesouro Direto: {str(e)}")
-        return None
 
+    increment('tesouro_fetch', resultado='download')
+    with response, timed('tesouro_download'):
+        # Lê direto do corpo da resposta, sem materializar o texto inteiro
+        response.raw.decode_content = True
+        df = read_tesouro_csv(
+            response.raw,
+            encoding=response.encoding or 'latin-1'
+        )
+    with timed('tesouro_store_append'):
+        store.append(df)
+    store.update_http_meta(
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified')
+    )
+    return df
+
+
+def read_tesouro_store(store=None):
+    """
+    Lê o histórico do Tesouro Direto do armazenamento local, sem acessar o
+    servidor. Usado por processos que só leem os dados mantidos por outro
+    (ex.: o app com ``EXTERNAL_WORKER``); o download só acontece se o
+    armazenamento ainda estiver vazio.
+
+    Args:
+        store (TesouroStore, optional): Armazenamento a ser usado
+
+    Returns:
+        pd.DataFrame: Dados do Tesouro Direto com datas convertidas
+    """
+    store = store or TesouroStore()
+    with timed('tesouro_store_load'):
+        df = store.load()
+    if df is None:
+        return load_tesouro_data(store)
+    increment('tesouro_fetch', resultado='armazenamento')
+    return df
+
+
+def read_tesouro_csv(buffer, encoding='latin-1', chunksize=None):
+    """
+    Lê o CSV do Tesouro Direto em blocos, com tipos compactos.
+
+    Cada bloco já sai com as datas convertidas, ``Tipo Titulo`` categórico,
+    preços e taxas em float32 e a coluna ``Ano Vencimento``. Apenas um
+    bloco de texto fica em memória por vez.
+
+    Args:
+        buffer: Arquivo binário ou caminho do CSV
+        encoding (str): Codificação do arquivo
+        chunksize (int, optional): Linhas por bloco
 
+    Returns:
+        pd.DataFrame: Dados do Tesouro Direto já processados
+    """
+    reader = pd.read_csv(
+        buffer,
+        sep=';',
+        decimal=',',
+        encoding=encoding,
+        dtype=TESOURO_DTYPES,
+        parse_dates=TESOURO_DATE_COLUMNS,
+        date_format='%d/%m/%Y',
+        chunksize=chunksize or TESOURO_CSV_CHUNKSIZE
+    )
+    chunks = []
+    for chunk in reader:
+        chunk['Ano Vencimento'] = (
+            chunk['Data Vencimento'].dt.year.astype('int16')
+        )
+        chunks.append(chunk)
+    return _concat_chunks(chunks)
+
+
+def _concat_chunks(chunks):
+    """
+    Concatena os blocos lidos preservando as colunas categóricas, cujas
+    categorias podem variar de um bloco para outro.
+    """
+    if not chunks:
+        return pd.DataFrame(
+            columns=list(TESOURO_DTYPES) + TESOURO_DATE_COLUMNS
+        )
+    categoricas = [
+        col for col, dtype in TESOURO_DTYPES.items() if dtype == 'category'
+    ]
+    unificadas = {
+        col: union_categoricals([chunk[col] for chunk in chunks])
+        for col in categoricas
+    }
+    df = pd.concat(
+        [chunk.drop(columns=categoricas) for chunk in chunks],
+        ignore_index=True
+    )
+    for col in categoricas:
+        df.insert(0, col, pd.Categorical(unificadas[col]))
+    return df
+
+
+@timed('tesouro_process')
 def process_tesouro_data(df):
     """
     Processa os dados do Tesouro Direto, convertendo datas e adicionando
     colunas necessárias.
+
+    Dados vindos de ``read_tesouro_csv`` ou do armazenamento local já estão
+    processados e são retornados sem nova conversão. O DataFrame recebido
+    nunca é alterado: quando há conversão, é retornada uma cópia.
     """
     if df is not None:
-        # Converter coluna de data
-        df['Data Vencimento'] = pd.to_datetime(
-            df['Data Vencimento'], 
-            format='%d/%m/%Y'
-        )
-        df['Data Base'] = pd.to_datetime(
-            df['Data Base'], 
-            format='%d/%m/%Y'
-        )
-        
+        # Converter colunas de data, se ainda forem texto
+        convertidas = {
+            col: pd.to_datetime(df[col], format='%d/%m/%Y')
+            for col in TESOURO_DATE_COLUMNS
+            if not is_datetime64_any_dtype(df[col])
+        }
+        if convertidas:
+            df = df.assign(**convertidas)
+
         # Adicionar coluna de ano de vencimento
-        df['Ano Vencimento'] = df['Data Vencimento'].dt.year
-        
+        if 'Ano Vencimento' not in df.columns:
+            df = df.assign(**{
+                'Ano Vencimento':
+                    df['Data Vencimento'].dt.year.astype('int16')
+            })
+
         return df
-    return None 
\ No newline at end of file
+    return None
@@ -0,0 +1,183 @@
+import threading
+import uuid
+from datetime import datetime
+
+from alerts import AlertManager
+from config import ALERT_CHECK_INTERVAL, ALERT_CHECK_LOCK_TTL
+from data import get_dataset_registry
+
+
+class AlertScheduler:
+    """
+    Executa periodicamente a verificação de alertas: atualiza os dados do
+    Tesouro Direto, avalia os alertas e envia os emails.
+
+    A avaliação é incremental (``AlertManager.check_new_alerts``): cada
+    alerta só é notificado na transição para acionado, e os envios que
+    falharem por erro transitório são repetidos na execução seguinte.
+
+    As execuções são single-flight: pedidos feitos durante uma execução
+    não disparam outra em paralelo, mas são agrupados em no máximo uma
+    nova execução logo após a atual. Entre processos (app, workers da API,
+    réplicas), um lock no Redis impede verificações simultâneas.
+    """
+
+    def __init__(
+        self, interval=ALERT_CHECK_INTERVAL, lock_ttl=ALERT_CHECK_LOCK_TTL
+    ):
+        self.interval = interval
+        self.lock_ttl = lock_ttl
+        self.last_run = None
+        self._alert_manager = None
+        self._run_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._manager_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """Indica se há uma verificação em andamento."""
+        return self._run_lock.locked()
+
+    def start(self):
+        """Inicia a thread do agendador (chamadas repetidas são ignoradas)."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="alert-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Interrompe o agendador após a execução em andamento."""
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        """
+        Solicita uma verificação imediata, executada pela thread do
+        agendador.
+
+        Returns:
+            bool: False se já havia uma verificação em andamento (o pedido
+            é agrupado em uma nova execução ao final dela)
+        """
+        em_andamento = self.running
+        self.start()
+        self._wake.set()
+        return not em_andamento
+
+    def run_once(self):
+        """
+        Executa uma verificação completa, se nenhuma estiver em andamento.
+
+        Returns:
+            dict | None: Resumo da execução ou None se já havia outra em
+            andamento, neste ou em outro processo
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        try:
+            alert_manager = self._get_alert_manager()
+            token = uuid.uuid4().hex
+            try:
+                if not alert_manager.store.acquire_check_lock(
+                    token, self.lock_ttl
+                ):
+                    # Outro processo (worker, réplica do app) está verificando
+                    return None
+            except Exception as e:
+                # Sem o Redis a verificação registra o erro no resumo
+                print(f"Erro ao reservar a verificação de alertas: {str(e)}")
+                token = None
+            try:
+                return self._check(alert_manager)
+            finally:
+                if token is not None:
+                    try:
+                        alert_manager.store.release_check_lock(token)
+                    except Exception as e:
+                        print(f"Erro ao liberar a verificação: {str(e)}")
+        finally:
+            self._run_lock.release()
+
+    def _check(self, alert_manager):
+        resumo = {'inicio': datetime.now(), 'acionados': 0, 'resultados': []}
+        try:
+            # Atualiza os dados compartilhados com as sessões do app
+            df = get_dataset_registry().refresh().df
+            alerts_triggered = alert_manager.check_new_alerts(df)
+            resumo['acionados'] = len(alerts_triggered)
+            if alerts_triggered:
+                try:
+                    resultados = alert_manager.send_alert_emails(
+                        alerts_triggered
+                    )
+                except Exception:
+                    # Nada foi enviado: os alertas voltam a ser avaliados
+                    alert_manager.mark_pending(
+                        [alert['id'] for alert in alerts_triggered]
+                    )
+                    raise
+                resumo['resultados'] = resultados
+                falhas = []
+                for alert, resultado in zip(alerts_triggered, resultados):
+                    if resultado['enviado']:
+                        continue
+                    if resultado['transitorio']:
+                        falhas.append(alert['id'])
+                    else:
+                        # Ex.: destinatário recusado (5xx): repetir não
+                        # adianta, o alerta só dispara na próxima transição
+                        print(
+                            f"Envio do alerta {alert['id']} para "
+                            f"{resultado['email']} recusado: "
+                            f"{resultado['erro']}"
+                        )
+                if falhas:
+                    alert_manager.mark_pending(falhas)
+            resumo['erro'] = None
+        except Exception as e:
+            print(f"Erro na verificação de alertas: {str(e)}")
+            resumo['erro'] = str(e)
+        finally:
+            resumo['fim'] = datetime.now()
+            self.last_run = resumo
+        return resumo
+
+    def _get_alert_manager(self):
+        with self._manager_lock:
+            if self._alert_manager is None:
+                self._alert_manager = AlertManager()
+            return self._alert_manager
+
+    @property
+    def alert_manager(self):
+        """
+        Gerenciador de alertas do agendador, criado no primeiro uso e
+        compartilhado com as sessões do app.
+        """
+        return self._get_alert_manager()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.run_once()
+            self._wake.wait(self.interval)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Retorna o agendador único do processo."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AlertScheduler()
+        return _scheduler
@@ -0,0 +1,178 @@
+"""Métricas de tempo e contadores do processo, no formato do Prometheus."""
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+
+PREFIX = "streamlit_td_"
+
+# Limites (segundos) dos baldes dos histogramas de tempo
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+_timers = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name, duracao, **labels):
+    """
+    Registra a duração de uma execução.
+
+    Args:
+        name (str): Nome da métrica (sem unidade)
+        duracao (float): Duração em segundos
+        **labels: Rótulos da série (ex.: ``endpoint='tesouro'``)
+    """
+    key = _key(name, labels)
+    with _lock:
+        m = _timers.get(key)
+        if m is None:
+            m = _timers[key] = {
+                'count': 0, 'sum': 0.0, 'max': 0.0,
+                'buckets': [0] * len(BUCKETS),
+            }
+        m['count'] += 1
+        m['sum'] += duracao
+        m['max'] = max(m['max'], duracao)
+        posicao = bisect_left(BUCKETS, duracao)
+        if posicao < len(BUCKETS):
+            m['buckets'][posicao] += 1
+
+
+def increment(name, value=1, **labels):
+    """
+    Soma ``value`` a um contador.
+
+    Args:
+        name (str): Nome do contador
+        value (int): Incremento
+        **labels: Rótulos da série (ex.: ``resultado='hit'``)
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class timed:
+    """
+    Mede a duração de um bloco (``with timed('nome'):``) ou de uma função
+    (``@timed('nome')``). Exceções também são contadas, em
+    ``<nome>_errors``.
+    """
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self._inicio = None
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self._inicio, **self.labels)
+        if exc_type is not None:
+            increment(f"{self.name}_errors", **self.labels)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Uma instância por chamada: chamadas simultâneas não dividem
+            # o instante de início
+            with timed(self.name, **self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def snapshot():
+    """
+    Retorna as métricas atuais.
+
+    Returns:
+        dict: ``tempos`` (nome, rótulos -> contagem, total, média e
+        máximo em segundos) e ``contadores`` (nome, rótulos -> valor)
+    """
+    with _lock:
+        tempos = {
+            key: {
+                'count': m['count'], 'sum': m['sum'], 'max': m['max'],
+                'mean': m['sum'] / m['count'],
+            }
+            for key, m in _timers.items()
+        }
+        contadores = dict(_counters)
+    return {'tempos': tempos, 'contadores': contadores}
+
+
+def render_prometheus():
+    """Métricas no formato de texto do Prometheus (``/metrics``)."""
+    with _lock:
+        timers = {
+            key: {**m, 'buckets': list(m['buckets'])}
+            for key, m in _timers.items()
+        }
+        counters = dict(_counters)
+
+    linhas = []
+    for name in sorted({name for name, _ in timers}):
+        metrica = f"{PREFIX}{name}_seconds"
+        linhas.append(f"# TYPE {metrica} histogram")
+        for (nome, labels), m in sorted(timers.items()):
+            if nome != name:
+                continue
+            acumulado = 0
+            for limite, quantidade in zip(BUCKETS, m['buckets']):
+                acumulado += quantidade
+                linhas.append(
+                    f"{metrica}_bucket"
+                    f"{_labels(labels, le=repr(limite))} {acumulado}"
+                )
+            linhas.append(
+                f"{metrica}_bucket{_labels(labels, le='+Inf')} {m['count']}"
+            )
+            linhas.append(f"{metrica}_sum{_labels(labels)} {m['sum']}")
+            linhas.append(f"{metrica}_count{_labels(labels)} {m['count']}")
+        linhas.append(f"# TYPE {metrica}_max gauge")
+        for (nome, labels), m in sorted(timers.items()):
+            if nome == name:
+                linhas.append(f"{metrica}_max{_labels(labels)} {m['max']}")
+
+    for name in sorted({name for name, _ in counters}):
+        metrica = f"{PREFIX}{name}_total"
+        linhas.append(f"# TYPE {metrica} counter")
+        for (nome, labels), valor in sorted(counters.items()):
+            if nome == name:
+                linhas.append(f"{metrica}{_labels(labels)} {valor}")
+    return '\n'.join(linhas) + '\n'
+
+
+def reset():
+    """Zera todas as métricas."""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def _labels(labels, **extras):
+    pares = list(labels) + list(extras.items())
+    if not pares:
+        return ''
+    texto = ','.join(
+        f'{k}="{_escape(v)}"' for k, v in pares
+    )
+    return f"{{{texto}}}"
+
+
+def _escape(valor):
+    return (
+        str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
@@ -1,21 +1,70 @@
 """Basic connection example.
 """
-import redis
+import threading
 
 import sys
 sys.path.append("..")
 
 from config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD
 
+# Clientes compartilhados pelo processo, um por servidor. O cliente do
+# redis-py é thread-safe e mantém seu próprio pool de conexões.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_redis_client(
+    host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD,
+    decode_responses=True
+):
+    """
+    Retorna o cliente Redis do processo para o servidor informado, criado
+    na primeira chamada. O módulo ``redis`` só é importado neste momento e
+    nenhuma conexão é aberta antes do primeiro comando.
+
+    Com ``decode_responses=False`` as respostas vêm em bytes (valores
+    binários, como os do cache de dados); esse cliente tem seu próprio
+    pool de conexões.
+    """
+    key = (host, port, password, decode_responses)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import redis
+
+            client = _clients[key] = redis.Redis(
+                host=host,
+                port=port,
+                decode_responses=decode_responses,
+                username="default",
+                password=password,
+            )
+        return client
+
+
 class RedisManager:
-    def __init__(self, host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD):
-        self.redis_client = redis.Redis(
-            host=host,
-            port=port,
-            decode_responses=True,
-            username="default",
-            password=password,
-        )
+    def __init__(
+        self, host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD,
+        decode_responses=True
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.decode_responses = decode_responses
+        self._client = None
+
+    @property
+    def redis_client(self):
+        """Cliente compartilhado, obtido no primeiro uso."""
+        if self._client is None:
+            self._client = get_redis_client(
+                self.host, self.port, self.password, self.decode_responses
+            )
+        return self._client
+
+    @redis_client.setter
+    def redis_client(self, client):
+        self._client = client
 
     def set_data(self, key, value):
         self.redis_client.set(key, value)
@@ -28,3 +77,10 @@ class RedisManager:
 
     def exists(self, key):
         return self.redis_client.exists(key)
+
+    def scan_keys(self, pattern, count=1000):
+        """Itera sobre as chaves com SCAN, sem bloquear o servidor."""
+        return self.redis_client.scan_iter(match=pattern, count=count)
+
+    def pipeline(self, transaction=True):
+        return self.redis_client.pipeline(transaction=transaction)
@@ -1,11 +1,33 @@
 from .graphics import (
     plot_taxa_evolucao,
     plot_preco_evolucao,
-    plot_dolar_evolucao
+    plot_dolar_evolucao,
+    plot_variacao_taxa,
+    plot_volatilidade_preco,
+    plot_preco_usd,
+    build_taxa_figure,
+    build_preco_figure,
+    build_dolar_figure,
+    build_variacao_taxa_figure,
+    build_volatilidade_figure,
+    build_preco_usd_figure
 )
+from .downsample import downsample, lttb_indices, minmax_indices
 
 __all__ = [
     'plot_taxa_evolucao',
     'plot_preco_evolucao',
-    'plot_dolar_evolucao'
+    'plot_dolar_evolucao',
+    'plot_variacao_taxa',
+    'plot_volatilidade_preco',
+    'plot_preco_usd',
+    'build_taxa_figure',
+    'build_preco_figure',
+    'build_dolar_figure',
+    'build_variacao_taxa_figure',
+    'build_volatilidade_figure',
+    'build_preco_usd_figure',
+    'downsample',
+    'lttb_indices',
+    'minmax_indices'
 ] 
\ No newline at end of file
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Seleciona pontos de uma série pelo algoritmo Largest-Triangle-Three-
+    Buckets, que preserva a forma visual da curva.
+
+    Args:
+        x (np.ndarray): Eixo x (numérico e crescente)
+        y (np.ndarray): Valores da série
+        n_out (int): Quantidade de pontos desejada
+
+    Returns:
+        np.ndarray: Posições dos pontos selecionados
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    validos = np.flatnonzero(~np.isnan(y))
+    if len(validos) < n:
+        # Pontos sem valor (ex.: início das séries derivadas) não aparecem
+        # no gráfico: a seleção é feita entre os demais
+        return validos[lttb_indices(x[validos], y[validos], n_out)]
+    # O primeiro e o último ponto são sempre mantidos; o restante é
+    # dividido em n_out - 2 baldes
+    limites = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selecionados = np.empty(n_out, dtype=int)
+    selecionados[0] = 0
+    selecionados[-1] = n - 1
+
+    anterior = 0
+    for i in range(n_out - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do próximo balde (ou o último ponto)
+        prox_inicio = fim
+        prox_fim = limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior]) -
+            (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.nanargmax(areas)) if len(areas) else inicio
+        selecionados[i + 1] = anterior
+    return selecionados
+
+
+def minmax_indices(x, y, n_out):
+    """
+    Seleciona, em cada balde, os pontos de mínimo e máximo da série.
+
+    Args:
+        x (np.ndarray): Eixo x (crescente)
+        y (np.ndarray): Valores da série
+        n_out (int): Quantidade máxima de pontos
+
+    Returns:
+        np.ndarray: Posições dos pontos selecionados
+    """
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype='float64')
+    # Dois pontos por balde, além do primeiro e do último
+    n_baldes = (n_out - 2) // 2
+    tamanho = int(np.ceil(n / n_baldes))
+    preenchido = np.full(n_baldes * tamanho, np.nan)
+    preenchido[:n] = y
+    baldes = preenchido.reshape(n_baldes, tamanho)
+    validos = ~np.isnan(baldes).all(axis=1)
+    base = np.arange(n_baldes)[validos] * tamanho
+    minimos = base + np.nanargmin(baldes[validos], axis=1)
+    maximos = base + np.nanargmax(baldes[validos], axis=1)
+    return np.unique(np.concatenate([[0, n - 1], minimos, maximos]))
+
+
+METHODS = {
+    'lttb': lttb_indices,
+    'minmax': minmax_indices,
+}
+
+
+def downsample(df, x, y, group=None, max_points=None, method='lttb'):
+    """
+    Reduz a quantidade de pontos de cada série antes do gráfico.
+
+    Args:
+        df (pd.DataFrame): Dados ordenados por ``x`` dentro de cada série
+        x (str): Coluna do eixo x
+        y (str): Coluna do eixo y
+        group (str | list, optional): Coluna(s) que identificam as séries
+        max_points (int, optional): Pontos por série; None desativa
+        method (str): ``'lttb'`` ou ``'minmax'``
+
+    Returns:
+        pd.DataFrame: Linhas selecionadas
+    """
+    if not max_points or df is None or len(df) <= max_points:
+        return df
+    selecionar = METHODS[method]
+
+    def _series(parte):
+        if len(parte) <= max_points:
+            return np.arange(len(parte))
+        eixo_x = parte[x]
+        if pd.api.types.is_datetime64_any_dtype(eixo_x):
+            eixo_x = eixo_x.astype('int64')
+        return selecionar(
+            eixo_x.to_numpy(), parte[y].to_numpy(), max_points
+        )
+
+    if group is None:
+        return df.iloc[_series(df)]
+
+    posicoes = []
+    grupos = df.groupby(group, observed=True, sort=False).indices
+    for _, indices in grupos.items():
+        parte = df.iloc[indices]
+        posicoes.append(indices[_series(parte)])
+    return df.iloc[np.sort(np.concatenate(posicoes))]
@@ -1,13 +1,79 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 
+import sys
+sys.path.append("..")
 
-def plot_taxa_evolucao(df_filtrado, tipo_selecionado):
+from config import (
+    CHART_DOWNSAMPLE_METHOD, CHART_WEBGL_THRESHOLD, CHART_CACHE_SIZE,
+    ANALYTICS_VOL_WINDOW
+)
+from utils.metrics import timed, increment
+from .downsample import downsample
+
+
+def data_fingerprint(df, columns):
     """
-    Gera gráfico de linha para evolução das taxas.
+    Impressão digital barata de um DataFrame: tamanho, extremos e somas
+    das colunas usadas no gráfico. Evita hashear todos os dados a cada
+    execução do script.
+    """
+    if df is None or df.empty:
+        return (0,)
+    partes = [len(df)]
+    for col in columns:
+        valores = df[col]
+        if pd.api.types.is_datetime64_any_dtype(valores):
+            valores = valores.astype('int64')
+        partes.extend([
+            valores.iloc[0], valores.iloc[-1], float(valores.sum())
+        ])
+    return tuple(partes)
+
+
+def _build_line_figure(fingerprint, _df, **kwargs):
+    """Monta um gráfico de linha, contando os acessos ao cache."""
+    increment('chart_figure', grafico=kwargs['y'])
+    return _cached_line_figure(fingerprint, _df, **kwargs)
+
+
+@st.cache_resource(max_entries=CHART_CACHE_SIZE)
+def _cached_line_figure(
+    fingerprint, _df, x, y, color, title, labels, group, max_points
+):
     """
-    fig_taxa = px.line(
+    Monta um gráfico de linha. O resultado é memorizado pela impressão
+    digital dos dados (``_df`` não é hasheado) e pelas seleções.
+    """
+    # Executado apenas quando a figura não está no cache. O plotly só é
+    # importado na primeira figura montada
+    import plotly.express as px
+
+    increment('chart_cache_miss', grafico=y)
+    with timed('chart_downsample', grafico=y):
+        df_plot = downsample(
+            _df, x, y, group=group, max_points=max_points,
+            method=CHART_DOWNSAMPLE_METHOD
+        )
+    # Séries grandes usam traces WebGL (Scattergl)
+    render_mode = 'webgl' if len(df_plot) > CHART_WEBGL_THRESHOLD else 'svg'
+    with timed('chart_build', grafico=y):
+        return px.line(
+            df_plot,
+            x=x,
+            y=y,
+            color=color,
+            title=title,
+            labels=labels,
+            render_mode=render_mode
+        )
+
+
+def build_taxa_figure(df_filtrado, max_points=None):
+    """Monta (ou reaproveita) o gráfico de evolução das taxas."""
+    colunas = ['Data Base', 'Data Vencimento', 'Taxa Compra Manha']
+    return _build_line_figure(
+        data_fingerprint(df_filtrado, colunas),
         df_filtrado,
         x='Data Base',
         y='Taxa Compra Manha',
@@ -17,16 +83,17 @@ def plot_taxa_evolucao(df_filtrado, tipo_selecionado):
             'Data Base': 'Data',
             'Taxa Compra Manha': 'Taxa de Compra (%)',
             'Ano Vencimento': 'Ano de Vencimento'
-        }
+        },
+        group='Data Vencimento',
+        max_points=max_points
     )
-    st.plotly_chart(fig_taxa, use_container_width=True)
 
 
-def plot_preco_evolucao(df_filtrado, tipo_selecionado):
-    """
-    Gera gráfico de linha para evolução dos preços.
-    """
-    fig_preco = px.line(
+def build_preco_figure(df_filtrado, max_points=None):
+    """Monta (ou reaproveita) o gráfico de evolução dos preços."""
+    colunas = ['Data Base', 'Data Vencimento', 'PU Compra Manha']
+    return _build_line_figure(
+        data_fingerprint(df_filtrado, colunas),
         df_filtrado,
         x='Data Base',
         y='PU Compra Manha',
@@ -36,24 +103,149 @@ def plot_preco_evolucao(df_filtrado, tipo_selecionado):
             'Data Base': 'Data',
             'PU Compra Manha': 'Preço de Compra (R$)',
             'Ano Vencimento': 'Ano de Vencimento'
-        }
+        },
+        group='Data Vencimento',
+        max_points=max_points
+    )
+
+
+def build_variacao_taxa_figure(df_filtrado, max_points=None):
+    """Monta (ou reaproveita) o gráfico da variação diária das taxas."""
+    colunas = ['Data Base', 'Data Vencimento', 'Variacao Taxa']
+    return _build_line_figure(
+        data_fingerprint(df_filtrado, colunas),
+        df_filtrado,
+        x='Data Base',
+        y='Variacao Taxa',
+        color='Ano Vencimento',
+        title='Variação da Taxa de Compra em Relação ao Dia Anterior',
+        labels={
+            'Data Base': 'Data',
+            'Variacao Taxa': 'Variação (p.p.)',
+            'Ano Vencimento': 'Ano de Vencimento'
+        },
+        group='Data Vencimento',
+        max_points=max_points
     )
+
+
+def build_volatilidade_figure(df_filtrado, max_points=None):
+    """Monta (ou reaproveita) o gráfico da volatilidade dos preços."""
+    colunas = ['Data Base', 'Data Vencimento', 'Volatilidade PU']
+    return _build_line_figure(
+        data_fingerprint(df_filtrado, colunas),
+        df_filtrado,
+        x='Data Base',
+        y='Volatilidade PU',
+        color='Ano Vencimento',
+        title=(
+            f'Volatilidade do Preço de Compra '
+            f'({ANALYTICS_VOL_WINDOW} datas base)'
+        ),
+        labels={
+            'Data Base': 'Data',
+            'Volatilidade PU': 'Desvio Padrão dos Retornos',
+            'Ano Vencimento': 'Ano de Vencimento'
+        },
+        group='Data Vencimento',
+        max_points=max_points
+    )
+
+
+def build_preco_usd_figure(df_filtrado, max_points=None):
+    """Monta (ou reaproveita) o gráfico dos preços em dólar."""
+    colunas = ['Data Base', 'Data Vencimento', 'PU Compra USD']
+    return _build_line_figure(
+        data_fingerprint(df_filtrado, colunas),
+        df_filtrado,
+        x='Data Base',
+        y='PU Compra USD',
+        color='Ano Vencimento',
+        title='Preço de Compra em Dólar ao Longo do Tempo',
+        labels={
+            'Data Base': 'Data',
+            'PU Compra USD': 'Preço de Compra (US$)',
+            'Ano Vencimento': 'Ano de Vencimento'
+        },
+        group='Data Vencimento',
+        max_points=max_points
+    )
+
+
+def build_dolar_figure(df_dolar, max_points=None):
+    """Monta (ou reaproveita) o gráfico de evolução do dólar."""
+    return _build_line_figure(
+        data_fingerprint(df_dolar, ['data', 'valor']),
+        df_dolar,
+        x='data',
+        y='valor',
+        color=None,
+        title='Cotação do Dólar ao Longo do Tempo',
+        labels={
+            'data': 'Data',
+            'valor': 'Cotação (R$)'
+        },
+        group=None,
+        max_points=max_points
+    )
+
+
+def plot_taxa_evolucao(df_filtrado, tipo_selecionado, max_points=None):
+    """
+    Gera gráfico de linha para evolução das taxas.
+
+    Com ``max_points``, cada vencimento é reduzido a no máximo essa
+    quantidade de pontos antes do gráfico.
+    """
+    fig_taxa = build_taxa_figure(df_filtrado, max_points)
+    st.plotly_chart(fig_taxa, use_container_width=True)
+
+
+def plot_preco_evolucao(df_filtrado, tipo_selecionado, max_points=None):
+    """
+    Gera gráfico de linha para evolução dos preços.
+
+    Com ``max_points``, cada vencimento é reduzido a no máximo essa
+    quantidade de pontos antes do gráfico.
+    """
+    fig_preco = build_preco_figure(df_filtrado, max_points)
     st.plotly_chart(fig_preco, use_container_width=True)
 
 
-def plot_dolar_evolucao(df_dolar):
+def plot_variacao_taxa(df_filtrado, max_points=None):
+    """
+    Gera gráfico de linha da variação das taxas em relação à data base
+    anterior (coluna ``Variacao Taxa`` dos dados).
+    """
+    fig = build_variacao_taxa_figure(df_filtrado, max_points)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def plot_volatilidade_preco(df_filtrado, max_points=None):
+    """
+    Gera gráfico de linha da volatilidade móvel dos preços (coluna
+    ``Volatilidade PU`` dos dados).
+    """
+    fig = build_volatilidade_figure(df_filtrado, max_points)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def plot_preco_usd(df_filtrado, max_points=None):
+    """
+    Gera gráfico de linha dos preços convertidos pelo dólar da data base
+    (coluna ``PU Compra USD`` dos dados).
+    """
+    if df_filtrado['PU Compra USD'].notna().any():
+        fig = build_preco_usd_figure(df_filtrado, max_points)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Cotações do dólar indisponíveis para o período.")
+
+
+def plot_dolar_evolucao(df_dolar, max_points=None):
     """
     Gera gráfico de linha para evolução do dólar.
     """
     if df_dolar is not None:
-        fig_dolar = px.line(
-            df_dolar,
-            x='data',
-            y='valor',
-            title='Cotação do Dólar ao Longo do Tempo',
-            labels={
-                'data': 'Data',
-                'valor': 'Cotação (R$)'
-            }
-        )
-        st.plotly_chart(fig_dolar, use_container_width=True) 
\ No newline at end of file
+        fig_dolar = build_dolar_figure(df_dolar, max_points)
+        st.plotly_chart(fig_dolar, use_container_width=True)
@@ -0,0 +1,46 @@
+"""
+Processo da API e do agendador de alertas, separado do Streamlit.
+
+Baixa e processa os dados do Tesouro Direto, verifica os alertas e serve a
+API; o app (com ``EXTERNAL_WORKER=true``) apenas lê os dados gravados no
+armazenamento local e os alertas no Redis. Assim a avaliação dos alertas
+não disputa CPU (nem o GIL) com as execuções do script, e cada camada
+escala de forma independente.
+
+Uso:
+    python worker.py [--host 0.0.0.0] [--port 8001] [--workers 1]
+
+Com ``--workers`` maior que 1, cada processo da API tem seu agendador; o
+lock da verificação no Redis garante que apenas um verifique por vez.
+"""
+import argparse
+from pathlib import Path
+
+import uvicorn
+
+from config import API_HOST, API_PORT, API_WORKERS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=API_WORKERS,
+                        help='Processos da API')
+    args = parser.parse_args()
+
+    # Com vários processos o uvicorn importa a API em cada um deles
+    uvicorn.run(
+        "api:api",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=str(Path(__file__).parent),
+        log_level="info",
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# Os módulos do app são importados como no próprio app (a partir de
+# src/streamlit_td) e os serviços locais vêm dos benchmarks
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+sys.path.insert(0, str(RAIZ / 'src' / 'streamlit_td'))
+
+
+@pytest.fixture
+def redis_falso(monkeypatch):
+    """
+    Redis em memória no lugar do servidor: todos os clientes criados pelo
+    app (texto ou binários) compartilham os mesmos dados.
+    """
+    from utils import redis as utils_redis
+
+    servidor = fakeredis.FakeServer()
+
+    def cliente(*args, decode_responses=True, **kwargs):
+        return fakeredis.FakeRedis(
+            server=servidor, decode_responses=decode_responses
+        )
+
+    monkeypatch.setattr(utils_redis, 'get_redis_client', cliente)
+    return servidor
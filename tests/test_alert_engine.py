@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from bench_alertas import check_alerts_antigo
+from sintetico import gerar_alertas, gerar_tesouro_csv
+
+from alerts import AlertIndex, evaluate_alerts, latest_quotes
+from alerts.parallel import evaluate_alerts_parallel, shutdown_executor
+from data.tesouro import read_tesouro_csv
+
+
+@pytest.fixture(scope='module')
+def csv_tesouro():
+    return gerar_tesouro_csv()
+
+
+@pytest.fixture(scope='module')
+def tesouro(csv_tesouro):
+    return read_tesouro_csv(BytesIO(csv_tesouro))
+
+
+@pytest.fixture(scope='module')
+def publicadas(csv_tesouro):
+    """Última cotação de cada par com os valores exatos do CSV."""
+    df = pd.read_csv(
+        BytesIO(csv_tesouro), sep=';', decimal=',', encoding='latin-1',
+        parse_dates=['Data Vencimento', 'Data Base'], dayfirst=True
+    )
+    df['Ano Vencimento'] = df['Data Vencimento'].dt.year
+    return df.sort_values('Data Base', kind='stable').drop_duplicates(
+        ['Tipo Titulo', 'Ano Vencimento'], keep='last'
+    )
+
+
+def alertas_no_limite(publicadas, coluna, criterio):
+    """Um alerta por par com o limite igual ao valor publicado."""
+    return pd.DataFrame({
+        'nome': 'Fulano',
+        'email': 'fulano@exemplo.com',
+        'tipo_titulo': publicadas['Tipo Titulo'].to_numpy(),
+        'ano_vencimento': publicadas['Ano Vencimento'].to_numpy(),
+        **{
+            col: publicadas[coluna].to_numpy() if col == criterio else None
+            for col in ['preco_min', 'preco_max', 'taxa_min', 'taxa_max']
+        },
+    }, index=[f'a{i}' for i in range(len(publicadas))])
+
+
+@pytest.mark.parametrize('coluna, criterio', [
+    ('PU Compra Manha', 'preco_min'),
+    ('PU Compra Manha', 'preco_max'),
+    ('Taxa Compra Manha', 'taxa_min'),
+    ('Taxa Compra Manha', 'taxa_max'),
+])
+def test_limite_igual_a_cotacao_aciona(tesouro, publicadas, coluna, criterio):
+    alerts = alertas_no_limite(publicadas, coluna, criterio)
+    quotes = latest_quotes(tesouro)
+
+    assert len(evaluate_alerts(alerts, quotes)) == len(alerts)
+    assert len(AlertIndex(alerts).match_quotes(quotes)) == len(alerts)
+    try:
+        paralelo = evaluate_alerts_parallel(
+            alerts, quotes, workers=2, min_alerts=0
+        )
+    finally:
+        shutdown_executor()
+    assert len(paralelo) == len(alerts)
+
+
+def test_cotacoes_em_float64_com_precisao_da_fonte(tesouro, publicadas):
+    quotes = latest_quotes(tesouro)
+    esperado = publicadas.set_index(['Tipo Titulo', 'Ano Vencimento'])
+
+    for coluna in ['PU Compra Manha', 'Taxa Compra Manha']:
+        assert quotes[coluna].dtype == 'float64'
+        valores = esperado[coluna].reindex(quotes.index)
+        assert (quotes[coluna] == valores.to_numpy()).all()
+
+
+def test_engine_igual_ao_laco_antigo(tesouro):
+    alerts = gerar_alertas(1000, tesouro)
+    alerts.index = [f'a{i}' for i in range(len(alerts))]
+
+    antigo = check_alerts_antigo(alerts, tesouro)
+    novo = evaluate_alerts(alerts, latest_quotes(tesouro))
+
+    assert 0 < len(novo) < len(alerts)
+    assert sorted(novo.index) == sorted(alert.name for alert in antigo)
+    assert novo['message'].str.len().gt(0).all()
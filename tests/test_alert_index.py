@@ -0,0 +1,108 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sintetico import gerar_alertas, gerar_tesouro_csv
+
+from alerts import AlertManager, evaluate_alerts, latest_quotes
+from alerts.index import AlertIndex
+from data.tesouro import read_tesouro_csv
+
+
+@pytest.fixture(scope='module')
+def tesouro():
+    return read_tesouro_csv(BytesIO(gerar_tesouro_csv()))
+
+
+@pytest.fixture(scope='module')
+def alertas(tesouro):
+    alerts = gerar_alertas(500, tesouro)
+    alerts.index = [f'a{i}' for i in range(len(alerts))]
+    return alerts
+
+
+def alerta(tipo='T', ano=2030, **limites):
+    return {
+        'tipo_titulo': tipo, 'ano_vencimento': ano,
+        'preco_min': None, 'preco_max': None,
+        'taxa_min': None, 'taxa_max': None,
+        **limites,
+    }
+
+
+def test_match_quotes_igual_ao_engine(tesouro, alertas):
+    quotes = latest_quotes(tesouro)
+
+    acionados = AlertIndex(alertas).match_quotes(quotes)
+
+    assert sorted(acionados) == sorted(evaluate_alerts(alertas, quotes).index)
+
+
+def test_add_igual_ao_build(tesouro, alertas):
+    quotes = latest_quotes(tesouro)
+    index = AlertIndex()
+    for alert_id, alert in alertas.iterrows():
+        index.add(alert_id, alert)
+
+    assert len(index) == len(alertas)
+    assert sorted(index.match_quotes(quotes)) == sorted(
+        AlertIndex(alertas).match_quotes(quotes)
+    )
+
+
+def test_remove_atualiza_match(tesouro, alertas):
+    quotes = latest_quotes(tesouro)
+    index = AlertIndex(alertas)
+    removidos = set(alertas.index[::3])
+
+    for alert_id in removidos:
+        assert index.remove(alert_id)
+
+    assert not index.remove(next(iter(removidos)))
+    esperado = evaluate_alerts(alertas.drop(list(removidos)), quotes)
+    assert sorted(index.match_quotes(quotes)) == sorted(esperado.index)
+
+
+def test_match_por_limite():
+    index = AlertIndex()
+    index.add('min', alerta(preco_min=100.0))
+    index.add('max', alerta(taxa_max=5.0))
+    index.add('vazio', alerta())
+
+    assert index.match('T', 2030, 100.0, 6.0) == {'min'}
+    assert index.match('T', 2030, 99.99, 5.0) == {'max'}
+    assert index.match('T', 2030, np.nan, np.nan) == set()
+    assert index.match('T', 2031, 100.0, 5.0) == set()
+
+
+@pytest.mark.parametrize('construir', ['build', 'add'])
+def test_remove_alerta_sem_limites(construir):
+    alerts = pd.DataFrame(
+        [alerta(), alerta(preco_min=1.0)], index=['ana', 'bob']
+    )
+    if construir == 'build':
+        index = AlertIndex(alerts)
+    else:
+        index = AlertIndex()
+        for alert_id, alert in alerts.iterrows():
+            index.add(alert_id, alert)
+
+    assert index.remove('bob')
+    assert index.remove('ana')
+    assert len(index) == 0
+    # O par volta a ser criado normalmente
+    index.add('carla', alerta(preco_min=1.0))
+    assert index.match('T', 2030, 2.0, np.nan) == {'carla'}
+
+
+def test_manager_remove_alerta_sem_limites(redis_falso):
+    manager = AlertManager()
+    ana = manager.add_alert('Ana', 'ana@exemplo.com', 'T', 2030)
+    bob = manager.add_alert('Bob', 'bob@exemplo.com', 'T', 2030, preco_min=1)
+
+    assert manager.remove_alert(bob)
+    assert manager.remove_alert(ana)
+    assert manager.alerts.empty
+    assert len(manager.index) == 0
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from servicos import SMTPDescarte
+
+import scheduler
+from alerts import AlertManager
+from alerts import manager as alerts_manager
+from alerts.dispatcher import EmailDispatcher
+from config import ALERT_COOLDOWN
+
+
+INICIO = datetime(2024, 1, 1)
+COOLDOWN = timedelta(seconds=ALERT_COOLDOWN)
+
+
+def cotacao(dia, preco):
+    """Dados do Tesouro com uma cotação do Tesouro Selic 2029."""
+    return pd.DataFrame({
+        'Tipo Titulo': pd.Categorical(['Tesouro Selic']),
+        'Data Vencimento': [pd.Timestamp('2029-03-01')],
+        'Data Base': [pd.Timestamp(INICIO) + pd.Timedelta(days=dia)],
+        'Taxa Compra Manha': [0.1],
+        'PU Compra Manha': [preco],
+        'Ano Vencimento': [2029],
+    })
+
+
+@pytest.fixture
+def manager(redis_falso):
+    return AlertManager()
+
+
+@pytest.fixture
+def alert_id(manager):
+    return manager.add_alert(
+        'Fulano', 'fulano@exemplo.com', 'Tesouro Selic', 2029,
+        preco_min=100.0
+    )
+
+
+def verificar(manager, dia, preco, now):
+    return [
+        alerta['id']
+        for alerta in manager.check_new_alerts(cotacao(dia, preco), now)
+    ]
+
+
+def estado(manager, alert_id):
+    return manager.store.load_ids([alert_id]).loc[alert_id, 'estado_acionado']
+
+
+def test_dispara_apenas_na_transicao(manager, alert_id):
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+    assert estado(manager, alert_id) == '1'
+    # Continua acionado em uma cotação nova: não repete
+    fora_cooldown = INICIO + 2 * COOLDOWN
+    assert verificar(manager, 1, 160, fora_cooldown) == []
+    # Mesma cotação: o par nem é reavaliado
+    assert verificar(manager, 1, 50, fora_cooldown) == []
+    assert estado(manager, alert_id) == '1'
+
+    assert verificar(manager, 2, 50, fora_cooldown) == []
+    assert estado(manager, alert_id) == '0'
+    assert verificar(manager, 3, 150, fora_cooldown) == [alert_id]
+
+
+def test_cooldown_adia_o_disparo(manager, alert_id):
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+    assert verificar(manager, 1, 50, INICIO + timedelta(seconds=1)) == []
+
+    # Acionado de novo dentro do cooldown: fica em 0 até poder notificar
+    assert verificar(manager, 2, 150, INICIO + timedelta(seconds=2)) == []
+    assert estado(manager, alert_id) == '0'
+
+    depois = INICIO + COOLDOWN + timedelta(seconds=5)
+    assert verificar(manager, 3, 150, depois) == [alert_id]
+    assert estado(manager, alert_id) == '1'
+
+
+def test_pendente_reavaliado_sem_cotacao_nova(manager, alert_id):
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+
+    # Envio falhou: volta como pendente e dispara sem esperar cotação nova
+    manager.mark_pending([alert_id])
+    assert estado(manager, alert_id) == '0'
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+    assert manager.store.load_pending() == []
+
+
+def test_pendente_mantido_se_a_verificacao_falha(
+    manager, alert_id, monkeypatch
+):
+    assert manager.store.load_pending() == [alert_id]
+
+    def falha(*args, **kwargs):
+        raise RuntimeError('Redis indisponível')
+
+    with monkeypatch.context() as m:
+        m.setattr(manager.store, 'update_fields', falha)
+        with pytest.raises(RuntimeError):
+            verificar(manager, 0, 150, INICIO)
+    assert manager.store.load_pending() == [alert_id]
+
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+    assert manager.store.load_pending() == []
+
+
+def test_alerta_de_outra_instancia(manager):
+    outra = AlertManager()
+    alert_id = outra.add_alert(
+        'Beltrano', 'beltrano@exemplo.com', 'Tesouro Selic', 2029,
+        preco_max=200.0
+    )
+
+    assert verificar(manager, 0, 150, INICIO) == [alert_id]
+    assert alert_id in manager.alerts.index
+
+
+def test_reenvia_apenas_falhas_transitorias(manager, monkeypatch):
+    ids = {
+        email: manager.add_alert(
+            'Fulano', email, 'Tesouro Selic', 2029, preco_min=100.0
+        )
+        for email in ['ok@exemplo.com', 'cheia@exemplo.com',
+                      'inexistente@exemplo.com']
+    }
+    registry = SimpleNamespace(df=cotacao(0, 150))
+    registry.refresh = lambda: registry
+    monkeypatch.setattr(scheduler, 'get_dataset_registry', lambda: registry)
+    monkeypatch.setattr(alerts_manager, 'EMAIL_USER', 'alertas')
+    monkeypatch.setattr(alerts_manager, 'EMAIL_PASSWORD', 'segredo')
+
+    with SMTPDescarte() as smtp:
+        smtp.recusas['cheia@exemplo.com'] = ['452 Caixa cheia'] * 2
+        smtp.recusas['inexistente@exemplo.com'] = ['550 Caixa inexistente']
+        manager.dispatcher = EmailDispatcher(
+            host=smtp.host, port=smtp.port, user=None, password=None,
+            use_tls=False, timeout=5, max_retries=1, backoff=0
+        )
+        resumo = scheduler.AlertScheduler()._check(manager)
+        manager.dispatcher.close()
+
+    assert resumo['erro'] is None and resumo['acionados'] == 3
+    assert manager.store.load_pending() == [ids['cheia@exemplo.com']]
+    assert estado(manager, ids['cheia@exemplo.com']) == '0'
+    assert estado(manager, ids['inexistente@exemplo.com']) == '1'
+    assert estado(manager, ids['ok@exemplo.com']) == '1'
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+
+AUTH = ('admin', 'segredo')
+CABECALHO = 'nome,email,tipo_titulo,ano_vencimento,preco_min,preco_max,' \
+    'taxa_min,taxa_max\n'
+
+
+@pytest.fixture
+def cliente(redis_falso, monkeypatch):
+    monkeypatch.setattr(api, 'USUARIO', AUTH[0])
+    monkeypatch.setattr(api, 'SENHA', AUTH[1])
+    monkeypatch.setattr(api, '_store', None)
+    # Sem o lifespan: o agendador não é iniciado
+    return TestClient(api.api)
+
+
+def importar(cliente, corpo, tipo):
+    response = cliente.post(
+        '/alertas', content=corpo.encode('utf-8'),
+        headers={'content-type': tipo}, auth=AUTH
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize('metodo', ['get', 'post', 'delete'])
+@pytest.mark.parametrize('auth', [None, ('admin', 'errada')])
+def test_rotas_exigem_autenticacao(cliente, metodo, auth):
+    response = cliente.request(metodo, '/alertas', auth=auth)
+
+    assert response.status_code == 401
+    assert response.headers['www-authenticate'] == 'Basic'
+
+
+def test_importa_csv_com_quebra_de_linha(cliente):
+    corpo = CABECALHO + (
+        '"Fulano\nde Tal",f@x.com,Tesouro Selic,2029,1,,,\n'
+        '\n'
+        'Beltrano,b@x.com,Tesouro IPCA+,2035,,,5.5,\n'
+    )
+
+    resultado = importar(cliente, corpo, 'text/csv')
+
+    assert resultado['criados'] == 2 and resultado['erros'] == []
+    alertas = cliente.get('/alertas', auth=AUTH).json()['alertas']
+    assert sorted(a['nome'] for a in alertas) == ['Beltrano', 'Fulano\nde Tal']
+
+
+def test_erros_por_linha(cliente):
+    corpo = CABECALHO + (
+        'Ok,o@x.com,Tesouro Selic,2029,1,,,\n'
+        'SemLimite,s@x.com,Tesouro Selic,2029,,,,\n'
+        'Invertido,i@x.com,Tesouro Selic,2029,,,6,5\n'
+        'Ano,a@x.com,Tesouro Selic,abc,1,,,\n'
+    )
+
+    resultado = importar(cliente, corpo, 'text/csv')
+
+    assert resultado['criados'] == 1
+    erros = {erro['linha']: erro['erro'] for erro in resultado['erros']}
+    assert sorted(erros) == [2, 3, 4]
+    assert 'ao menos um limite' in erros[2]
+    assert 'taxa_min maior que taxa_max' in erros[3]
+    assert erros[4].startswith('ano_vencimento')
+
+
+def test_importa_ndjson_e_json(cliente):
+    linhas = [
+        {'nome': 'A', 'email': 'a@x.com', 'tipo_titulo': 'Tesouro Selic',
+         'ano_vencimento': 2029, 'preco_min': 1.5},
+        {'nome': 'B', 'email': 'b@x.com', 'tipo_titulo': 'Tesouro Selic',
+         'ano_vencimento': 2029, 'preco_min': 3, 'preco_max': 2},
+    ]
+    corpo = '\n'.join(json.dumps(linha) for linha in linhas) + '\n{x\n'
+
+    ndjson = importar(cliente, corpo, 'application/x-ndjson')
+    lista = importar(cliente, json.dumps({'alertas': linhas}),
+                     'application/json')
+
+    for resultado in (ndjson, lista):
+        assert resultado['criados'] == 1
+        assert [erro['linha'] for erro in resultado['erros']][0] == 2
+    assert len(ndjson['erros']) == 2
+
+
+def test_exporta_e_remove(cliente):
+    linhas = ''.join(
+        f'U{i},u{i}@x.com,Tesouro Selic,2029,{i + 1},,,\n' for i in range(25)
+    )
+    ids = importar(cliente, CABECALHO + linhas, 'text/csv')['ids']
+
+    csv = cliente.get(
+        '/alertas', params={'formato': 'csv', 'limite': 10}, auth=AUTH
+    ).text.splitlines()
+    ndjson = cliente.get(
+        '/alertas', params={'formato': 'ndjson', 'limite': 10}, auth=AUTH
+    ).text.splitlines()
+    assert csv[0].startswith('id,nome,email')
+    assert len(csv) == 26 and len(ndjson) == 25
+    assert {json.loads(linha)['id'] for linha in ndjson} == set(ids)
+
+    paginas, cursor = [], 0
+    while True:
+        pagina = cliente.get(
+            '/alertas', params={'cursor': cursor, 'limite': 10}, auth=AUTH
+        ).json()
+        paginas.extend(a['id'] for a in pagina['alertas'])
+        cursor = pagina['proximo_cursor']
+        if cursor is None:
+            break
+    assert sorted(paginas) == sorted(ids)
+
+    response = cliente.request(
+        'DELETE', '/alertas', content='id\n' + '\n'.join(ids[:5]) + '\nnada',
+        headers={'content-type': 'text/csv'}, auth=AUTH
+    )
+    assert response.json() == {'removidos': 5, 'nao_encontrados': 1}
+    response = cliente.request(
+        'DELETE', '/alertas', json={'ids': ids[5:]}, auth=AUTH
+    )
+    assert response.json() == {'removidos': 20, 'nao_encontrados': 0}
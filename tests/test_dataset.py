@@ -0,0 +1,50 @@
+import threading
+from io import BytesIO
+
+import pytest
+
+from sintetico import gerar_tesouro_csv
+
+from data.dataset import DatasetRegistry
+from data.tesouro import read_tesouro_csv
+
+
+@pytest.fixture(scope='module')
+def tesouro():
+    return read_tesouro_csv(BytesIO(gerar_tesouro_csv(
+        data_inicio='2023-01-01', data_fim='2023-12-31'
+    )))
+
+
+def test_refresh_async_inicia_uma_atualizacao(tesouro):
+    carregamentos = []
+    liberar = threading.Event()
+
+    def loader():
+        carregamentos.append(threading.current_thread().name)
+        if len(carregamentos) > 1:
+            liberar.wait(5)
+        return tesouro
+
+    registry = DatasetRegistry(
+        max_age=0, loader=loader, dolar_loader=lambda inicio, fim: None
+    )
+    primeira = registry.get()
+    inicio = threading.Barrier(8)
+
+    def ler():
+        inicio.wait()
+        assert registry.get() is primeira
+
+    leitores = [threading.Thread(target=ler) for _ in range(8)]
+    for leitor in leitores:
+        leitor.start()
+    for leitor in leitores:
+        leitor.join()
+    liberar.set()
+    with registry._refresh_lock:
+        pass
+
+    assert carregamentos.count('tesouro-refresh') == 1
+    # Mesmo conteúdo: a versão publicada é mantida
+    assert registry.get() is primeira
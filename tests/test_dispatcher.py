@@ -0,0 +1,107 @@
+import pytest
+
+from servicos import SMTPDescarte
+
+from alerts.dispatcher import EmailDispatcher, build_alert_message
+
+
+@pytest.fixture
+def smtp():
+    with SMTPDescarte() as servidor:
+        yield servidor
+
+
+def mensagem(email):
+    return build_alert_message({
+        'nome': 'Fulano',
+        'email': email,
+        'tipo_titulo': 'Tesouro Selic',
+        'ano_vencimento': 2029,
+        'message': 'Preço atual acima do mínimo',
+    }, sender='alertas@exemplo.com')
+
+
+def dispatcher(servidor, **kwargs):
+    kwargs.setdefault('backoff', 0)
+    return EmailDispatcher(
+        host=servidor.host, port=servidor.port, user=None, password=None,
+        use_tls=False, timeout=5, **kwargs
+    )
+
+
+def test_resultado_por_destinatario(smtp):
+    smtp.recusas['b@exemplo.com'] = ['550 Caixa inexistente']
+    emails = ['a@exemplo.com', 'b@exemplo.com', 'c@exemplo.com']
+
+    resultados = dispatcher(smtp).send([mensagem(e) for e in emails])
+
+    assert [r['email'] for r in resultados] == emails
+    assert [r['enviado'] for r in resultados] == [True, False, True]
+    assert resultados[1]['tentativas'] == 1
+    assert '550' in resultados[1]['erro']
+    assert not resultados[1]['transitorio']
+    assert resultados[0]['erro'] is None
+    assert smtp.mensagens == 2
+
+
+def test_repete_apos_erro_4xx(smtp):
+    smtp.recusas['a@exemplo.com'] = ['451 Tente depois', '452 Sem espaço']
+
+    resultado, = dispatcher(smtp).send([mensagem('a@exemplo.com')])
+
+    assert resultado['enviado']
+    assert resultado['tentativas'] == 3
+    assert smtp.mensagens == 1
+
+
+def test_desiste_apos_max_retries(smtp):
+    smtp.recusas['a@exemplo.com'] = ['451 Tente depois'] * 3
+
+    resultado, = dispatcher(smtp, max_retries=1).send(
+        [mensagem('a@exemplo.com')]
+    )
+
+    assert not resultado['enviado']
+    assert resultado['tentativas'] == 2
+    assert '451' in resultado['erro']
+    assert resultado['transitorio']
+
+
+def test_reconecta_apos_desconexao(smtp):
+    smtp.desconexoes = 1
+
+    resultados = dispatcher(smtp).send(
+        [mensagem('a@exemplo.com'), mensagem('b@exemplo.com')]
+    )
+
+    assert [r['enviado'] for r in resultados] == [True, True]
+    assert [r['tentativas'] for r in resultados] == [2, 1]
+    assert smtp.conexoes == 2
+    assert smtp.mensagens == 2
+
+
+def test_lotes_reaproveitam_conexoes(smtp):
+    envio = dispatcher(smtp, pool_size=1, batch_size=5)
+    mensagens = [mensagem(f'{i}@exemplo.com') for i in range(12)]
+
+    primeiro = envio.send(mensagens)
+    segundo = envio.send(mensagens[:3])
+    envio.close()
+
+    assert all(r['enviado'] for r in primeiro + segundo)
+    assert smtp.mensagens == 15
+    # Três lotes e um segundo envio, todos pela mesma sessão do pool
+    assert smtp.conexoes == 1
+
+
+def test_lotes_em_paralelo_limitados_ao_pool(smtp):
+    envio = dispatcher(smtp, pool_size=2, batch_size=2)
+
+    resultados = envio.send([mensagem(f'{i}@exemplo.com') for i in range(8)])
+    envio.close()
+
+    assert all(r['enviado'] for r in resultados)
+    assert [r['email'] for r in resultados] == [
+        f'{i}@exemplo.com' for i in range(8)
+    ]
+    assert smtp.conexoes <= 2
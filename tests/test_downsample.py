@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualization.downsample import downsample, lttb_indices, minmax_indices
+
+
+METODOS = [lttb_indices, minmax_indices]
+
+
+def serie(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype='float64'), np.cumsum(rng.normal(size=n))
+
+
+@pytest.mark.parametrize('metodo', METODOS)
+def test_serie_curta_fica_inteira(metodo):
+    x, y = serie(50)
+
+    assert list(metodo(x, y, 100)) == list(range(50))
+
+
+@pytest.mark.parametrize('metodo', METODOS)
+def test_reduz_mantendo_extremos(metodo):
+    x, y = serie()
+
+    posicoes = metodo(x, y, 100)
+
+    assert len(posicoes) <= 100
+    assert posicoes[0] == 0 and posicoes[-1] == len(x) - 1
+    assert np.all(np.diff(posicoes) > 0)
+
+
+def test_minmax_preserva_minimo_e_maximo():
+    x, y = serie()
+
+    posicoes = minmax_indices(x, y, 100)
+
+    assert np.argmin(y) in posicoes and np.argmax(y) in posicoes
+
+
+def test_lttb_preserva_pico():
+    x = np.arange(1000, dtype='float64')
+    y = np.zeros(1000)
+    y[500] = 10.0
+
+    assert 500 in lttb_indices(x, y, 50)
+
+
+@pytest.mark.parametrize('metodo', METODOS)
+@pytest.mark.parametrize('nans', [
+    [0], [0, 1], [0, 1, 400, 401, 402, 999], list(range(0, 1000, 7)),
+])
+def test_series_com_nan(metodo, nans):
+    x, y = serie()
+    y[nans] = np.nan
+
+    posicoes = metodo(x, y, 100)
+
+    assert 0 < len(posicoes) <= 100
+    assert np.all(np.diff(posicoes) > 0)
+    assert posicoes.max() < len(x)
+    if metodo is lttb_indices:
+        assert not np.isnan(y[posicoes]).any()
+
+
+@pytest.mark.parametrize('metodo', METODOS)
+def test_serie_toda_nan(metodo):
+    x = np.arange(100, dtype='float64')
+    y = np.full(100, np.nan)
+
+    assert len(metodo(x, y, 10)) <= 10
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_por_serie(method):
+    datas = pd.date_range('2020-01-01', periods=600)
+    df = pd.DataFrame({
+        'Data Base': np.tile(datas, 2),
+        'Titulo': np.repeat(['A', 'B'], 600),
+        'Variacao Taxa': np.r_[np.nan, np.sin(np.arange(1199) / 30)],
+    })
+
+    reduzido = downsample(
+        df, 'Data Base', 'Variacao Taxa', group='Titulo',
+        max_points=100, method=method
+    )
+
+    contagem = reduzido.groupby('Titulo').size()
+    assert (contagem <= 100).all() and len(contagem) == 2
+    assert reduzido.index.is_monotonic_increasing
+
+
+def test_downsample_desativado():
+    df = pd.DataFrame({'x': range(10), 'y': range(10)})
+
+    assert downsample(df, 'x', 'y', max_points=None) is df
@@ -0,0 +1,46 @@
+import pytest
+
+from servicos import ServidorDados
+
+from data import http
+
+
+@pytest.fixture
+def servidor():
+    with ServidorDados(b'a;b\n1;2\n') as servidor:
+        yield servidor
+
+
+@pytest.fixture(autouse=True)
+def sessao(monkeypatch):
+    """Sessão e métricas novas, sem espera entre as tentativas."""
+    monkeypatch.setattr(http, 'HTTP_RETRY_BACKOFF', 0)
+    monkeypatch.setattr(http, '_session', None)
+    monkeypatch.setattr(http, '_metrics', {})
+
+
+def test_repete_erros_5xx(servidor):
+    servidor.falhas = 2
+
+    response = http.http_get(f'{servidor.url}/tesouro.csv', endpoint='teste')
+
+    assert response.status_code == 200
+    assert response.content == b'a;b\n1;2\n'
+    assert servidor.requisicoes == 3
+    assert [r.status for r in response.raw.retries.history] == [503, 503]
+
+    metricas = http.get_latency_metrics()['teste']
+    assert metricas['requisicoes'] == 1
+    assert metricas['erros'] == 0
+    assert metricas['tempo_max'] == metricas['ultimo'] > 0
+    assert metricas['tempo_medio'] == metricas['tempo_total']
+
+
+def test_esgota_tentativas(servidor):
+    servidor.falhas = http.HTTP_MAX_RETRIES + 1
+
+    response = http.http_get(f'{servidor.url}/tesouro.csv', endpoint='teste')
+
+    assert response.status_code == 503
+    assert servidor.requisicoes == http.HTTP_MAX_RETRIES + 1
+    assert http.get_latency_metrics()['teste']['erros'] == 1
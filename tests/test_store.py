@@ -0,0 +1,123 @@
+from datetime import date
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from servicos import ServidorDados
+from sintetico import gerar_tesouro_csv
+
+from data import dolar, http, tesouro
+from data.store import MAX_ARQUIVOS_PARTICAO, DolarStore, TesouroStore
+from data.tesouro import read_tesouro_csv
+
+
+@pytest.fixture(scope='module')
+def csv_tesouro():
+    return gerar_tesouro_csv(data_inicio='2023-01-01', data_fim='2024-06-30')
+
+
+@pytest.fixture(scope='module')
+def historico(csv_tesouro):
+    return read_tesouro_csv(BytesIO(csv_tesouro))
+
+
+@pytest.fixture
+def servidor(csv_tesouro, monkeypatch):
+    monkeypatch.setattr(http, '_session', None)
+    with ServidorDados(csv_tesouro) as servidor:
+        monkeypatch.setattr(
+            tesouro, 'TESOURO_API_URL', f'{servidor.url}/tesouro.csv'
+        )
+        monkeypatch.setattr(dolar, 'BCB_API_URL', f'{servidor.url}/bcb')
+        yield servidor
+
+
+def ordenado(df):
+    return df.sort_values(
+        ['Data Base', 'Tipo Titulo', 'Data Vencimento'], ignore_index=True
+    )
+
+
+def test_tesouro_store_ida_e_volta(tmp_path, historico):
+    store = TesouroStore(tmp_path)
+    assert store.is_empty() and store.load() is None
+
+    assert store.append(historico) == len(historico)
+    carregado = store.load()
+
+    pd.testing.assert_frame_equal(carregado, ordenado(historico))
+    assert store.load_meta()['max_data_base'] == (
+        f"{historico['Data Base'].max():%Y-%m-%d}"
+    )
+
+
+def test_tesouro_store_acrescenta_apenas_datas_novas(tmp_path, historico):
+    store = TesouroStore(tmp_path)
+    datas = historico['Data Base'].drop_duplicates().sort_values()
+    # Um append por data base, além do limite de arquivos por partição
+    cortes = datas.iloc[-(MAX_ARQUIVOS_PARTICAO + 5):]
+
+    assert store.append(historico[historico['Data Base'] < cortes.iloc[0]])
+    for corte in cortes:
+        assert store.append(historico[historico['Data Base'] <= corte]) > 0
+    assert store.append(historico) == 0
+
+    pd.testing.assert_frame_equal(store.load(), ordenado(historico))
+    for particao in (tmp_path / 'dados').glob('tipo=*/ano=*'):
+        assert len(list(particao.glob('*.parquet'))) <= MAX_ARQUIVOS_PARTICAO
+
+
+def test_download_condicional(tmp_path, servidor, historico):
+    store = TesouroStore(tmp_path)
+
+    baixado = tesouro.load_tesouro_data(store)
+    assert store.load_meta()['etag'] == servidor.etag
+
+    # ETag igual: 304 e dados lidos do armazenamento local
+    local = tesouro.load_tesouro_data(store)
+    assert servidor.requisicoes == 2
+    pd.testing.assert_frame_equal(local, ordenado(baixado))
+    pd.testing.assert_frame_equal(local, ordenado(historico))
+
+
+def test_dolar_store_lacunas(tmp_path):
+    store = DolarStore(tmp_path)
+    assert store.missing(date(2020, 1, 1), date(2020, 12, 31)) == [
+        (date(2020, 1, 1), date(2020, 12, 31))
+    ]
+
+    store.add(None, date(2020, 3, 1), date(2020, 3, 31))
+    store.add(None, date(2020, 6, 1), date(2020, 6, 30))
+    store.add(None, date(2020, 7, 1), date(2020, 7, 15))
+
+    assert store.missing(date(2020, 1, 1), date(2020, 12, 31)) == [
+        (date(2020, 1, 1), date(2020, 2, 29)),
+        (date(2020, 4, 1), date(2020, 5, 31)),
+        (date(2020, 7, 16), date(2020, 12, 31)),
+    ]
+    assert store.missing(date(2020, 6, 10), date(2020, 7, 10)) == []
+    # Outra instância no mesmo diretório enxerga a mesma cobertura
+    assert DolarStore(tmp_path).missing(
+        date(2020, 3, 15), date(2020, 4, 5)
+    ) == [(date(2020, 4, 1), date(2020, 4, 5))]
+
+
+def test_dolar_busca_apenas_as_lacunas(tmp_path, servidor):
+    store = DolarStore(tmp_path)
+
+    primeiro = dolar.load_dolar_data('2020-03-01', '2020-03-31', store)
+    assert servidor.requisicoes == 1
+    assert primeiro['data'].min() == pd.Timestamp('2020-03-02')
+
+    ano = dolar.load_dolar_data('2020-01-01', '2020-12-31', store)
+    # Apenas os trechos antes e depois de março
+    assert servidor.requisicoes == 3
+    assert store.missing(date(2020, 1, 1), date(2020, 12, 31)) == []
+    assert ano['data'].is_monotonic_increasing and ano['data'].is_unique
+    assert len(ano) == len(pd.bdate_range('2020-01-01', '2020-12-31'))
+    marco = ano[ano['data'].dt.month == 3].reset_index(drop=True)
+    pd.testing.assert_frame_equal(marco, primeiro)
+
+    dolar.load_dolar_data('2020-02-01', '2020-11-30', store)
+    assert servidor.requisicoes == 3
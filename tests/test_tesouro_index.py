@@ -0,0 +1,87 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from sintetico import gerar_tesouro_csv
+
+from data.index import TesouroIndex
+from data.tesouro import read_tesouro_csv
+
+
+@pytest.fixture(scope='module')
+def tesouro():
+    return read_tesouro_csv(BytesIO(gerar_tesouro_csv()))
+
+
+@pytest.fixture(scope='module')
+def index(tesouro):
+    return TesouroIndex(tesouro)
+
+
+def filtro_mascara(df, tipo, vencimentos=None, data_inicio=None,
+                   data_fim=None):
+    """Mesmo filtro com máscaras booleanas sobre todo o histórico."""
+    mascara = df['Tipo Titulo'] == tipo
+    if vencimentos:
+        mascara &= df['Data Vencimento'].isin(pd.to_datetime(vencimentos))
+    if data_inicio is not None:
+        mascara &= df['Data Base'] >= pd.Timestamp(data_inicio)
+    if data_fim is not None:
+        mascara &= df['Data Base'] <= pd.Timestamp(data_fim)
+    return df[mascara]
+
+
+def mesmas_linhas(a, b):
+    colunas = ['Data Base', 'Data Vencimento']
+    pd.testing.assert_frame_equal(
+        a.sort_values(colunas, ignore_index=True),
+        b.sort_values(colunas, ignore_index=True)
+    )
+
+
+def test_tipos_e_vencimentos(tesouro, index):
+    assert index.tipos == [str(t) for t in tesouro['Tipo Titulo'].unique()]
+    assert index.data_min == tesouro['Data Base'].min()
+    assert index.data_max == tesouro['Data Base'].max()
+    for tipo in index.tipos:
+        vencimentos = tesouro.loc[
+            tesouro['Tipo Titulo'] == tipo, 'Data Vencimento'
+        ].unique()
+        por_ano = index.vencimentos_por_ano(tipo)
+        assert sorted(v for lista in por_ano.values() for v in lista) == (
+            sorted(pd.to_datetime(vencimentos))
+        )
+        assert all(v.year == ano for ano, lista in por_ano.items()
+                   for v in lista)
+    assert index.vencimentos_por_ano('Inexistente') == {}
+
+
+@pytest.mark.parametrize('periodo', [
+    (None, None),
+    ('2010-01-01', None),
+    (None, '2015-06-30'),
+    ('2012-03-15', '2018-09-01'),
+    ('2030-01-01', None),
+])
+def test_filter_igual_a_mascara(tesouro, index, periodo):
+    for tipo in index.tipos:
+        vencimentos = sorted(
+            v for lista in index.vencimentos_por_ano(tipo).values()
+            for v in lista
+        )
+        for selecao in (None, vencimentos[::2], vencimentos[-1:]):
+            filtrado = index.filter(tipo, selecao, *periodo)
+
+            assert filtrado['Data Base'].is_monotonic_increasing
+            mesmas_linhas(filtrado, filtro_mascara(tesouro, tipo, selecao,
+                                                   *periodo))
+
+
+def test_filter_sem_resultados(index):
+    tipo = index.tipos[0]
+
+    assert index.filter('Inexistente').empty
+    assert index.filter(tipo, ['1900-01-01']).empty
+    assert index.filter(tipo, None, '2020-01-01', '2019-01-01').empty
+    assert list(index.filter('Inexistente').columns) == list(index.df.columns)